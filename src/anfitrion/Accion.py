@@ -0,0 +1,51 @@
+import itertools
+import time
+
+_ids = itertools.count(1)
+
+
+class Accion:
+    """
+    Acción de un jugador dirigida a una mesa (por ejemplo, 'jugar' o 'subir').
+    """
+    __slots__ = ('_id', '_tipo', '_jugador', '_datos', '_creada', 'futuro')
+
+    def __init__(self, tipo: str, jugador=None, datos: dict = None):
+        """
+        Args:
+            tipo (str): Nombre de la acción
+            jugador (str | int, optional): Id del usuario o índice del jugador que actúa
+            datos (dict, optional): Argumentos de la acción (por ejemplo, {'columna': 1})
+        """
+        self._id = next(_ids)
+        self._tipo = tipo
+        self._jugador = jugador
+        self._datos = datos or {}
+        self._creada = time.perf_counter()
+        # Lo crea la mesa al recibir la acción; recibe el resultado o el error
+        self.futuro = None
+
+    def get_id(self) -> int:
+        return self._id
+
+    def get_tipo(self) -> str:
+        return self._tipo
+
+    def get_jugador(self):
+        return self._jugador
+
+    def get_datos(self) -> dict:
+        return self._datos
+
+    def get_creada(self) -> float:
+        return self._creada
+
+    def to_dict(self) -> dict:
+        return {'tipo': self._tipo, 'jugador': self._jugador, 'datos': self._datos}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Accion':
+        return cls(data['tipo'], data.get('jugador'), data.get('datos'))
+
+    def __repr__(self) -> str:
+        return f"Accion({self._tipo!r}, jugador={self._jugador!r}, datos={self._datos!r})"
@@ -0,0 +1,204 @@
+"""
+Acciones por defecto que una MesaActor acepta según el juego de la sala.
+
+Cada acción es una función ``manejador(mesa, accion)`` que se ejecuta dentro del
+actor de la mesa, así que nunca corre a la vez que otra acción de la misma sala.
+Puede ser una corrutina. Lo que retorna se entrega al cliente que la envió.
+Las acciones que calculan mucho (como la jugada del bot) se marcan con
+``en_hilo`` para que el actor las corra fuera del bucle de eventos.
+"""
+
+from typing import Callable
+
+
+def en_hilo(manejador: Callable) -> Callable:
+    """
+    Marca un manejador síncrono que usa mucha CPU: la mesa lo corre en un hilo
+    para no detener a las demás mesas del bucle mientras calcula.
+    """
+    manejador.en_hilo = True
+    return manejador
+
+
+def indice_jugador(sala, jugador) -> int:
+    """
+    Índice en la sala del jugador de una acción (id de usuario o índice).
+
+    Raises:
+        ValueError: Si el jugador no está en la sala
+    """
+    if isinstance(jugador, int):
+        return jugador
+    for i, usuario in enumerate(sala.get_jugadores()):
+        if usuario.get_id() == jugador:
+            return i
+    raise ValueError(f"El jugador {jugador} no está en la sala")
+
+
+def usuario_de(sala, jugador):
+    """Retorna el Usuario de la sala que corresponde al jugador de la acción."""
+    return sala.get_jugadores()[indice_jugador(sala, jugador)]
+
+
+# ---------------------------------------------------------------- KnuckleBones
+
+def _lanzar(mesa, accion) -> dict:
+    sala, contexto = mesa.get_sala(), mesa.get_contexto()
+    jugador = indice_jugador(sala, accion.get_jugador())
+    if sala.finalizo_juego():
+        raise ValueError("El juego ya terminó")
+    if jugador != sala.get_jugador_en_turno():
+        raise ValueError(f"No es el turno del jugador {jugador}")
+    # Repetir 'lanzar' (por ejemplo, tras reconectar) no cambia el dado
+    if contexto.get('dado') is None:
+        contexto['dado'] = sala.lanzar_dado()
+    return {'jugador': jugador, 'dado': contexto['dado']}
+
+
+def _jugar(mesa, accion) -> dict:
+    sala, contexto = mesa.get_sala(), mesa.get_contexto()
+    jugador = indice_jugador(sala, accion.get_jugador())
+    dado = contexto.get('dado')
+    if dado is None:
+        raise ValueError("Primero hay que lanzar el dado")
+    _, delta = sala.aplicar_movimiento(jugador, accion.get_datos().get('columna'), dado)
+    contexto['dado'] = None
+    sala.get_historial().append(delta)
+    return delta
+
+
+def _estado_knucklebones(mesa, accion) -> dict:
+    sala = mesa.get_sala()
+    return {
+        'estado': list(sala.get_estado()),
+        'turno': sala.get_jugador_en_turno(),
+        'dado': mesa.get_contexto().get('dado'),
+        'terminado': sala.finalizo_juego()
+    }
+
+
+def _reiniciar(mesa, accion) -> None:
+    mesa.get_sala().reiniciar_mesa()
+    mesa.get_contexto()['dado'] = None
+
+
+@en_hilo
+def jugada_automatica(mesa) -> dict:
+    """
+    Juega con el bot de la sala por el jugador de KnuckleBones en turno; por
+    ejemplo, el que no respondió a tiempo (como ``al_agotar_espera`` de la mesa)
+    o el asiento del bot con la acción 'jugar_bot'.
+
+    Returns:
+        dict: El delta de la jugada, o None si el juego ya terminó
+    """
+    from servidor.src.model.salaDeJuego.juego.JugadoresKnuckleBones import JugadorBot
+
+    sala, contexto = mesa.get_sala(), mesa.get_contexto()
+    if sala.finalizo_juego():
+        return None
+    jugador = sala.get_jugador_en_turno()
+    dado = contexto.get('dado') or sala.lanzar_dado()
+    columna = JugadorBot().elegir(sala, jugador, dado)
+    _, delta = sala.aplicar_movimiento(jugador, columna, dado)
+    contexto['dado'] = None
+    sala.get_historial().append(delta)
+    return delta
+
+
+ACCIONES_KNUCKLEBONES = {
+    'lanzar': _lanzar,
+    'jugar': _jugar,
+    'estado': _estado_knucklebones,
+    'reiniciar': _reiniciar,
+    'jugar_bot': en_hilo(lambda mesa, accion: jugada_automatica(mesa))
+}
+
+
+# ---------------------------------------------------------- Juegos de cartas
+
+def _metodo_de_usuario(nombre: str, *campos: str) -> Callable:
+    # Acción que llama sala.<nombre>(usuario, *datos[campo])
+    def manejador(mesa, accion):
+        sala = mesa.get_sala()
+        argumentos = [accion.get_datos()[campo] for campo in campos]
+        return getattr(sala, nombre)(usuario_de(sala, accion.get_jugador()), *argumentos)
+    return manejador
+
+
+def _estado_sala(mesa, accion) -> dict:
+    return mesa.get_sala().to_dict()
+
+
+def _liquidando(manejador: Callable) -> Callable:
+    # La jugada que termina una mano de Poker escribe su resultado antes de responder,
+    # aunque la jugada falle después de repartir el pozo
+    async def accion_poker(mesa, accion):
+        try:
+            return manejador(mesa, accion)
+        finally:
+            sala = mesa.get_sala()
+            if sala.tiene_liquidacion_pendiente():
+                await sala.liquidar()
+    return accion_poker
+
+
+def _estado_mano(sala) -> dict:
+    return {
+        'id_mano': sala.get_id_mano(),
+        'etapa': str(sala.get_etapa()),
+        'pozo': sala.get_pozo(),
+        'cartas_comunitarias': list(getattr(sala, 'cartas_comunitarias', [])),
+        'terminada': sala.mano_terminada()
+    }
+
+
+def _repartir(mesa, accion) -> dict:
+    sala = mesa.get_sala()
+    if sala.get_id_mano() is not None and not sala.mano_terminada():
+        raise ValueError("La mano actual aún no termina")
+    if len(sala.get_jugadores()) < sala.get_capacidadMinima():
+        raise ValueError(f"Se necesitan al menos {sala.get_capacidadMinima()} jugadores para repartir")
+    sala.inicializar_juego()
+    return _estado_mano(sala)
+
+
+def _avanzar_etapa(mesa, accion) -> dict:
+    sala = mesa.get_sala()
+    if sala.get_id_mano() is None or sala.mano_terminada():
+        raise ValueError("No hay una mano en juego")
+    apuestas = {j['apuesta'] for j in sala._mano_de_jugadores if j['en_juego']}
+    if len(apuestas) > 1:
+        raise ValueError("Las apuestas de la ronda no están igualadas")
+    sala.avanzar_etapa()
+    return _estado_mano(sala)
+
+
+ACCIONES_POKER = {
+    'repartir': _repartir,
+    'apostar': _liquidando(_metodo_de_usuario('apostar', 'monto')),
+    'pasar': _liquidando(_metodo_de_usuario('pasar')),
+    'igualar': _liquidando(_metodo_de_usuario('igualar')),
+    'subir': _liquidando(_metodo_de_usuario('subir', 'monto')),
+    'all_in': _liquidando(_metodo_de_usuario('all_in')),
+    'retirarse': _liquidando(_metodo_de_usuario('retirarse')),
+    'avanzar_etapa': _liquidando(_avanzar_etapa),
+    'estado': _estado_sala
+}
+
+
+def acciones_por_defecto(sala) -> dict:
+    """
+    Retorna las acciones que acepta la sala según su juego.
+
+    Raises:
+        ValueError: Si no hay acciones por defecto para el juego de la sala
+    """
+    from servidor.src.model.salaDeJuego.juego.KnuckleBones import KnuckleBones
+    from servidor.src.model.salaDeJuego.juego.juegosDeCartas import Poker
+
+    if isinstance(sala, KnuckleBones):
+        return dict(ACCIONES_KNUCKLEBONES)
+    if isinstance(sala, Poker):
+        return dict(ACCIONES_POKER)
+    raise ValueError(f"No hay acciones por defecto para {type(sala).__name__}; indique las acciones de la mesa")
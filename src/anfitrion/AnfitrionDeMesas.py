@@ -0,0 +1,137 @@
+import asyncio
+import uuid
+
+from servidor.src.anfitrion.Accion import Accion
+from servidor.src.anfitrion.MesaActor import MesaActor
+
+
+class AnfitrionDeMesas:
+    """
+    Hospeda muchas salas de juego en un mismo proceso, cada una como un MesaActor
+    con su propia tarea de asyncio.
+
+    Se usa como contexto asíncrono::
+
+        async with AnfitrionDeMesas() as anfitrion:
+            anfitrion.abrir_mesa(KnuckleBones(), 'mesa-1')
+            resultado = await anfitrion.enviar('mesa-1', Accion('lanzar', 0))
+    """
+
+    def __init__(self, tiempo_respuesta: float = 10.0, **opciones_mesa):
+        """
+        Args:
+            tiempo_respuesta (float, optional): Segundos que un cliente espera la
+                respuesta de una acción
+            **opciones_mesa: Opciones por defecto de cada MesaActor (max_pendientes,
+                tiempo_accion, tiempo_espera, al_agotar_espera, cuota)
+        """
+        self._tiempo_respuesta = tiempo_respuesta
+        self._opciones_mesa = opciones_mesa
+        self._mesas = {}
+        self._tareas = {}
+
+    def abrir_mesa(self, sala, id: str = None, **opciones) -> MesaActor:
+        """
+        Empieza a hospedar una sala. Debe llamarse dentro del bucle de eventos.
+
+        Args:
+            sala (SalaDeJuego): La sala
+            id (str, optional): Id de la mesa. Por defecto el id de la sala o uno nuevo
+            **opciones: Opciones de MesaActor para esta mesa
+
+        Returns:
+            MesaActor: El actor de la mesa
+
+        Raises:
+            ValueError: Si ya hay una mesa con ese id
+        """
+        id = id or getattr(sala, '_id', None) or uuid.uuid4().hex
+        if id in self._mesas:
+            raise ValueError(f"Ya existe la mesa {id}")
+        mesa = MesaActor(id, sala, **{**self._opciones_mesa, **opciones})
+        self._mesas[id] = mesa
+        self._tareas[id] = asyncio.create_task(mesa.ejecutar(), name=f"mesa-{id}")
+        return mesa
+
+    def get_mesa(self, id: str) -> MesaActor:
+        """
+        Raises:
+            ValueError: Si la mesa no existe
+        """
+        mesa = self._mesas.get(id)
+        if mesa is None:
+            raise ValueError(f"No existe la mesa {id}")
+        return mesa
+
+    def get_mesas(self) -> list:
+        return list(self._mesas)
+
+    def enviar_sin_esperar(self, id: str, accion: Accion) -> asyncio.Future:
+        """Encola una acción en la mesa y retorna el futuro de su resultado."""
+        return self.get_mesa(id).enviar(accion)
+
+    async def enviar(self, id: str, accion: Accion, tiempo_respuesta: float = None):
+        """
+        Envía una acción a la mesa y espera su resultado.
+
+        Args:
+            id (str): Id de la mesa
+            accion (Accion): La acción
+            tiempo_respuesta (float, optional): Segundos de espera. Por defecto los del anfitrión
+
+        Returns:
+            El resultado de la acción
+
+        Raises:
+            ValueError: Si la mesa no existe, está saturada o la acción no es válida
+            asyncio.TimeoutError: Si la mesa no responde a tiempo
+        """
+        futuro = self.enviar_sin_esperar(id, accion)
+        # shield: si se agota la espera la acción se descarta en la mesa, no a medias
+        try:
+            return await asyncio.wait_for(asyncio.shield(futuro), tiempo_respuesta or self._tiempo_respuesta)
+        except asyncio.TimeoutError:
+            futuro.cancel()
+            raise
+
+    async def cerrar_mesa(self, id: str):
+        """
+        Deja de hospedar la mesa después de procesar sus acciones pendientes.
+
+        Returns:
+            SalaDeJuego: La sala que hospedaba
+        """
+        mesa = self.get_mesa(id)
+        await mesa.cerrar()
+        await self._tareas.pop(id)
+        del self._mesas[id]
+        return mesa.get_sala()
+
+    async def cerrar(self) -> None:
+        """Cierra todas las mesas."""
+        await asyncio.gather(*(self.cerrar_mesa(id) for id in list(self._mesas)))
+
+    def get_metricas(self) -> dict:
+        """
+        Returns:
+            dict: Mesas abiertas y la suma de las métricas de todas las mesas, con
+            la latencia media ponderada y la máxima
+        """
+        totales = {'mesas': len(self._mesas), 'procesadas': 0, 'errores': 0, 'descartadas': 0,
+                   'esperas_agotadas': 0, 'pendientes': 0, 'latencia_total': 0.0, 'latencia_maxima': 0.0}
+        for mesa in self._mesas.values():
+            metricas = mesa.get_metricas()
+            for clave in ('procesadas', 'errores', 'descartadas', 'esperas_agotadas', 'pendientes', 'latencia_total'):
+                totales[clave] += metricas[clave]
+            totales['latencia_maxima'] = max(totales['latencia_maxima'], metricas['latencia_maxima'])
+        totales['latencia_media'] = totales['latencia_total'] / totales['procesadas'] if totales['procesadas'] else 0.0
+        return totales
+
+    async def __aenter__(self) -> 'AnfitrionDeMesas':
+        return self
+
+    async def __aexit__(self, *excepcion) -> None:
+        await self.cerrar()
+
+    def __repr__(self) -> str:
+        return f"AnfitrionDeMesas(mesas={len(self._mesas)})"
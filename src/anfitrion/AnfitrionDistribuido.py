@@ -0,0 +1,335 @@
+import asyncio
+import itertools
+import multiprocessing
+import os
+import threading
+import uuid
+
+from servidor.src.anfitrion.Accion import Accion
+from servidor.src.anfitrion.AnilloConsistente import AnilloConsistente
+from servidor.src.anfitrion.TrabajadorMesas import (
+    ABRIR, ACCION, CERRAR, EXPORTAR, METRICAS, ejecutar_trabajador
+)
+
+
+class _Trabajador:
+    # Proceso trabajador y el extremo del Pipe del proceso principal
+    __slots__ = ('nombre', 'proceso', 'conexion', 'lector')
+
+    def __init__(self, nombre, proceso, conexion):
+        self.nombre = nombre
+        self.proceso = proceso
+        self.conexion = conexion
+        self.lector = None
+
+
+class AnfitrionDistribuido:
+    """
+    Reparte las mesas entre varios procesos trabajadores, cada uno con su propio
+    AnfitrionDeMesas, para usar todos los núcleos a pesar del GIL.
+
+    Cada mesa vive en un solo trabajador, elegido por hashing consistente del id
+    de la sala, y sus acciones se envían a ese trabajador por un Pipe. Al drenar
+    un trabajador (o al agregar uno) las mesas que cambian de dueño se migran: se
+    exportan después de procesar sus acciones pendientes, las acciones nuevas
+    esperan y la mesa se abre en el trabajador nuevo. Las salas viajan entre
+    procesos con pickle.
+    """
+
+    def __init__(
+        self,
+        trabajadores: int = None,
+        replicas: int = 64,
+        tiempo_respuesta: float = 10.0,
+        contexto: str = 'spawn',
+        **opciones_mesa
+    ):
+        """
+        Args:
+            trabajadores (int, optional): Procesos trabajadores. Por defecto os.cpu_count()
+            replicas (int, optional): Puntos virtuales por trabajador en el anillo
+            tiempo_respuesta (float, optional): Segundos que se espera cada respuesta
+            contexto (str, optional): Método de inicio de multiprocessing
+            **opciones_mesa: Opciones de AnfitrionDeMesas y MesaActor de cada trabajador
+        """
+        self._cantidad_inicial = max(1, trabajadores or os.cpu_count() or 1)
+        self._anillo = AnilloConsistente(replicas=replicas)
+        self._tiempo_respuesta = tiempo_respuesta
+        self._contexto = multiprocessing.get_context(contexto)
+        self._opciones_mesa = opciones_mesa
+        self._trabajadores = {}
+        self._nombres = itertools.count()
+        self._ids = itertools.count()
+        self._pendientes = {}
+        self._ubicacion = {}
+        self._migrando = {}
+        self._loop = None
+
+    async def iniciar(self) -> None:
+        """Inicia los procesos trabajadores."""
+        self._loop = asyncio.get_running_loop()
+        for _ in range(self._cantidad_inicial):
+            self._iniciar_trabajador()
+
+    def _iniciar_trabajador(self):
+        nombre = next(self._nombres)
+        conexion, conexion_hijo = self._contexto.Pipe()
+        proceso = self._contexto.Process(
+            target=ejecutar_trabajador, args=(conexion_hijo, self._opciones_mesa),
+            name=f"trabajador-mesas-{nombre}", daemon=True
+        )
+        proceso.start()
+        conexion_hijo.close()
+        trabajador = _Trabajador(nombre, proceso, conexion)
+        trabajador.lector = threading.Thread(
+            target=self._leer, args=(trabajador,), name=f"lector-mesas-{nombre}", daemon=True
+        )
+        trabajador.lector.start()
+        self._trabajadores[nombre] = trabajador
+        self._anillo.agregar(nombre)
+        return nombre
+
+    def _leer(self, trabajador: _Trabajador) -> None:
+        while True:
+            try:
+                respuesta = trabajador.conexion.recv()
+            except (EOFError, OSError):
+                self._loop.call_soon_threadsafe(self._trabajador_terminado, trabajador.nombre)
+                return
+            self._loop.call_soon_threadsafe(self._resolver, respuesta)
+
+    def _resolver(self, respuesta: tuple) -> None:
+        id_mensaje, ok, resultado = respuesta
+        pendiente = self._pendientes.pop(id_mensaje, None)
+        if pendiente is None or pendiente[1].done():
+            return
+        if ok:
+            pendiente[1].set_result(resultado)
+        else:
+            pendiente[1].set_exception(resultado)
+
+    def _trabajador_terminado(self, nombre) -> None:
+        for id_mensaje, (dueno, futuro) in list(self._pendientes.items()):
+            if dueno == nombre:
+                del self._pendientes[id_mensaje]
+                if not futuro.done():
+                    futuro.set_exception(ValueError(f"El trabajador {nombre} terminó"))
+
+    async def _pedir(self, nombre, tipo: str, id_mesa: str = None, carga=None, tiempo_respuesta: float = None):
+        id_mensaje = next(self._ids)
+        futuro = self._loop.create_future()
+        self._pendientes[id_mensaje] = (nombre, futuro)
+        self._trabajadores[nombre].conexion.send((tipo, id_mensaje, id_mesa, carga))
+        try:
+            return await asyncio.wait_for(futuro, tiempo_respuesta or self._tiempo_respuesta)
+        finally:
+            self._pendientes.pop(id_mensaje, None)
+
+    def get_trabajadores(self) -> list:
+        return list(self._trabajadores)
+
+    def get_mesas(self, trabajador=None) -> list:
+        """Retorna los ids de las mesas, todas o las de un trabajador."""
+        return [id for id, nombre in self._ubicacion.items() if trabajador is None or nombre == trabajador]
+
+    def trabajador_de(self, id: str):
+        """
+        Raises:
+            ValueError: Si la mesa no existe
+        """
+        if id not in self._ubicacion:
+            raise ValueError(f"No existe la mesa {id}")
+        return self._ubicacion[id]
+
+    async def abrir_mesa(self, sala, id: str = None) -> str:
+        """
+        Hospeda la sala en el trabajador que le corresponde por su id.
+
+        Returns:
+            str: El id de la mesa
+
+        Raises:
+            ValueError: Si ya hay una mesa con ese id
+        """
+        id = id or getattr(sala, '_id', None) or uuid.uuid4().hex
+        if id in self._ubicacion:
+            raise ValueError(f"Ya existe la mesa {id}")
+        nombre = self._anillo.nodo_de(id)
+        self._ubicacion[id] = nombre
+        try:
+            await self._pedir(nombre, ABRIR, id, (sala, {}))
+        except BaseException:
+            del self._ubicacion[id]
+            raise
+        return id
+
+    async def enviar(self, id: str, accion: Accion, tiempo_respuesta: float = None):
+        """
+        Envía una acción al trabajador dueño de la mesa y espera el resultado. Si la
+        mesa se está migrando, espera a que termine la migración.
+
+        Raises:
+            ValueError: Si la mesa no existe o la acción no es válida
+            asyncio.TimeoutError: Si el trabajador no responde a tiempo
+        """
+        while id in self._migrando:
+            await self._migrando[id].wait()
+        return await self._pedir(self.trabajador_de(id), ACCION, id, accion.to_dict(), tiempo_respuesta)
+
+    async def migrar_mesa(self, id: str, destino) -> None:
+        """
+        Mueve la mesa a otro trabajador sin perder acciones.
+
+        Raises:
+            ValueError: Si la mesa o el trabajador no existen
+        """
+        origen = self.trabajador_de(id)
+        if destino not in self._trabajadores:
+            raise ValueError(f"No existe el trabajador {destino}")
+        if origen == destino or id in self._migrando:
+            return
+        evento = asyncio.Event()
+        self._migrando[id] = evento
+        try:
+            # El Pipe conserva el orden: las acciones ya enviadas se procesan antes de exportar
+            sala, contexto = await self._pedir(origen, EXPORTAR, id)
+            try:
+                await self._pedir(destino, ABRIR, id, (sala, contexto))
+            except BaseException:
+                await self._pedir(origen, ABRIR, id, (sala, contexto))
+                raise
+            self._ubicacion[id] = destino
+        finally:
+            del self._migrando[id]
+            evento.set()
+
+    async def rebalancear(self) -> int:
+        """
+        Migra las mesas cuyo dueño en el anillo cambió.
+
+        Returns:
+            int: Cantidad de mesas migradas
+        """
+        movimientos = [
+            (id, self._anillo.nodo_de(id)) for id, nombre in self._ubicacion.items()
+            if self._anillo.nodo_de(id) != nombre
+        ]
+        await asyncio.gather(*(self.migrar_mesa(id, destino) for id, destino in movimientos))
+        return len(movimientos)
+
+    async def agregar_trabajador(self):
+        """
+        Inicia un trabajador nuevo y le migra las mesas que le tocan en el anillo.
+
+        Returns:
+            El nombre del trabajador
+        """
+        nombre = self._iniciar_trabajador()
+        await self.rebalancear()
+        return nombre
+
+    async def drenar(self, nombre, detener: bool = True) -> int:
+        """
+        Saca al trabajador del anillo y migra sus mesas a los demás.
+
+        Args:
+            nombre: Nombre del trabajador
+            detener (bool, optional): Terminar el proceso después de migrar
+
+        Returns:
+            int: Cantidad de mesas migradas
+
+        Raises:
+            ValueError: Si el trabajador no existe o es el único
+        """
+        if nombre not in self._trabajadores:
+            raise ValueError(f"No existe el trabajador {nombre}")
+        if len(self._anillo) == 1 and nombre in self._anillo:
+            raise ValueError("No se puede drenar el único trabajador")
+        if nombre in self._anillo:
+            self._anillo.quitar(nombre)
+        migradas = await self.rebalancear()
+        if detener:
+            await self._detener(nombre)
+        return migradas
+
+    async def _detener(self, nombre) -> None:
+        trabajador = self._trabajadores[nombre]
+        try:
+            await self._pedir(nombre, CERRAR)
+        except (ValueError, OSError, asyncio.TimeoutError):
+            pass
+        await asyncio.to_thread(trabajador.proceso.join, self._tiempo_respuesta)
+        if trabajador.proceso.is_alive():
+            trabajador.proceso.terminate()
+        trabajador.conexion.close()
+        del self._trabajadores[nombre]
+        if nombre in self._anillo:
+            self._anillo.quitar(nombre)
+
+    async def cerrar_mesa(self, id: str):
+        """
+        Deja de hospedar la mesa.
+
+        Returns:
+            SalaDeJuego: La sala, copiada desde el trabajador
+        """
+        while id in self._migrando:
+            await self._migrando[id].wait()
+        sala, _ = await self._pedir(self.trabajador_de(id), EXPORTAR, id)
+        del self._ubicacion[id]
+        return sala
+
+    async def get_metricas(self) -> dict:
+        """
+        Returns:
+            dict: Métricas de cada trabajador en ``trabajadores`` y sus sumas
+        """
+        nombres = list(self._trabajadores)
+        por_trabajador = await asyncio.gather(*(self._pedir(nombre, METRICAS) for nombre in nombres))
+        totales = {'mesas': 0, 'procesadas': 0, 'errores': 0, 'descartadas': 0,
+                   'esperas_agotadas': 0, 'pendientes': 0, 'latencia_total': 0.0, 'latencia_maxima': 0.0}
+        for metricas in por_trabajador:
+            for clave in totales:
+                if clave == 'latencia_maxima':
+                    totales[clave] = max(totales[clave], metricas[clave])
+                else:
+                    totales[clave] += metricas[clave]
+        totales['latencia_media'] = totales['latencia_total'] / totales['procesadas'] if totales['procesadas'] else 0.0
+        totales['trabajadores'] = dict(zip(nombres, por_trabajador))
+        return totales
+
+    async def cerrar(self) -> None:
+        """Cierra todas las mesas y termina los trabajadores."""
+        await asyncio.gather(*(self._detener(nombre) for nombre in list(self._trabajadores)))
+        self._ubicacion.clear()
+
+    async def __aenter__(self) -> 'AnfitrionDistribuido':
+        await self.iniciar()
+        return self
+
+    async def __aexit__(self, *excepcion) -> None:
+        await self.cerrar()
+
+    def __repr__(self) -> str:
+        return f"AnfitrionDistribuido(trabajadores={len(self._trabajadores)}, mesas={len(self._ubicacion)})"
+
+
+if __name__ == "__main__":
+    import time
+
+    from servidor.src.anfitrion.SimuladorDeClientes import simular
+
+    async def comparar():
+        for trabajadores in sorted({1, os.cpu_count() or 1}):
+            async with AnfitrionDistribuido(trabajadores) as anfitrion:
+                resultado = await simular(200, semilla=1, bot=True, anfitrion=anfitrion)
+                inicio = time.perf_counter()
+                migradas = await anfitrion.drenar(0) if trabajadores > 1 else 0
+                print(
+                    f"{trabajadores} trabajadores: {resultado['acciones_por_segundo']:.0f} acciones/s, "
+                    f"p99 {resultado['latencia_p99'] * 1000:.1f} ms; "
+                    f"{migradas} mesas migradas al drenar en {time.perf_counter() - inicio:.2f} s"
+                )
+
+    asyncio.run(comparar())
@@ -0,0 +1,82 @@
+import bisect
+import hashlib
+
+
+def _hash(clave: str) -> int:
+    # Hash estable entre procesos y ejecuciones (hash() de Python usa una semilla aleatoria)
+    return int.from_bytes(hashlib.blake2b(clave.encode(), digest_size=8).digest(), 'big')
+
+
+class AnilloConsistente:
+    """
+    Anillo de hashing consistente que asigna cada clave (id de sala) a un nodo.
+
+    Cada nodo ocupa ``replicas`` puntos del anillo para repartir la carga de forma
+    pareja. Al agregar o quitar un nodo solo cambian de dueño las claves de los
+    tramos de ese nodo, así que se migran pocas mesas.
+    """
+
+    def __init__(self, nodos=(), replicas: int = 64):
+        """
+        Args:
+            nodos (Iterable, optional): Nodos iniciales (cualquier valor con str estable)
+            replicas (int, optional): Puntos virtuales por nodo
+
+        Raises:
+            ValueError: Si la cantidad de réplicas no es positiva
+        """
+        if replicas < 1:
+            raise ValueError("La cantidad de réplicas debe ser positiva")
+        self._replicas = replicas
+        self._puntos = []
+        self._duenos = []
+        self._nodos = set()
+        for nodo in nodos:
+            self.agregar(nodo)
+
+    def agregar(self, nodo) -> None:
+        """
+        Raises:
+            ValueError: Si el nodo ya está en el anillo
+        """
+        if nodo in self._nodos:
+            raise ValueError(f"El nodo {nodo} ya está en el anillo")
+        self._nodos.add(nodo)
+        for i in range(self._replicas):
+            punto = _hash(f"{nodo}#{i}")
+            posicion = bisect.bisect(self._puntos, punto)
+            self._puntos.insert(posicion, punto)
+            self._duenos.insert(posicion, nodo)
+
+    def quitar(self, nodo) -> None:
+        """
+        Raises:
+            ValueError: Si el nodo no está en el anillo
+        """
+        if nodo not in self._nodos:
+            raise ValueError(f"El nodo {nodo} no está en el anillo")
+        self._nodos.remove(nodo)
+        conservar = [i for i, dueno in enumerate(self._duenos) if dueno != nodo]
+        self._puntos = [self._puntos[i] for i in conservar]
+        self._duenos = [self._duenos[i] for i in conservar]
+
+    def nodo_de(self, clave: str):
+        """
+        Retorna el nodo dueño de la clave: el primer punto del anillo después de su hash.
+
+        Raises:
+            ValueError: Si el anillo está vacío
+        """
+        if not self._puntos:
+            raise ValueError("El anillo no tiene nodos")
+        posicion = bisect.bisect(self._puntos, _hash(str(clave))) % len(self._puntos)
+        return self._duenos[posicion]
+
+    def get_nodos(self) -> list:
+        return sorted(self._nodos, key=str)
+
+    def __len__(self) -> int:
+        return len(self._nodos)
+
+    def __contains__(self, nodo) -> bool:
+        return nodo in self._nodos
@@ -0,0 +1,209 @@
+import asyncio
+import inspect
+import time
+from typing import Callable
+
+from servidor.src.anfitrion.Accion import Accion
+from servidor.src.anfitrion.AccionesMesa import acciones_por_defecto
+
+# Marca que detiene el actor después de las acciones ya encoladas
+_CERRAR = object()
+
+
+class MesaActor:
+    """
+    Actor que hospeda una SalaDeJuego dentro del bucle de eventos.
+
+    Las acciones de los jugadores llegan a una cola propia y se aplican de a una,
+    así que la sala nunca se modifica desde dos corrutinas a la vez y no necesita
+    bloqueos. Después de ``cuota`` acciones seguidas el actor cede el bucle para
+    que una mesa muy activa no deje sin turno a las demás.
+
+    Los manejadores marcados con ``AccionesMesa.en_hilo`` (los que usan mucha
+    CPU, como el bot) corren en un hilo, así que también se limitan con
+    ``tiempo_accion``. Un hilo no se puede interrumpir: si se agota el tiempo, el
+    cliente recibe el error enseguida y la mesa espera a que el hilo termine
+    antes de aplicar la siguiente acción.
+    """
+
+    def __init__(
+        self,
+        id: str,
+        sala,
+        acciones: dict = None,
+        max_pendientes: int = 256,
+        tiempo_accion: float = 5.0,
+        tiempo_espera: float = None,
+        al_agotar_espera: Callable = None,
+        cuota: int = 8
+    ):
+        """
+        Args:
+            id (str): Id de la mesa
+            sala (SalaDeJuego): La sala hospedada
+            acciones (dict, optional): ``{tipo: manejador(mesa, accion)}``. Por defecto
+                las de AccionesMesa según el juego
+            max_pendientes (int, optional): Acciones encoladas antes de rechazar nuevas
+            tiempo_accion (float, optional): Segundos máximos de una acción asíncrona
+                o que corre en un hilo
+            tiempo_espera (float, optional): Segundos sin acciones antes de llamar a
+                al_agotar_espera. None para esperar sin límite
+            al_agotar_espera (Callable, optional): ``al_agotar_espera(mesa)``; por
+                ejemplo AccionesMesa.jugada_automatica
+            cuota (int, optional): Acciones seguidas antes de ceder el bucle
+        """
+        self._id = id
+        self._sala = sala
+        self._acciones = acciones if acciones is not None else acciones_por_defecto(sala)
+        self._cola = asyncio.Queue(max_pendientes)
+        self._tiempo_accion = tiempo_accion
+        self._tiempo_espera = tiempo_espera
+        self._al_agotar_espera = al_agotar_espera
+        self._cuota = max(1, cuota)
+        self._contexto = {}
+        # Hilo de una acción que agotó su tiempo y aún no termina
+        self._hilo_pendiente = None
+        self._cerrada = False
+        self._metricas = {
+            'procesadas': 0,
+            'errores': 0,
+            'descartadas': 0,
+            'esperas_agotadas': 0,
+            'latencia_total': 0.0,
+            'latencia_maxima': 0.0
+        }
+
+    def get_id(self) -> str:
+        return self._id
+
+    def get_sala(self):
+        return self._sala
+
+    def get_contexto(self) -> dict:
+        """Estado de la mesa que no es de la sala (por ejemplo, el dado lanzado)."""
+        return self._contexto
+
+    def get_pendientes(self) -> int:
+        return self._cola.qsize()
+
+    def esta_cerrada(self) -> bool:
+        return self._cerrada
+
+    def get_metricas(self) -> dict:
+        """
+        Returns:
+            dict: Acciones procesadas, con error, descartadas (el cliente dejó de
+            esperar), esperas agotadas, pendientes y latencia media y máxima en segundos
+        """
+        metricas = dict(self._metricas)
+        metricas['pendientes'] = self._cola.qsize()
+        metricas['latencia_media'] = (
+            metricas['latencia_total'] / metricas['procesadas'] if metricas['procesadas'] else 0.0
+        )
+        return metricas
+
+    def enviar(self, accion: Accion) -> asyncio.Future:
+        """
+        Encola una acción sin esperar a que se procese.
+
+        Returns:
+            asyncio.Future: Recibe el resultado de la acción o su error
+
+        Raises:
+            ValueError: Si la mesa está cerrada o tiene demasiadas acciones pendientes
+        """
+        if self._cerrada:
+            raise ValueError(f"La mesa {self._id} está cerrada")
+        accion.futuro = asyncio.get_running_loop().create_future()
+        try:
+            self._cola.put_nowait(accion)
+        except asyncio.QueueFull:
+            raise ValueError(f"La mesa {self._id} tiene demasiadas acciones pendientes")
+        return accion.futuro
+
+    async def ejecutar(self) -> None:
+        """Bucle del actor; termina al cerrar la mesa."""
+        seguidas = 0
+        while True:
+            if self._tiempo_espera is None:
+                accion = await self._cola.get()
+            else:
+                try:
+                    accion = await asyncio.wait_for(self._cola.get(), self._tiempo_espera)
+                except asyncio.TimeoutError:
+                    await self._agotar_espera()
+                    continue
+            if accion is _CERRAR:
+                await self._esperar_hilo_pendiente()
+                return
+            await self._procesar(accion)
+            # Cola.get no cede el bucle si hay acciones encoladas
+            seguidas += 1
+            if seguidas >= self._cuota:
+                seguidas = 0
+                await asyncio.sleep(0)
+
+    async def _procesar(self, accion: Accion) -> None:
+        futuro = accion.futuro
+        if futuro.done():
+            # El cliente ya dejó de esperar la respuesta
+            self._metricas['descartadas'] += 1
+            return
+        try:
+            manejador = self._acciones.get(accion.get_tipo())
+            if manejador is None:
+                raise ValueError(f"Acción desconocida para la mesa {self._id}: {accion.get_tipo()}")
+            resultado = await self._llamar(manejador, self, accion)
+        except Exception as e:
+            self._metricas['errores'] += 1
+            if not futuro.done():
+                futuro.set_exception(e)
+        else:
+            if not futuro.done():
+                futuro.set_result(resultado)
+        latencia = time.perf_counter() - accion.get_creada()
+        self._metricas['procesadas'] += 1
+        self._metricas['latencia_total'] += latencia
+        self._metricas['latencia_maxima'] = max(self._metricas['latencia_maxima'], latencia)
+
+    async def _agotar_espera(self) -> None:
+        if self._al_agotar_espera is None:
+            return
+        self._metricas['esperas_agotadas'] += 1
+        try:
+            await self._llamar(self._al_agotar_espera, self)
+        except Exception as e:
+            self._metricas['errores'] += 1
+            print(f"Error al agotar la espera en la mesa {self._id}: {e}")
+
+    async def _llamar(self, manejador: Callable, *argumentos):
+        # Ninguna acción empieza mientras siga corriendo el hilo de otra
+        await self._esperar_hilo_pendiente()
+        if getattr(manejador, 'en_hilo', False):
+            hilo = asyncio.ensure_future(asyncio.to_thread(manejador, *argumentos))
+            try:
+                return await asyncio.wait_for(asyncio.shield(hilo), self._tiempo_accion)
+            except asyncio.TimeoutError:
+                self._hilo_pendiente = hilo
+                raise
+        resultado = manejador(*argumentos)
+        if inspect.isawaitable(resultado):
+            resultado = await asyncio.wait_for(resultado, self._tiempo_accion)
+        return resultado
+
+    async def _esperar_hilo_pendiente(self) -> None:
+        if self._hilo_pendiente is not None:
+            hilo, self._hilo_pendiente = self._hilo_pendiente, None
+            try:
+                await hilo
+            except Exception as e:
+                print(f"Error en una acción que agotó su tiempo en la mesa {self._id}: {e}")
+
+    async def cerrar(self) -> None:
+        """Deja de aceptar acciones; las ya encoladas se procesan antes de terminar."""
+        if not self._cerrada:
+            self._cerrada = True
+            await self._cola.put(_CERRAR)
+
+    def __repr__(self) -> str:
+        return f"MesaActor({self._id!r}, {type(self._sala).__name__}, pendientes={self._cola.qsize()})"
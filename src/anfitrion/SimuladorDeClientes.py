@@ -0,0 +1,141 @@
+"""
+Simulador de clientes en el mismo proceso para pruebas de carga del anfitrión.
+
+Abre ``mesas`` salas de KnuckleBones en un AnfitrionDeMesas y, por cada mesa, un
+cliente que juega los dos asientos enviando acciones ('estado', 'lanzar', 'jugar'
+y 'reiniciar') por la cola de la mesa, igual que lo haría un cliente conectado.
+Las columnas las elige una política de PoliticasKnuckleBones; con ``bot`` el
+segundo asiento lo juega el bot de la mesa ('jugar_bot'), así la búsqueda corre
+donde vive la mesa. Sirve tanto para AnfitrionDeMesas como para
+AnfitrionDistribuido.
+"""
+
+import asyncio
+import inspect
+import time
+
+from servidor.src.anfitrion.Accion import Accion
+from servidor.src.anfitrion.AnfitrionDeMesas import AnfitrionDeMesas
+from servidor.src.model.salaDeJuego.juego.PoliticasKnuckleBones import ALEATORIA, crear_politica
+from servidor.src.model.salaDeJuego.juego.TableroKnuckleBones import columna_en_mesa
+from servidor.src.utils.aleatorio import GeneradorSimulacion
+
+
+async def _esperar(valor):
+    # abrir_mesa y get_metricas son corrutinas en AnfitrionDistribuido
+    return await valor if inspect.isawaitable(valor) else valor
+
+
+def _percentil(ordenadas: list, fraccion: float) -> float:
+    if not ordenadas:
+        return 0.0
+    return ordenadas[min(len(ordenadas) - 1, int(fraccion * len(ordenadas)))]
+
+
+async def _cliente(anfitrion, id: str, partidas: int, politica, bot: bool, latencias: list) -> int:
+    acciones = 0
+
+    async def enviar(accion: Accion):
+        nonlocal acciones
+        inicio = time.perf_counter()
+        resultado = await anfitrion.enviar(id, accion)
+        latencias.append(time.perf_counter() - inicio)
+        acciones += 1
+        return resultado
+
+    for _ in range(partidas):
+        terminado = False
+        while not terminado:
+            estado = await enviar(Accion('estado'))
+            jugador = estado['turno']
+            if bot and jugador == 1:
+                terminado = (await enviar(Accion('jugar_bot')))['terminado']
+                continue
+            dado = (await enviar(Accion('lanzar', jugador)))['dado']
+            columna = politica(tuple(estado['estado']), jugador, dado)
+            delta = await enviar(Accion('jugar', jugador, {'columna': columna_en_mesa(jugador, columna)}))
+            terminado = delta['terminado']
+        if partidas > 1:
+            # La siguiente partida empieza con la mesa vacía
+            await enviar(Accion('reiniciar'))
+    return acciones
+
+
+async def simular(
+    mesas: int,
+    partidas_por_mesa: int = 1,
+    semilla: int = None,
+    politica: str = ALEATORIA,
+    bot: bool = False,
+    crear_sala=None,
+    anfitrion=None,
+    **opciones_anfitrion
+) -> dict:
+    """
+    Juega ``partidas_por_mesa`` partidas en cada una de ``mesas`` mesas a la vez.
+
+    Args:
+        mesas (int): Cantidad de mesas
+        partidas_por_mesa (int, optional): Partidas que juega cada cliente
+        semilla (int, optional): Semilla de los dados y de la política
+        politica (str, optional): Política con la que eligen columna los clientes
+        bot (bool, optional): El segundo asiento lo juega el bot de la mesa
+        crear_sala (Callable, optional): ``crear_sala(generador) -> KnuckleBones``.
+            Por defecto KnuckleBones(generador)
+        anfitrion (optional): AnfitrionDeMesas o AnfitrionDistribuido ya iniciado
+            (no se cierra). Por defecto uno nuevo con ``opciones_anfitrion``
+        **opciones_anfitrion: Opciones de AnfitrionDeMesas
+
+    Returns:
+        dict: ``mesas``, ``acciones``, ``tiempo``, ``acciones_por_segundo``,
+        latencias ``latencia_p50`` y ``latencia_p99`` de ida y vuelta en segundos,
+        y las ``metricas`` del anfitrión
+
+    Raises:
+        ValueError: Si la cantidad de mesas no es positiva
+    """
+    if mesas < 1:
+        raise ValueError("La cantidad de mesas debe ser positiva")
+    if crear_sala is None:
+        from servidor.src.model.salaDeJuego.juego.KnuckleBones import KnuckleBones
+        crear_sala = KnuckleBones
+
+    raiz = GeneradorSimulacion(semilla)
+    latencias = []
+    propio = anfitrion is None
+    if propio:
+        anfitrion = AnfitrionDeMesas(**opciones_anfitrion)
+    try:
+        clientes = []
+        for i in range(mesas):
+            id = f"sim-{i}"
+            await _esperar(anfitrion.abrir_mesa(crear_sala(raiz.derivar()), id))
+            clientes.append(_cliente(anfitrion, id, partidas_por_mesa,
+                                     crear_politica(politica, raiz.derivar()), bot, latencias))
+        inicio = time.perf_counter()
+        acciones = sum(await asyncio.gather(*clientes))
+        tiempo = time.perf_counter() - inicio
+        metricas = await _esperar(anfitrion.get_metricas())
+    finally:
+        if propio:
+            await anfitrion.cerrar()
+
+    latencias.sort()
+    return {
+        'mesas': mesas,
+        'acciones': acciones,
+        'tiempo': tiempo,
+        'acciones_por_segundo': acciones / tiempo if tiempo else float('inf'),
+        'latencia_p50': _percentil(latencias, 0.50),
+        'latencia_p99': _percentil(latencias, 0.99),
+        'metricas': metricas
+    }
+
+
+if __name__ == "__main__":
+    resultado = asyncio.run(simular(1000, semilla=1))
+    print(
+        f"{resultado['mesas']} mesas: {resultado['acciones']} acciones en {resultado['tiempo']:.2f} s "
+        f"({resultado['acciones_por_segundo']:.0f}/s), latencia p50 {resultado['latencia_p50'] * 1000:.2f} ms, "
+        f"p99 {resultado['latencia_p99'] * 1000:.2f} ms"
+    )
@@ -0,0 +1,108 @@
+"""
+Proceso trabajador del AnfitrionDistribuido.
+
+Cada trabajador corre su propio bucle de eventos con un AnfitrionDeMesas y recibe
+mensajes del proceso principal por un extremo de ``multiprocessing.Pipe``:
+
+- ``('abrir', id, id_mesa, (sala, contexto))``: empieza a hospedar la sala
+- ``('accion', id, id_mesa, accion_dict)``: encola una acción en la mesa
+- ``('exportar', id, id_mesa, None)``: cierra la mesa tras sus acciones pendientes
+  y responde ``(sala, contexto)`` para migrarla a otro trabajador
+- ``('metricas', id, None, None)``: responde las métricas del anfitrión
+- ``('cerrar', id, None, None)``: cierra todas las mesas y termina
+
+Cada respuesta es ``(id, ok, resultado)``; si ``ok`` es False, ``resultado`` es la
+excepción.
+"""
+
+import asyncio
+import threading
+
+from servidor.src.anfitrion.Accion import Accion
+from servidor.src.anfitrion.AnfitrionDeMesas import AnfitrionDeMesas
+
+ABRIR = 'abrir'
+ACCION = 'accion'
+EXPORTAR = 'exportar'
+METRICAS = 'metricas'
+CERRAR = 'cerrar'
+
+
+def ejecutar_trabajador(conexion, opciones_mesa: dict) -> None:
+    """Punto de entrada del proceso trabajador."""
+    asyncio.run(_atender(conexion, opciones_mesa))
+
+
+def _responder(conexion, id_mensaje: int, ok: bool, resultado) -> None:
+    try:
+        conexion.send((id_mensaje, ok, resultado))
+    except (OSError, EOFError):
+        pass
+    except Exception as e:
+        # El resultado o la excepción no se pudo serializar
+        conexion.send((id_mensaje, False, ValueError(f"Respuesta no serializable: {e}")))
+
+
+async def _atender(conexion, opciones_mesa: dict) -> None:
+    loop = asyncio.get_running_loop()
+    entrada = asyncio.Queue()
+
+    def leer():
+        # recv bloquea, así que se lee en un hilo y se entrega al bucle de eventos
+        while True:
+            try:
+                mensaje = conexion.recv()
+            except (EOFError, OSError):
+                mensaje = (CERRAR, None, None, None)
+            loop.call_soon_threadsafe(entrada.put_nowait, mensaje)
+            if mensaje[0] == CERRAR:
+                return
+
+    threading.Thread(target=leer, name='lector-trabajador', daemon=True).start()
+    anfitrion = AnfitrionDeMesas(**opciones_mesa)
+
+    def al_terminar(id_mensaje: int, futuro: asyncio.Future) -> None:
+        if futuro.cancelled():
+            _responder(conexion, id_mensaje, False, ValueError("La acción fue cancelada"))
+        elif futuro.exception() is not None:
+            _responder(conexion, id_mensaje, False, futuro.exception())
+        else:
+            _responder(conexion, id_mensaje, True, futuro.result())
+
+    async def exportar(id_mensaje: int, id_mesa: str) -> None:
+        try:
+            mesa = anfitrion.get_mesa(id_mesa)
+            sala = await anfitrion.cerrar_mesa(id_mesa)
+        except Exception as e:
+            _responder(conexion, id_mensaje, False, e)
+        else:
+            _responder(conexion, id_mensaje, True, (sala, mesa.get_contexto()))
+
+    exportaciones = set()
+    while True:
+        tipo, id_mensaje, id_mesa, carga = await entrada.get()
+        try:
+            if tipo == ACCION:
+                futuro = anfitrion.enviar_sin_esperar(id_mesa, Accion.from_dict(carga))
+                futuro.add_done_callback(lambda f, id_mensaje=id_mensaje: al_terminar(id_mensaje, f))
+            elif tipo == ABRIR:
+                sala, contexto = carga
+                anfitrion.abrir_mesa(sala, id_mesa).get_contexto().update(contexto)
+                _responder(conexion, id_mensaje, True, None)
+            elif tipo == EXPORTAR:
+                # Se exporta en otra tarea para seguir atendiendo a las demás mesas
+                tarea = asyncio.create_task(exportar(id_mensaje, id_mesa))
+                exportaciones.add(tarea)
+                tarea.add_done_callback(exportaciones.discard)
+            elif tipo == METRICAS:
+                _responder(conexion, id_mensaje, True, anfitrion.get_metricas())
+            elif tipo == CERRAR:
+                await asyncio.gather(*exportaciones)
+                await anfitrion.cerrar()
+                if id_mensaje is not None:
+                    _responder(conexion, id_mensaje, True, None)
+                return
+            else:
+                raise ValueError(f"Mensaje desconocido: {tipo}")
+        except Exception as e:
+            _responder(conexion, id_mensaje, False, e)
@@ -0,0 +1,23 @@
+"""
+Anfitrión asíncrono de mesas: hospeda muchas salas de juego en un proceso,
+cada una como un actor con su propia cola de acciones, o las reparte entre
+varios procesos con AnfitrionDistribuido.
+"""
+
+from .Accion import Accion
+from .MesaActor import MesaActor
+from .AnfitrionDeMesas import AnfitrionDeMesas
+from .AnilloConsistente import AnilloConsistente
+from .AnfitrionDistribuido import AnfitrionDistribuido
+from .AccionesMesa import acciones_por_defecto, en_hilo, jugada_automatica
+
+__all__ = [
+    'Accion',
+    'MesaActor',
+    'AnfitrionDeMesas',
+    'AnilloConsistente',
+    'AnfitrionDistribuido',
+    'acciones_por_defecto',
+    'en_hilo',
+    'jugada_automatica'
+]
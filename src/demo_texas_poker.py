@@ -1,24 +1,9 @@
 import sys
-# --- Monkeypatch para evitar inicialización de Firestore/Firebase ---
-class FakeFirebaseAdmin:
-    def __init__(self):
-        self.credentials = type('fake', (), {'Certificate': lambda *a, **k: None})()
-        self.firestore_async = lambda *a, **k: None
-        self.firestore = lambda *a, **k: None
-    def initialize_app(self, *a, **k):
-        return None
-sys.modules['firebase_admin'] = FakeFirebaseAdmin()
-sys.modules['google'] = type('fake', (), {})()
-sys.modules['google.oauth2'] = type('fake', (), {})()
-sys.modules['google.oauth2.service_account'] = type('fake', (), {'Credentials': type('fake', (), {'from_service_account_info': lambda *a, **k: None})})()
-sys.modules['google.auth'] = type('fake', (), {'exceptions': type('fake', (), {'InvalidValue': Exception})})()
-sys.modules['google.auth.crypt'] = type('fake', (), {})()
-sys.modules['google.auth.crypt.base'] = type('fake', (), {'RSASigner': type('fake', (), {'from_service_account_info': lambda *a, **k: None, 'from_string': lambda *a, **k: None})})()
-sys.modules['google.auth.crypt._cryptography_rsa'] = type('fake', (), {})()
-sys.modules['google.auth._helpers'] = type('fake', (), {'to_bytes': lambda x: x})()
-# --- Fin monkeypatch ---
+# La demo juega sin conexión: los servicios usan el backend en memoria
+from servidor.src.utils.persistencia import configurar_backend
+configurar_backend('memoria')
 
-from ....usuario.Usuario import Usuario
+from servidor.src.model.usuario.Usuario import Usuario
 from servidor.src.model.salaDeJuego.juego.juegosDeCartas.Poker import Poker
 from servidor.src.model.salaDeJuego.enums.Etapas import Etapas
 
@@ -74,8 +59,8 @@ def main():
     apellido1 = input("Apellido jugador 1 (3-30 caracteres): ")
     nombre2 = input("Nombre jugador 2: ")
     apellido2 = input("Apellido jugador 2 (3-30 caracteres): ")
-    jugador1 = Usuario("U1", nombre1, apellido1, 1000)
-    jugador2 = Usuario("U2", nombre2, apellido2, 1000)
+    jugador1 = Usuario("U1", nombre1, apellido1, "jugador1@demo.com", "demo", 1000)
+    jugador2 = Usuario("U2", nombre2, apellido2, "jugador2@demo.com", "demo", 1000)
     poker = Poker("mesa1", 7, 2, 0)  # Capacidad máxima 7, mínima 2
     poker._jugadores = [jugador1, jugador2]
     poker.inicializar_juego()
@@ -133,8 +118,6 @@ def main():
         elif len(acciones_realizadas) == len([j for j in jugadores if any(m['jugador'] == j and m['en_juego'] for m in poker._mano_de_jugadores)]):
             if all(j['apuesta'] == max(j2['apuesta'] for j2 in activos) for j in activos):
                 poker.avanzar_etapa()
-                for j in activos:
-                    j['apuesta'] = 0
                 acciones_realizadas.clear()
         turno += 1
     limpiar()
@@ -145,6 +128,7 @@ def main():
     print("\nHistorial:")
     for h in poker._historial:
         print(h)
+    poker.preguntar_continuar_jugadores()
 
 if __name__ == "__main__":
     main()
@@ -1,9 +1,12 @@
 import asyncio
+import hashlib
+import json
 import uuid
 from .SalaDeJuego import SalaDeJuego
 from datetime import datetime
 from ..usuario import Usuario
-from ...utils.firestore import add_data, add_data_with_id, array_remove, array_union, delete_data, get_data, update_data, get_collection_data, add_realtime_listener, add_collection_listener
+from ...utils.firestore import add_data, add_data_with_id, array_remove, array_union, batch_write, delete_data, get_data, increment, update_data, get_collection_data, add_realtime_listener, add_collection_listener
+from ...utils.persistencia import ACTUALIZAR, CREAR, MAXIMO_LOTE, DocumentoExistente
 
 class SalaDeJuegoServicio:
     """
@@ -119,6 +122,108 @@ class SalaDeJuegoServicio:
         print(f'Sala de juego guardada con ID: {sala_id}')
         return sala_id
 
+    async def liquidar_apuestas(self, sala_id: str, movimientos: list, id_liquidacion: str = None,
+                                cambios_sala: dict = None) -> dict:
+        """
+        Aplica el resultado de una mano a los saldos de varios usuarios de una sola vez.
+
+        Cada movimiento es una tupla (usuario, monto, registro): el usuario (Usuario o
+        su ID), el monto neto a sumar a su saldo (negativo si perdió) y el registro que
+        se agrega a su historial (o None). Los movimientos de un mismo usuario se suman.
+        Todo se escribe en un lote atómico junto con cambios_sala y el documento
+        'liquidaciones/<id>', que se crea en ese mismo lote: si la liquidación ya se
+        aplicó, el lote falla entero y no se repite. El documento guarda la sala y una
+        huella de los montos por usuario, para distinguir un reintento de la misma
+        liquidación de otra distinta que reusa el id. Si no cabe en un lote se parte en
+        varios sin separar el saldo de un usuario de sus registros (salvo si sus
+        registros no caben en un lote; entonces el saldo va con los primeros y cada
+        lote actualiza el resumen de los suyos): la primera parte
+        crea 'liquidaciones/<id>' (con el número de partes) y las demás
+        '<id>-<parte>'. La primera parte siempre se escribe o se comprueba antes que
+        las demás, y reintentar con el mismo id completa las partes que falten.
+
+        Args:
+            sala_id (str): ID de la sala activa.
+            movimientos (list): Tuplas (usuario, monto, registro).
+            id_liquidacion (str, optional): ID para no liquidar dos veces. Por defecto uno nuevo.
+            cambios_sala (dict, optional): Cambios para la sala activa en el mismo lote.
+
+        Returns:
+            dict: 'id' de la liquidación, 'lotes' escritos y 'aplicada' (False si ya estaba aplicada).
+
+        Raises:
+            ValueError: Si no hay movimientos o no existe algún usuario o la sala.
+            DocumentoExistente: Si el id ya es de una liquidación con otros movimientos.
+        """
+        if not movimientos and not cambios_sala:
+            raise ValueError("No hay movimientos para liquidar")
+        por_usuario = {}
+        for usuario, monto, registro in movimientos:
+            usuario_id = usuario.get_id() if isinstance(usuario, Usuario) else usuario
+            cambio = por_usuario.setdefault(usuario_id, {'monto': 0, 'registros': []})
+            cambio['monto'] += monto
+            if registro is not None:
+                cambio['registros'].append(registro)
+        from ..usuario.UsuarioServicio import UsuarioServicio, cambios_resumen, preparar_historial
+        # Cada lote lleva además el documento que marca su parte como aplicada
+        tamaño = MAXIMO_LOTE - 1
+        # Escrituras agrupadas por usuario: el registro va a su historial y el resumen a su
+        # documento. Un grupo nunca pasa de un lote: los registros de más van en otros grupos
+        grupos = []
+        for usuario_id, cambio in por_usuario.items():
+            registros = cambio['registros']
+            creaciones, _ = preparar_historial(usuario_id, registros)
+            for inicio in range(0, len(creaciones), tamaño - 1) if creaciones else [0]:
+                fin = inicio + tamaño - 1
+                datos = cambios_resumen(registros[inicio:fin], creaciones[inicio:fin])
+                if inicio == 0 and cambio['monto']:
+                    datos['saldo'] = increment(cambio['monto'])
+                if datos:
+                    grupos.append(creaciones[inicio:fin] + [(ACTUALIZAR, 'usuarios', usuario_id, datos)])
+        if cambios_sala:
+            grupos.append([(ACTUALIZAR, 'salas_de_juego_activas', sala_id, cambios_sala)])
+
+        id_liquidacion = id_liquidacion or uuid.uuid4().hex
+        huella = hashlib.sha256(json.dumps(
+            [sala_id, sorted((usuario_id, cambio['monto']) for usuario_id, cambio in por_usuario.items())]
+        ).encode('utf-8')).hexdigest()
+        partes = [[]]
+        for grupo in grupos:
+            if partes[-1] and len(partes[-1]) + len(grupo) > tamaño:
+                partes.append([])
+            partes[-1].extend(grupo)
+        lotes = 0
+        for numero, parte in enumerate(partes):
+            assert len(parte) < MAXIMO_LOTE, "cada parte de la liquidación debe ser un solo lote"
+            # La marca de la primera parte no depende de cuántas partes hay
+            marca = id_liquidacion if numero == 0 else f'{id_liquidacion}-{numero}'
+            registro = {
+                'sala': sala_id,
+                'parte': numero,
+                'partes': len(partes),
+                'huella': huella,
+                'usuarios': [usuario_id for _, coleccion, usuario_id, _ in parte if coleccion == 'usuarios'],
+                'fecha': datetime.now()
+            }
+            try:
+                await batch_write([(CREAR, 'liquidaciones', marca, registro)] + parte)
+                lotes += 1
+            except DocumentoExistente:
+                existente = await get_data('liquidaciones', marca)
+                # Las marcas anteriores a la huella solo se comparan por sala
+                if existente is None or existente.get('sala') != sala_id \
+                        or existente.get('huella', huella) != huella \
+                        or existente.get('partes', len(partes)) != len(partes):
+                    raise DocumentoExistente(
+                        f"La liquidación {marca} ya existe con otros movimientos; no se aplicó esta"
+                    )
+                continue
+
+        for usuario_id in por_usuario:
+            UsuarioServicio.invalidar_cache_usuario(usuario_id)
+        print(f'Liquidación {id_liquidacion} de la sala {sala_id}: {lotes} de {len(partes)} lotes escritos')
+        return {'id': id_liquidacion, 'lotes': lotes, 'aplicada': lotes > 0}
+
     async def obtener_sala_de_juegos_activa(self, id: str) -> SalaDeJuego:
         """
         Obtiene una sala de juego de la colección 'salas_de_juego' en Firestore.
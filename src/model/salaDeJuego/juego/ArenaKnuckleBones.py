@@ -0,0 +1,159 @@
+"""
+Arena de partidas de KnuckleBones sin interacción, para comparar y ajustar bots.
+
+Juega partidas completas entre dos políticas de ``PoliticasKnuckleBones`` sobre el
+estado compacto, sin imprimir ni pedir entrada, repartidas entre varios procesos.
+Las partidas se dividen en bloques de tamaño fijo, cada uno con su propia semilla
+derivada de la semilla de la arena, por lo que el resultado no depende de la
+cantidad de procesos. Las políticas alternan quién empieza.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from math import sqrt
+
+from servidor.src.model.salaDeJuego.juego.PoliticasKnuckleBones import crear_politica
+from servidor.src.model.salaDeJuego.juego.TableroKnuckleBones import VACIO, jugar, puntos_de, terminado
+from servidor.src.utils.aleatorio import GeneradorAleatorio, GeneradorSimulacion
+
+# Partidas por bloque con semilla propia
+TAMANO_BLOQUE = 500
+
+
+def jugar_partida(politica_0, politica_1, generador: GeneradorAleatorio) -> tuple:
+    """
+    Juega una partida completa; el jugador 0 empieza.
+
+    Returns:
+        tuple: Los puntos finales de cada jugador
+    """
+    politicas = (politica_0, politica_1)
+    estado, jugador = VACIO, 0
+    while not terminado(estado):
+        dado = generador.entero(1, 6)
+        estado = jugar(estado, jugador, politicas[jugador](estado, jugador, dado), dado)
+        jugador = 1 - jugador
+    return puntos_de(estado[0]), puntos_de(estado[1])
+
+
+def _jugar_bloque(argumentos: tuple) -> tuple:
+    # Se ejecuta en los procesos de la arena: crea sus propias políticas y generador
+    import numpy as np
+
+    entropia, indice, primera, cantidad, politica_a, politica_b, opciones_a, opciones_b = argumentos
+    generador = GeneradorSimulacion(np.random.SeedSequence([entropia, indice]))
+    a = crear_politica(politica_a, generador.derivar(), **opciones_a)
+    b = crear_politica(politica_b, generador.derivar(), **opciones_b)
+    victorias = empates = derrotas = victorias_empezando = partidas_empezando = 0
+    diferencia = 0
+    for partida in range(primera, primera + cantidad):
+        # A empieza en las partidas pares
+        if partida % 2 == 0:
+            puntos_a, puntos_b = jugar_partida(a, b, generador)
+            partidas_empezando += 1
+        else:
+            puntos_b, puntos_a = jugar_partida(b, a, generador)
+        diferencia += puntos_a - puntos_b
+        if puntos_a > puntos_b:
+            victorias += 1
+            victorias_empezando += partida % 2 == 0
+        elif puntos_a == puntos_b:
+            empates += 1
+        else:
+            derrotas += 1
+    return victorias, empates, derrotas, victorias_empezando, partidas_empezando, diferencia
+
+
+def intervalo_wilson(exitos: int, total: int, z: float = 1.96) -> tuple:
+    """
+    Intervalo de confianza de Wilson para una proporción (95% por defecto).
+
+    Returns:
+        tuple: (inferior, superior)
+    """
+    if total == 0:
+        return 0.0, 1.0
+    p = exitos / total
+    denominador = 1 + z * z / total
+    centro = (p + z * z / (2 * total)) / denominador
+    margen = z * sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / denominador
+    return max(0.0, centro - margen), min(1.0, centro + margen)
+
+
+def enfrentar(
+    politica_a: str,
+    politica_b: str,
+    partidas: int,
+    procesos: int = None,
+    semilla: int = None,
+    opciones_a: dict = None,
+    opciones_b: dict = None
+) -> dict:
+    """
+    Enfrenta dos políticas en ``partidas`` partidas sin interacción.
+
+    Args:
+        politica_a (str): Política A ('aleatoria', 'heuristica' o 'busqueda')
+        politica_b (str): Política B
+        partidas (int): Cantidad de partidas
+        procesos (int, optional): Procesos a usar. Por defecto os.cpu_count()
+        semilla (int, optional): Semilla para reproducir el enfrentamiento
+        opciones_a (dict, optional): Opciones de la política A (por ejemplo, profundidad)
+        opciones_b (dict, optional): Opciones de la política B
+
+    Returns:
+        dict: ``partidas``, ``victorias``, ``empates``, ``derrotas`` (de A),
+        ``tasa_victoria`` con su ``intervalo_victoria`` de Wilson al 95%,
+        ``tasa_victoria_empezando``, ``diferencia_media``, ``semilla``,
+        ``tiempo`` y ``partidas_por_segundo``
+
+    Raises:
+        ValueError: Si la cantidad de partidas no es positiva
+    """
+    import numpy as np
+
+    if partidas < 1:
+        raise ValueError("La cantidad de partidas debe ser positiva")
+    entropia = np.random.SeedSequence(semilla).entropy
+    bloques = [
+        (entropia, i, primera, min(TAMANO_BLOQUE, partidas - primera),
+         politica_a, politica_b, opciones_a or {}, opciones_b or {})
+        for i, primera in enumerate(range(0, partidas, TAMANO_BLOQUE))
+    ]
+    procesos = max(1, min(procesos or os.cpu_count() or 1, len(bloques)))
+
+    inicio = time.perf_counter()
+    if procesos == 1:
+        resultados = list(map(_jugar_bloque, bloques))
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as executor:
+            resultados = list(executor.map(_jugar_bloque, bloques))
+    tiempo = time.perf_counter() - inicio
+
+    victorias, empates, derrotas, victorias_empezando, partidas_empezando, diferencia = map(sum, zip(*resultados))
+    return {
+        'partidas': partidas,
+        'victorias': victorias,
+        'empates': empates,
+        'derrotas': derrotas,
+        'tasa_victoria': victorias / partidas,
+        'intervalo_victoria': intervalo_wilson(victorias, partidas),
+        'tasa_empate': empates / partidas,
+        'tasa_derrota': derrotas / partidas,
+        'tasa_victoria_empezando': victorias_empezando / partidas_empezando if partidas_empezando else 0.0,
+        'diferencia_media': diferencia / partidas,
+        'semilla': entropia,
+        'tiempo': tiempo,
+        'partidas_por_segundo': partidas / tiempo if tiempo else float('inf')
+    }
+
+
+if __name__ == "__main__":
+    resultado = enfrentar('busqueda', 'heuristica', 2000, semilla=1)
+    inferior, superior = resultado['intervalo_victoria']
+    print(
+        f"Búsqueda vs heurística: {resultado['tasa_victoria']:.1%} de victorias "
+        f"[{inferior:.1%}, {superior:.1%}] en {resultado['partidas']} partidas "
+        f"({resultado['partidas_por_segundo']:.0f} partidas/s)"
+    )
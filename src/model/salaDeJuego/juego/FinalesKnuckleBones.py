@@ -0,0 +1,255 @@
+"""
+Tabla de finales de KnuckleBones resuelta de forma exacta.
+
+Un par de columnas enfrentadas en el que ambas están llenas queda congelado:
+ningún jugador puede volver a poner ahí, así que tampoco se quitan dados y sus
+puntos no cambian. Cuando dos de los tres pares están congelados, el resto del
+juego ocurre en un único par abierto y su valor depende solo de las dos columnas
+abiertas y de la diferencia de puntos congelada. Esos finales (como mucho seis
+casillas vacías) forman un conjunto cerrado, que se resuelve por iteración de
+valores: las quitas pueden repetir posiciones, por lo que no basta una recursión.
+
+La tabla guarda, para el jugador que va a tirar el dado, el valor esperado
+exacto con la misma utilidad que ``KnuckleBonesBot`` (``utilidad_final``), en un
+arreglo ``[diferencia + MAX_DIFERENCIA, columna_propia, columna_rival]``. Se
+genera fuera de línea con varios procesos (``generar_tabla``) en un archivo
+``.npy`` que el bot abre como memoria mapeada y consulta en O(1).
+
+Requiere NumPy.
+"""
+
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from servidor.src.model.salaDeJuego.juego.TableroKnuckleBones import (
+    CANTIDAD, CARAS, PONER, PUNTOS, QUITAR, VICTORIA, columnas, puntos_de
+)
+from servidor.src.utils.cache_disco import directorio_cache
+
+# Columnas con espacio libre: son los códigos 0-27 (hasta dos dados)
+COLUMNAS_ABIERTAS = sum(1 for cantidad in CANTIDAD if cantidad < 3)
+# Diferencia máxima de un par congelado: [6, 6, 6] contra [1, 2, 3]
+_MAX_PAR = max(PUNTOS) - min(p for p, c in zip(PUNTOS, CANTIDAD) if c == 3)
+MAX_DIFERENCIA = 2 * _MAX_PAR
+
+_VERSION = 1
+
+_cargadas = {}
+
+
+def ruta_por_defecto() -> str:
+    """Retorna la ruta del archivo de la tabla dentro de la caché en disco."""
+    return os.path.join(directorio_cache(), 'knucklebones', f'finales_v{_VERSION}.npy')
+
+
+def _transiciones():
+    # Para cada (columna propia, columna rival, dado): columnas después de la jugada
+    import numpy as np
+
+    forma = (COLUMNAS_ABIERTAS, COLUMNAS_ABIERTAS, 6)
+    propia = np.zeros(forma, dtype=np.intp)
+    rival = np.zeros(forma, dtype=np.intp)
+    terminal = np.zeros(forma, dtype=bool)
+    delta = np.zeros(forma, dtype=np.int64)
+    for cp in range(COLUMNAS_ABIERTAS):
+        for cr in range(COLUMNAS_ABIERTAS):
+            for k, dado in enumerate(CARAS):
+                nueva_propia, nueva_rival = PONER[cp][dado], QUITAR[cr][dado]
+                terminal[cp, cr, k] = CANTIDAD[nueva_propia] == 3
+                propia[cp, cr, k] = min(nueva_propia, COLUMNAS_ABIERTAS - 1)
+                rival[cp, cr, k] = nueva_rival
+                delta[cp, cr, k] = PUNTOS[nueva_propia] - PUNTOS[nueva_rival]
+    return propia, rival, terminal, delta
+
+
+def _resolver_fragmento(magnitudes: list, tolerancia: float = 1e-10, max_iteraciones: int = 100_000) -> tuple:
+    """
+    Resuelve los finales con diferencia congelada ±m para cada m de ``magnitudes``.
+    D y -D van juntas porque el turno del rival ve la diferencia con signo opuesto.
+
+    Returns:
+        tuple: (diferencias, valores) con valores de forma [len(diferencias), 28, 28]
+    """
+    import numpy as np
+
+    diferencias = sorted({s * m for m in magnitudes for s in (1, -1)})
+    fila = {d: i for i, d in enumerate(diferencias)}
+    opuesta = np.array([fila[-d] for d in diferencias], dtype=np.intp)
+    propia, rival, terminal, delta = _transiciones()
+
+    # Utilidad de los finales que se alcanzan con cada dado
+    final = np.array(diferencias, dtype=np.int64)[:, None, None, None] + delta[None]
+    utilidad = final + np.sign(final) * VICTORIA
+
+    valores = np.zeros((len(diferencias), COLUMNAS_ABIERTAS, COLUMNAS_ABIERTAS))
+    for _ in range(max_iteraciones):
+        # Después de la jugada tira el rival, con sus columnas y la diferencia invertidas
+        continuar = -valores[opuesta][:, rival, propia]
+        nuevos = np.where(terminal[None], utilidad, continuar).mean(axis=3)
+        cambio = np.abs(nuevos - valores).max()
+        valores = nuevos
+        if cambio < tolerancia:
+            break
+    return diferencias, valores
+
+
+def generar_tabla(ruta: str = None, procesos: int = None) -> str:
+    """
+    Genera la tabla de finales repartiendo las diferencias entre procesos.
+
+    Args:
+        ruta (str, optional): Archivo .npy de salida. Por defecto ruta_por_defecto()
+        procesos (int, optional): Procesos a usar. Por defecto os.cpu_count()
+
+    Returns:
+        str: La ruta del archivo generado
+    """
+    import numpy as np
+
+    ruta = ruta or ruta_por_defecto()
+    procesos = max(1, procesos or os.cpu_count() or 1)
+    magnitudes = list(range(MAX_DIFERENCIA + 1))
+    fragmentos = [magnitudes[i::procesos] for i in range(procesos) if magnitudes[i::procesos]]
+    if procesos == 1:
+        resultados = map(_resolver_fragmento, fragmentos)
+    else:
+        executor = ProcessPoolExecutor(max_workers=procesos)
+        resultados = executor.map(_resolver_fragmento, fragmentos)
+
+    directorio = os.path.dirname(ruta) or '.'
+    os.makedirs(directorio, exist_ok=True)
+    descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix='.npy')
+    os.close(descriptor)
+    try:
+        tabla = np.lib.format.open_memmap(
+            temporal, mode='w+', dtype=np.float64,
+            shape=(2 * MAX_DIFERENCIA + 1, COLUMNAS_ABIERTAS, COLUMNAS_ABIERTAS)
+        )
+        for diferencias, valores in resultados:
+            for i, diferencia in enumerate(diferencias):
+                tabla[diferencia + MAX_DIFERENCIA] = valores[i]
+        tabla.flush()
+        del tabla
+        os.replace(temporal, ruta)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+    finally:
+        if procesos > 1:
+            executor.shutdown()
+    return ruta
+
+
+def _par_abierto(propio: int, rival: int):
+    # Índice del único par no congelado y códigos de columnas, o None
+    cp, cr = columnas(propio), columnas(rival)
+    abierto = None
+    for i in range(3):
+        if CANTIDAD[cp[i]] < 3 or CANTIDAD[cr[i]] < 3:
+            if abierto is not None:
+                return None
+            abierto = i
+    if abierto is None or CANTIDAD[cp[abierto]] == 3 or CANTIDAD[cr[abierto]] == 3:
+        return None
+    return cp[abierto], cr[abierto]
+
+
+class TablaFinales:
+    """
+    Valores exactos de los finales con un solo par de columnas abierto.
+    """
+
+    def __init__(self, valores, ruta: str = None):
+        """
+        Args:
+            valores (numpy.ndarray): Tabla generada por generar_tabla (puede ser un memmap)
+            ruta (str, optional): Archivo del que se cargó la tabla
+        """
+        self._valores = valores
+        self._ruta = ruta
+
+    def __reduce__(self):
+        # En otro proceso se vuelve a abrir el archivo en lugar de copiar la tabla
+        if self._ruta is not None:
+            return TablaFinales.cargar, (self._ruta, False)
+        return TablaFinales, (self._valores,)
+
+    @classmethod
+    def cargar(cls, ruta: str = None, generar: bool = False) -> 'TablaFinales':
+        """
+        Abre la tabla como memoria mapeada, una sola vez por proceso.
+
+        Args:
+            ruta (str, optional): Archivo de la tabla. Por defecto ruta_por_defecto()
+            generar (bool, optional): Si no existe, generarla en este proceso. Por
+                defecto False: la tabla se genera fuera de línea (generar_tabla)
+
+        Returns:
+            TablaFinales: La tabla, o None si no existe (y no se genera) o falta NumPy
+        """
+        ruta = ruta or ruta_por_defecto()
+        if ruta not in _cargadas:
+            try:
+                import numpy as np
+            except ImportError:
+                return None
+            if not os.path.exists(ruta):
+                if not generar:
+                    return None
+                generar_tabla(ruta, procesos=1)
+            _cargadas[ruta] = cls(np.load(ruta, mmap_mode='r'), ruta)
+        return _cargadas[ruta]
+
+    def valor(self, diferencia_congelada: int, columna_propia: int, columna_rival: int) -> float:
+        """
+        Valor esperado para el jugador que va a tirar, antes de conocer el dado.
+
+        Args:
+            diferencia_congelada (int): Puntos propios menos los del rival en los pares congelados
+            columna_propia (int): Código de la columna abierta del jugador
+            columna_rival (int): Código de la columna abierta del rival
+        """
+        return float(self._valores[diferencia_congelada + MAX_DIFERENCIA, columna_propia, columna_rival])
+
+    def valor_estado(self, estado: tuple, jugador: int):
+        """
+        Valor exacto del estado para el jugador que va a tirar.
+
+        Returns:
+            float: El valor, o None si el estado no es un final de la tabla
+        """
+        propio, rival = estado[jugador], estado[1 - jugador]
+        par = _par_abierto(propio, rival)
+        if par is None:
+            return None
+        cp, cr = par
+        congelada = puntos_de(propio) - puntos_de(rival) - PUNTOS[cp] + PUNTOS[cr]
+        return self.valor(congelada, cp, cr)
+
+    def valor_tras_jugada(self, propio: int, rival: int, diferencia: int):
+        """
+        Valor exacto, para quien acaba de jugar, de la posición en la que tira el rival.
+
+        Args:
+            propio (int): Tablero de quien jugó
+            rival (int): Tablero del rival
+            diferencia (int): Puntos de quien jugó menos los del rival
+
+        Returns:
+            float: El valor, o None si la posición no es un final de la tabla
+        """
+        par = _par_abierto(propio, rival)
+        if par is None:
+            return None
+        cp, cr = par
+        congelada = diferencia - PUNTOS[cp] + PUNTOS[cr]
+        return -self.valor(-congelada, cr, cp)
+
+
+if __name__ == "__main__":
+    import time
+
+    inicio = time.perf_counter()
+    print(f"Tabla de finales generada en {generar_tabla()} ({time.perf_counter() - inicio:.2f} s)")
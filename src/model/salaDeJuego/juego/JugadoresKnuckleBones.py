@@ -0,0 +1,119 @@
+"""
+Jugadores que deciden las jugadas de una partida de KnuckleBones.
+
+``KnuckleBones.juego`` y ``KnuckleBones.juego_async`` piden a cada jugador la
+columna (índice de la mesa, 0-2) donde poner el dado que le salió. Un jugador
+puede ser una persona en la consola, un bot o una política, o un cliente remoto
+que envía sus jugadas por una cola de asyncio.
+"""
+
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable
+
+from servidor.src.model.salaDeJuego.juego.TableroKnuckleBones import columna_en_mesa
+
+
+class JugadorKnuckleBones(ABC):
+    """
+    Fuente de jugadas de un jugador de KnuckleBones.
+    """
+
+    @abstractmethod
+    def elegir(self, juego, jugador: int, dado: int) -> int:
+        """
+        Retorna la columna de la mesa (0-2) donde el jugador pone el dado.
+
+        Args:
+            juego (KnuckleBones): La partida
+            jugador (int): Índice del jugador en turno
+            dado (int): Valor del dado
+        """
+        pass
+
+    async def elegir_async(self, juego, jugador: int, dado: int) -> int:
+        """
+        Versión asíncrona de elegir. Por defecto decide sin esperar.
+        """
+        return self.elegir(juego, jugador, dado)
+
+
+class JugadorHumano(JugadorKnuckleBones):
+    """
+    Jugador que ingresa la posición por consola.
+    """
+
+    def __init__(self, entrada: Callable = None, salida: Callable = None):
+        """
+        Args:
+            entrada (Callable, optional): Función que lee la respuesta. Por defecto input
+            salida (Callable, optional): Función para los avisos. Por defecto print
+        """
+        self._entrada = entrada
+        self._salida = salida
+
+    def elegir(self, juego, jugador: int, dado: int) -> int:
+        entrada, salida = self._entrada or input, self._salida or print
+        libres = juego.columnas_libres(jugador)
+        while True:
+            respuesta = entrada('Ingrese la posición donde desea poner el dado (1,2,3): ')
+            try:
+                columna = int(respuesta) - 1
+            except ValueError:
+                columna = None
+            if columna in libres:
+                return columna
+            salida(f"Posición inválida. Posiciones libres: {[c + 1 for c in libres]}")
+
+
+class JugadorBot(JugadorKnuckleBones):
+    """
+    Jugador automático que usa una política de PoliticasKnuckleBones o, por
+    defecto, el KnuckleBonesBot de la mesa.
+    """
+
+    def __init__(self, politica: Callable = None):
+        """
+        Args:
+            politica (Callable, optional): ``politica(estado, jugador, dado) -> columna lógica``
+        """
+        self._politica = politica
+
+    def elegir(self, juego, jugador: int, dado: int) -> int:
+        politica = self._politica or juego.get_bot().elegir_columna
+        return columna_en_mesa(jugador, politica(juego.get_estado(), jugador, dado))
+
+
+class JugadorRemoto(JugadorKnuckleBones):
+    """
+    Jugador cuyas jugadas llegan por una cola de asyncio (por ejemplo, desde un
+    cliente conectado al servidor). Solo puede usarse con ``juego_async``.
+    """
+
+    def __init__(self, cola: asyncio.Queue = None, notificar: Callable[[dict], Awaitable] = None):
+        """
+        Args:
+            cola (asyncio.Queue, optional): Cola por la que llegan las columnas elegidas
+            notificar (Callable, optional): Corrutina que recibe el turno
+                (``jugador``, ``dado`` y ``estado``) antes de esperar la jugada
+        """
+        self._cola = cola or asyncio.Queue()
+        self._notificar = notificar
+
+    def get_cola(self) -> asyncio.Queue:
+        return self._cola
+
+    def enviar(self, columna: int) -> None:
+        """Entrega la columna elegida por el cliente remoto."""
+        self._cola.put_nowait(columna)
+
+    def elegir(self, juego, jugador: int, dado: int) -> int:
+        raise ValueError("Un jugador remoto solo puede jugar con juego_async")
+
+    async def elegir_async(self, juego, jugador: int, dado: int) -> int:
+        if self._notificar is not None:
+            await self._notificar({'jugador': jugador, 'dado': dado, 'estado': list(juego.get_estado())})
+        while True:
+            columna = await self._cola.get()
+            if columna in juego.columnas_libres(jugador):
+                return columna
@@ -1,8 +1,10 @@
-import copy
 from servidor.src.model.salaDeJuego.SalaDeJuego import SalaDeJuego
 from servidor.src.model.usuario import Usuario
-from servidor.src.utils.Util import generador_random
+from servidor.src.utils.aleatorio import GeneradorAleatorio, GeneradorSeguro
 from servidor.src.model.salaDeJuego.SalaDeJuegoServicio import SalaDeJuegoServicio
+from servidor.src.model.salaDeJuego.juego.KnuckleBonesBot import KnuckleBonesBot
+from servidor.src.model.salaDeJuego.juego.FinalesKnuckleBones import TablaFinales
+from servidor.src.model.salaDeJuego.juego.TableroKnuckleBones import a_mesa, columna_en_mesa, desde_mesa, PUNTOS_CELDAS
 
 
 class KnuckleBones(SalaDeJuego):
@@ -10,8 +12,10 @@ class KnuckleBones(SalaDeJuego):
     _cantidad_de_dados_puestos: list
     _turno: int
     _historial: list
+    _generador: GeneradorAleatorio
+    _bot: KnuckleBonesBot
 
-    def __init__(self):
+    def __init__(self, generador: GeneradorAleatorio = None, bot: KnuckleBonesBot = None, finales: TablaFinales = None):
         # from cliente.utils.user_session import UserSessionManager
         # usuario_data = UserSessionManager().load_user_session()
         super().__init__(2, 2)  # KnuckleBones requiere exactamente 2 jugadores
@@ -32,12 +36,26 @@ class KnuckleBones(SalaDeJuego):
         self._cantidad_de_dados_puestos = [0, 0]
         self._turno = 0
         self._historial = []  # Inicializar el historial
+        # Flujo aleatorio propio de la mesa; GeneradorSimulacion con semilla para repetir partidas
+        self._generador = generador or GeneradorSeguro()
+        # Cada mesa tiene su propio bot para no compartir la tabla de transposición;
+        # la tabla de finales (de solo lectura) se comparte en el proceso. Crear una
+        # mesa no la genera: se usa si ya existe (python -m ...FinalesKnuckleBones)
+        if bot is None:
+            bot = KnuckleBonesBot(finales=finales if finales is not None else TablaFinales.cargar(generar=False))
+        self._bot = bot
         # usuario = Usuario().from_dict(usuario_data)
         # self.entrar_sala_de_juego(usuario)
 
     def get_mesa_de_juego(self) -> list:
         return self._mesa_de_juego
 
+    def get_estado(self) -> tuple:
+        """
+        Retorna el estado compacto e inmutable de la mesa (ver TableroKnuckleBones).
+        """
+        return desde_mesa(self._mesa_de_juego)
+
     def get_oponente_index(self) -> int:
         if self.get_jugador_activo_index() == 0:
             return 1
@@ -80,167 +98,79 @@ class KnuckleBones(SalaDeJuego):
                     self._cantidad_de_dados_puestos[index_activo] -= 1
         return mesa_de_jugador
 
-    def determinar_ganador(self, mesa_de_juego: list) -> str:
-        puntos_jugador = self.sumar_puntos(mesa_de_juego[self.get_jugador_activo_index()])
-        puntos_oponente = self.sumar_puntos(mesa_de_juego[self.get_oponente_index()])
-        self.print_mesa()
-        mesaje = ''
-        if puntos_jugador > puntos_oponente:
-            mesaje = f'El jugador {self.get_jugadores()[self.get_jugador_activo_index()].get_id()} ha ganado'
-        elif puntos_jugador < puntos_oponente:
-            mesaje = f'El jugador {self.get_jugadores()[self.get_oponente_index()].get_id()} ha ganado'
-        else:
-            mesaje = 'Es un empate'
-        return mesaje
+    def determinar_ganador(self, mesa_de_juego: list, mostrar: bool = True) -> str:
+        puntos = [self.sumar_puntos(mesa_de_juego[0]), self.sumar_puntos(mesa_de_juego[1])]
+        if mostrar:
+            self.print_mesa()
+        if puntos[0] == puntos[1]:
+            return 'Es un empate'
+        ganador = 0 if puntos[0] > puntos[1] else 1
+        return f'El jugador {self._nombre_jugador(ganador)} ha ganado'
+
+    def _nombre_jugador(self, jugador: int) -> str:
+        # Las partidas sin usuarios (por ejemplo, entre bots) se muestran por índice
+        jugadores = self.get_jugadores()
+        return jugadores[jugador].get_id() if jugador < len(jugadores) else str(jugador)
+
+    def get_jugador_en_turno(self) -> int:
+        if self._turnoActivo is not None and len(self.get_jugadores()) == 2:
+            return self.get_jugador_activo_index()
+        return self._turno % 2
+
+    def reiniciar_mesa(self) -> None:
+        """
+        Vacía la mesa para jugar otra partida con los mismos jugadores.
+        """
+        self._mesa_de_juego = [[[0, 0, 0] for _ in range(3)] for _ in range(2)]
+        self._cantidad_de_dados_puestos = [0, 0]
+        self._turno = 0
+        if self.get_jugadores():
+            self.set_turnoActivo(self.get_jugadores()[0])
+
+    def get_bot(self) -> KnuckleBonesBot:
+        return self._bot
+
+    def columnas_libres(self, jugador: int) -> list:
+        """
+        Retorna las posiciones de la mesa (0-2) donde el jugador todavía puede poner.
+        """
+        return [c for c in range(3) if 0 in self._mesa_de_juego[jugador][c]]
 
     def knuckle_bot(self, dado: int, mesaJuego: list) -> dict:
+        """
+        Elige con búsqueda expectiminimax (KnuckleBonesBot) la columna del jugador
+        activo para el dado. La jugada la aplica quien llama.
+
+        Returns:
+            dict: Puntos actuales, valor esperado de cada columna, profundidad
+            alcanzada y la posición elegida
+        """
+        index_activo = self.get_jugador_activo_index()
+        estado = desde_mesa(mesaJuego)
+        columna = self._bot.elegir_columna(estado, index_activo, dado)
+        busqueda = self._bot.get_ultima_busqueda()
+        posicion = columna_en_mesa(index_activo, columna)
+        puntaje_nodos = [0, 0, 0]
+        for c, valor in busqueda['valores'].items():
+            puntaje_nodos[columna_en_mesa(index_activo, c)] = round(valor, 2)
         historial = {
-            'puntaje_nodos': [0,0,0],
-            'puntos_bot': self.sumar_puntos(mesaJuego[self.get_jugador_activo_index()]),
+            'puntaje_nodos': puntaje_nodos,
+            'puntos_bot': self.sumar_puntos(mesaJuego[index_activo]),
             'puntos_jugador': self.sumar_puntos(mesaJuego[self.get_oponente_index()]),
+            'profundidad': busqueda['profundidad'],
+            'posicion': posicion
         }
-        proyeccion_jugador = self.proyector_de_jugadas_del_jugador(mesaJuego, self.get_oponente_index())
-        posicion = self.knuckle_bot_think(0, proyeccion_jugador, self._mesa_de_juego, historial, dado)
         print(f'El bot eligió la posición {posicion+1}')
-        self.poner_dado(self._mesa_de_juego[self.get_jugador_activo_index()], posicion, dado)
-        # if callback == []:
-        #     historial['puntaje_nodos'].remove(posicion)
-        #     callback = self.poner_dado(self._mesa_de_juego[self.get_jugador_activo_index()], historial['puntaje_nodos'], dado)
-        historial['posicion'] = posicion
-
         return historial
 
-    def knuckle_bot_think(self, posicion: int, proyeccion_jugador: list, mesa_de_juego: list, historial: dict, dado: int) -> int:
-        valores = (historial['puntaje_nodos'], historial['puntos_bot'], historial['puntos_jugador'])
-        puntaje, puntos_bot, puntos_jugador = valores
-        
-        if posicion == 3:
-            maximo = max(puntaje)
-            return puntaje.index(maximo)
-        else:
-            # Inicializar el puntaje de esta posición en 0 para evitar acumulaciones incorrectas
-            puntaje[posicion] = 0
-            
-            # Evaluar cada posible jugada del jugador y su impacto
-            for jugada_proyectada in proyeccion_jugador:
-                proyeccion = self.proyector_de_jugada(mesa_de_juego, jugada_proyectada, posicion, dado)
-                if proyeccion == {}:
-                    continue
-                puntos_proyectados_bot, puntos_proyectados_jugador = proyeccion['puntos_proyectados']
-                diferencia_de_puntos_proyectados_jugador, diferencia_de_puntos_proyectados_bot = proyeccion['diferencia_de_puntos_proyectados']
-
-                if puntos_bot < puntos_jugador:
-                    # el bot va perdiendo
-                    if puntos_proyectados_bot > puntos_bot:
-                        puntaje[posicion] += puntos_proyectados_bot * 9 /1 if puntos_proyectados_jugador == 0 else puntos_proyectados_jugador
-                    elif puntos_proyectados_bot == puntos_proyectados_jugador:
-                        puntaje[posicion] += 5
-                    else:
-                        puntaje[posicion] -= puntos_proyectados_bot * 9 / 1 if puntos_proyectados_jugador == 0 else puntos_proyectados_jugador
-
-                elif puntos_bot > puntos_jugador:
-                    # el bot va ganando
-                    puntaje[posicion] += 10
-
-                else:
-                    # el bot va empatando
-                    puntaje[posicion] += 0
-
-            # Añadir bonificación por el estado de la columna
-            puntuacion_columna = self.columna_optima(mesa_de_juego[self.get_jugador_activo_index()][posicion])
-            puntaje[posicion] += puntuacion_columna
-
-            # Añadir bonificación por comparación con columna paralela
-            columna_del_jugador_opuesto = mesa_de_juego[self.get_oponente_index()][posicion]
-            columna_del_jugador_activo = mesa_de_juego[self.get_jugador_activo_index()][posicion]
-            puntaje[posicion] += self.columna_paralela(columna_del_jugador_opuesto, columna_del_jugador_activo, puntuacion_columna, dado)
-
-            # Pasar a la siguiente posición
-            return self.knuckle_bot_think(posicion + 1, proyeccion_jugador, mesa_de_juego, historial, dado)
-
-    def proyector_de_jugada(self, mesa_de_juego: list, jugada_proyectada: list, posicion: int, dado: int) -> dict:
-        mesa = copy.deepcopy(mesa_de_juego)
-        # Simular colocación del dado del bot
-        bot = self.poner_dado(mesa[self.get_jugador_activo_index()], posicion, dado, False)
-        
-        if bot == []:
-            return {}
-
-        # Simular eliminación de dados del jugador
-        jugador = self.__eliminar_dado(mesa[self.get_oponente_index()], posicion, dado, False)
-        
-        jugador = self.poner_dado(jugador, jugada_proyectada[0], jugada_proyectada[1], False)
-
-        # Simular la jugada de respuesta del jugador y su impacto en el bot
-        bot = self.__eliminar_dado(bot, jugada_proyectada[0], jugada_proyectada[1], False)
-        
-        # Calcular puntuaciones resultantes después de estas jugadas
-        puntos_proyectados_jugador = self.sumar_puntos(jugador)
-        puntos_proyectados_bot = self.sumar_puntos(bot)
-        return { 
-            'puntos_proyectados': [ puntos_proyectados_jugador, puntos_proyectados_bot],
-            'mesa_de_juego_proyectada': [jugador , bot],
-            'diferencia_de_puntos_proyectados': [
-                puntos_proyectados_jugador - puntos_proyectados_bot,
-                puntos_proyectados_bot - puntos_proyectados_jugador 
-            ]
-        }
-
-    def columna_optima(self, columna_del_jugador_activo: list) -> int:
-        contador = 0
-        for i in range(3):
-            if columna_del_jugador_activo[i] == 0:
-                contador +=1
-        if contador == 3:
-            return 2
-        elif contador == 2:
-            return 1
-        elif contador == 1:
-            return 0
-        else:
-            return -2
-
-    def columna_paralela(self, columna_del_jugador_opuesto: list, columna_del_jugador_activo: list, puntuacion_columna: int, dado: int) -> int:
-        contador = 0
-        for i in range(3):
-            if columna_del_jugador_opuesto[i] > dado and columna_del_jugador_opuesto[i] != 0:
-                contador -= 1
-
-            if puntuacion_columna == 1 or puntuacion_columna == 0:
-                if columna_del_jugador_activo[i] < dado and columna_del_jugador_activo[i] != 0:
-                    contador -= 1
-
-        return contador
-
-    def proyector_de_jugadas_del_jugador(self, mesaDeJuego: list, indice_jugador: int) -> list:
-        jugadas = []
-        for i in range(6):
-            for j in range(3):
-                for k in range(3):
-                    if mesaDeJuego[indice_jugador][j][k] == 0:
-                        jugadas.append([ j, i + 1])
-                        break
-        return jugadas
-
     def sumar_puntos(self, mesa_del_jugador: list) -> int:
-        puntos = 0
-        for i in range(3):
-            sum_aux = 0
-            contador = 0
-            for j in range(3):
-                if(mesa_del_jugador[i][j] == mesa_del_jugador[i][0] and j != 0) or (mesa_del_jugador[i][j] == mesa_del_jugador[i][1] and j != 1) or (mesa_del_jugador[i][j] == mesa_del_jugador[i][2] and j != 2):
-                    sum_aux += mesa_del_jugador[i][j]
-                    contador += 1
-                    if(j == 2):
-                        puntos += sum_aux * contador
-                else:                    
-                    if contador > 1:
-                        puntos += sum_aux * contador
-                        sum_aux = 0
-                        contador = 0
-                    puntos += mesa_del_jugador[i][j]
-                    
-        return puntos
+        # Cada columna se busca en la tabla de las 7³ columnas posibles (TableroKnuckleBones)
+        c0, c1, c2 = mesa_del_jugador
+        return (
+            PUNTOS_CELDAS[c0[0] * 49 + c0[1] * 7 + c0[2]]
+            + PUNTOS_CELDAS[c1[0] * 49 + c1[1] * 7 + c1[2]]
+            + PUNTOS_CELDAS[c2[0] * 49 + c2[1] * 7 + c2[2]]
+        )
 
     def finalizo_juego(self) -> bool:
         if self._cantidad_de_dados_puestos[0] == 9 or self._cantidad_de_dados_puestos[1] == 9:
@@ -251,8 +181,18 @@ class KnuckleBones(SalaDeJuego):
     def cambiar_jugador_activo(self) -> None:
         self.set_turnoActivo(self.get_jugadores()[self.get_oponente_index()])
         
+    def get_generador(self) -> GeneradorAleatorio:
+        return self._generador
+
+    def set_generador(self, generador: GeneradorAleatorio):
+        self._generador = generador
+
     def lanzar_dado(self) -> int:
-        return generador_random(1, 6)
+        return self._generador.entero(1, 6)
+
+    def lanzar_dados(self, cantidad: int) -> list:
+        # Varias tiradas salen del mismo bloque del generador
+        return self._generador.enteros(1, 6, cantidad)
 
     async def sincronizar_estado_con_firestore(self):
         """
@@ -283,28 +223,137 @@ class KnuckleBones(SalaDeJuego):
         except Exception as e:
             print(f"Error al actualizar jugador activo: {e}")
 
-    def juego(self)-> str:
-        index_activo = self.get_jugador_activo_index()
-        index_oponente = self.get_oponente_index()
-        if  self.finalizo_juego():
-            return self.determinar_ganador(self._mesa_de_juego)
-        else:
+    def aplicar_movimiento(self, jugador: int, columna: int, dado: int) -> tuple:
+        """
+        Aplica una jugada: pone el dado en la columna del jugador, quita los dados
+        iguales de la columna enfrentada del rival y pasa el turno.
+
+        Args:
+            jugador (int): Índice del jugador que juega (debe tener el turno)
+            columna (int): Posición de la mesa (0-2)
+            dado (int): Valor del dado (1-6)
+
+        Returns:
+            tuple: (estado, delta) con el estado compacto después de la jugada y un
+            dict con ``jugador``, ``columna``, ``dado``, ``fila``, ``eliminados``,
+            ``puntos`` de ambos jugadores, ``turno``, ``terminado`` y ``ganador``
+            (índice, o None si no terminó o hubo empate)
+
+        Raises:
+            ValueError: Si el juego terminó, no es el turno del jugador, la columna
+                o el dado no son válidos, o la columna está llena
+        """
+        if self.finalizo_juego():
+            raise ValueError("El juego ya terminó")
+        if jugador != self.get_jugador_en_turno():
+            raise ValueError(f"No es el turno del jugador {jugador}")
+        if columna not in (0, 1, 2):
+            raise ValueError(f"Posición inválida: {columna}")
+        if not 1 <= dado <= 6:
+            raise ValueError(f"Valor de dado inválido: {dado}")
+        propia = self._mesa_de_juego[jugador][columna]
+        # El jugador 1 llena sus columnas desde el centro de la mesa
+        fila = next((f for f in ((0, 1, 2) if jugador == 0 else (2, 1, 0)) if propia[f] == 0), None)
+        if fila is None:
+            raise ValueError(f"La posición {columna + 1} está llena")
+        propia[fila] = dado
+        self._cantidad_de_dados_puestos[jugador] += 1
+
+        rival = 1 - jugador
+        enfrentada = self._mesa_de_juego[rival][2 - columna]
+        eliminados = 0
+        for f in range(3):
+            if enfrentada[f] == dado:
+                enfrentada[f] = 0
+                eliminados += 1
+        self._cantidad_de_dados_puestos[rival] -= eliminados
+
+        if self._turnoActivo is not None and len(self.get_jugadores()) == 2:
+            self.cambiar_jugador_activo()
+        self._turno += 1
+
+        puntos = [self.sumar_puntos(self._mesa_de_juego[0]), self.sumar_puntos(self._mesa_de_juego[1])]
+        terminado = self.finalizo_juego()
+        ganador = None
+        if terminado and puntos[0] != puntos[1]:
+            ganador = 0 if puntos[0] > puntos[1] else 1
+        delta = {
+            'jugador': jugador,
+            'columna': columna,
+            'dado': dado,
+            'fila': fila,
+            'eliminados': eliminados,
+            'puntos': puntos,
+            'turno': self._turno,
+            'terminado': terminado,
+            'ganador': ganador
+        }
+        return self.get_estado(), delta
+
+    def _controladores(self, jugadores: list) -> list:
+        from servidor.src.model.salaDeJuego.juego.JugadoresKnuckleBones import JugadorBot, JugadorHumano
+
+        # Por defecto, como antes: una persona contra el bot
+        controladores = jugadores or [JugadorHumano(), JugadorBot()]
+        if len(controladores) != 2:
+            raise ValueError("KnuckleBones necesita exactamente 2 jugadores")
+        return controladores
+
+    def _mostrar_turno(self, jugador: int, dado: int) -> None:
+        self.print_mesa()
+        print(f'a el jugador {self._nombre_jugador(jugador)} El dado salió en {dado}')
+
+    def juego(self, jugadores: list = None, mostrar: bool = True) -> str:
+        """
+        Juega la partida hasta el final, un turno por iteración.
+
+        Args:
+            jugadores (list, optional): Un JugadorKnuckleBones por índice de jugador.
+                Por defecto JugadorHumano contra JugadorBot
+            mostrar (bool, optional): Imprimir la mesa y las jugadas
+
+        Returns:
+            str: El mensaje con el ganador
+        """
+        controladores = self._controladores(jugadores)
+        while not self.finalizo_juego():
+            jugador = self.get_jugador_en_turno()
             dado = self.lanzar_dado()
-            self.print_mesa()
-            print(f'a el jugador {self.get_turnoActivo().get_id()} El dado salió en {dado}')
-            if(self._turno > 0 and self._turno % 2 != 0):
-                historial = self.knuckle_bot(dado, self._mesa_de_juego)
-                self._historial.append(historial)
-                posicion = historial['posicion']                # print(f'El bot eligió la posición {posicion+1}')
-                
-            else:
-                posicion = int(input('Ingrese la posición donde desea poner el dado (1,2,3): '))-1
-                
-            self.poner_dado(self._mesa_de_juego[index_activo], posicion, dado)
-            self.__eliminar_dado(self._mesa_de_juego[index_oponente], posicion, dado)
-            self.cambiar_jugador_activo() 
-            self._turno += 1
-            return self.juego()
+            if mostrar:
+                self._mostrar_turno(jugador, dado)
+            columna = controladores[jugador].elegir(self, jugador, dado)
+            self._historial.append(self.aplicar_movimiento(jugador, columna, dado)[1])
+            if mostrar:
+                print(f'El jugador {self._nombre_jugador(jugador)} eligió la posición {columna + 1}')
+        return self.determinar_ganador(self._mesa_de_juego, mostrar)
+
+    async def juego_async(self, jugadores: list, mostrar: bool = False, sincronizar: bool = False) -> str:
+        """
+        Versión asíncrona de juego para jugadores remotos (JugadorRemoto). Cede el
+        bucle de eventos después de cada jugada para no acaparar el servidor.
+
+        Args:
+            jugadores (list): Un JugadorKnuckleBones por índice de jugador
+            mostrar (bool, optional): Imprimir la mesa y las jugadas
+            sincronizar (bool, optional): Sincronizar con Firestore después de cada jugada
+
+        Returns:
+            str: El mensaje con el ganador
+        """
+        import asyncio
+
+        controladores = self._controladores(jugadores)
+        while not self.finalizo_juego():
+            jugador = self.get_jugador_en_turno()
+            dado = self.lanzar_dado()
+            if mostrar:
+                self._mostrar_turno(jugador, dado)
+            columna = await controladores[jugador].elegir_async(self, jugador, dado)
+            self._historial.append(self.aplicar_movimiento(jugador, columna, dado)[1])
+            if sincronizar:
+                await self.sincronizar_estado_con_firestore()
+            await asyncio.sleep(0)
+        return self.determinar_ganador(self._mesa_de_juego, mostrar)
 
     def print_mesa(self):
         # Verificar que hay suficientes jugadores
@@ -446,6 +495,7 @@ class KnuckleBones(SalaDeJuego):
         parent_dict.update({
             'mesa_jugador_0': mesa_plana['jugador_0'],
             'mesa_jugador_1': mesa_plana['jugador_1'],
+            'estado_mesa': list(self.get_estado()),
             'cantidad_de_dados_puestos': self._cantidad_de_dados_puestos,
             'turno': self._turno,
             'historial_knucklebones': historial_serializado
@@ -454,11 +504,11 @@ class KnuckleBones(SalaDeJuego):
         return parent_dict
 
     @classmethod
-    def from_dict(cls, data: dict):
+    def from_dict(cls, data: dict, finales: TablaFinales = None):
         """
         Constructor simple de KnuckleBones desde diccionario
         """
-        instance = cls()
+        instance = cls(finales=finales)
         
         # Atributos de SalaDeJuego
         instance._id = data.get('id')
@@ -479,10 +529,13 @@ class KnuckleBones(SalaDeJuego):
         else:
             instance._fechaHoraInicio = fecha_str or datetime.now()
         
-        # Usar conversor para reconstruir mesa
-        mesa_0 = data.get('mesa_jugador_0', [0] * 9)
-        mesa_1 = data.get('mesa_jugador_1', [0] * 9)
-        instance._mesa_de_juego = instance._listas_planas_a_mesa(mesa_0, mesa_1)
+        # Usar conversor para reconstruir mesa; sin listas planas se usa el estado compacto
+        if 'mesa_jugador_0' not in data and 'estado_mesa' in data:
+            instance._mesa_de_juego = a_mesa(tuple(data['estado_mesa']))
+        else:
+            mesa_0 = data.get('mesa_jugador_0', [0] * 9)
+            mesa_1 = data.get('mesa_jugador_1', [0] * 9)
+            instance._mesa_de_juego = instance._listas_planas_a_mesa(mesa_0, mesa_1)
         
         # Atributos específicos de KnuckleBones
         instance._cantidad_de_dados_puestos = data.get('cantidad_de_dados_puestos', [0, 0])
@@ -0,0 +1,178 @@
+"""
+Bot de KnuckleBones basado en búsqueda expectiminimax.
+
+El árbol alterna nodos de decisión (el jugador conoce su dado y elige columna) con
+nodos de azar (el promedio sobre las seis caras del próximo dado). La búsqueda se
+hace por profundización iterativa dentro de un presupuesto de tiempo por jugada:
+si se agota el tiempo se usa la jugada de la última profundidad completa.
+
+Los valores ya calculados se guardan en una tabla de transposición indexada por
+un hash Zobrist del estado, que se actualiza de forma incremental en cada jugada.
+Si se le da una ``TablaFinales``, las posiciones con un solo par de columnas
+abierto se valoran exactamente con una consulta en lugar de seguir buscando.
+
+El estado es el de ``TableroKnuckleBones``: la tupla inmutable
+``(tablero_0, tablero_1)`` con columnas lógicas codificadas, por lo que jugar es
+aritmética sobre enteros y consultas a tablas.
+"""
+
+import random
+import time
+
+from servidor.src.model.salaDeJuego.juego.TableroKnuckleBones import (
+    CANTIDAD, CARAS, CUENTA, DELTA_PONER, DELTA_QUITAR, NUM_COLUMNAS, PONER, POTENCIAS, QUITAR,
+    columnas, columnas_libres, puntos_de, utilidad_final
+)
+
+
+class _TiempoAgotado(Exception):
+    pass
+
+
+class KnuckleBonesBot:
+    """
+    Motor de búsqueda expectiminimax para KnuckleBones.
+
+    Una instancia mantiene su tabla de transposición entre jugadas, así que cada
+    mesa debe usar su propio bot.
+    """
+
+    def __init__(self, profundidad_maxima: int = 4, tiempo_limite: float = 0.05,
+                 max_entradas: int = 200_000, semilla: int = 0x4B42, finales=None):
+        """
+        Args:
+            profundidad_maxima (int, optional): Jugadas a mirar hacia adelante
+            tiempo_limite (float, optional): Segundos disponibles por jugada
+            max_entradas (int, optional): Tamaño máximo de la tabla de transposición
+            semilla (int, optional): Semilla de las claves Zobrist
+            finales (TablaFinales, optional): Tabla de finales exactos a consultar
+
+        Raises:
+            ValueError: Si la profundidad no es positiva
+        """
+        if profundidad_maxima < 1:
+            raise ValueError("La profundidad debe ser al menos 1")
+        self._profundidad_maxima = profundidad_maxima
+        self._tiempo_limite = tiempo_limite
+        self._max_entradas = max_entradas
+        self._finales = finales
+        aleatorio = random.Random(semilla)
+        # Clave por jugador, columna y código de columna
+        self._claves = [
+            [[aleatorio.getrandbits(64) for _ in range(NUM_COLUMNAS)] for _ in range(3)]
+            for _ in range(2)
+        ]
+        self._clave_turno = aleatorio.getrandbits(64)
+        self._clave_dado = [aleatorio.getrandbits(64) for _ in range(7)]
+        self._tabla = {}
+        self._limite = float('inf')
+        self._nodos = 0
+        self._ultima_busqueda = {}
+
+    def __getstate__(self) -> dict:
+        # La tabla de transposición es solo una caché: no se copia al migrar la mesa
+        estado = self.__dict__.copy()
+        estado['_tabla'] = {}
+        return estado
+
+    def get_ultima_busqueda(self) -> dict:
+        """Retorna profundidad alcanzada, nodos, tiempo y valor de cada columna de la última jugada"""
+        return self._ultima_busqueda
+
+    def hash_estado(self, estado: tuple, jugador: int) -> int:
+        """Hash Zobrist del estado con el jugador que tiene el turno."""
+        clave = self._clave_turno if jugador else 0
+        for j in range(2):
+            for c, codigo in enumerate(columnas(estado[j])):
+                clave ^= self._claves[j][c][codigo]
+        return clave
+
+    def elegir_columna(self, estado: tuple, jugador: int, dado: int) -> int:
+        """
+        Elige la columna (lógica) donde el jugador pone el dado.
+
+        Raises:
+            ValueError: Si el jugador no tiene columnas libres
+        """
+        libres = columnas_libres(estado[jugador])
+        if not libres:
+            raise ValueError("El jugador no tiene columnas libres")
+        inicio = time.perf_counter()
+        clave = self.hash_estado(estado, jugador)
+        if len(self._tabla) > self._max_entradas:
+            self._tabla.clear()
+        self._nodos = 0
+        diferencia = puntos_de(estado[jugador]) - puntos_de(estado[1 - jugador])
+        mejor, valores, alcanzada = libres[0], {}, 0
+        for profundidad in range(1, self._profundidad_maxima + 1):
+            # La primera profundidad siempre se completa
+            self._limite = inicio + self._tiempo_limite if profundidad > 1 else float('inf')
+            try:
+                valores = {
+                    c: self._valor_jugada(estado, jugador, c, dado, profundidad, clave, diferencia) for c in libres
+                }
+            except _TiempoAgotado:
+                break
+            mejor = max(valores, key=valores.__getitem__)
+            alcanzada = profundidad
+        self._ultima_busqueda = {
+            'profundidad': alcanzada,
+            'nodos': self._nodos,
+            'tiempo': time.perf_counter() - inicio,
+            'valores': valores
+        }
+        return mejor
+
+    def _valor_jugada(self, estado: tuple, jugador: int, indice: int, dado: int, profundidad: int,
+                      clave: int, diferencia: int) -> float:
+        # Valor de poner el dado en la columna, desde el punto de vista del jugador.
+        # Juega sobre los enteros del estado y actualiza a la vez el hash Zobrist y la
+        # diferencia de puntos con las tablas de deltas.
+        potencia = POTENCIAS[indice]
+        rival = 1 - jugador
+        propio, tablero_rival = estado[jugador], estado[rival]
+        codigo = propio // potencia % NUM_COLUMNAS
+        nuevo = PONER[codigo][dado]
+        claves = self._claves[jugador][indice]
+        clave ^= claves[codigo] ^ claves[nuevo] ^ self._clave_turno
+        propio += (nuevo - codigo) * potencia
+        diferencia += DELTA_PONER[codigo][dado]
+        codigo_rival = tablero_rival // potencia % NUM_COLUMNAS
+        if CUENTA[codigo_rival][dado]:
+            nuevo_rival = QUITAR[codigo_rival][dado]
+            claves = self._claves[rival][indice]
+            clave ^= claves[codigo_rival] ^ claves[nuevo_rival]
+            tablero_rival += (nuevo_rival - codigo_rival) * potencia
+            diferencia -= DELTA_QUITAR[codigo_rival][dado]
+
+        if CANTIDAD[nuevo] == 3:
+            if all(CANTIDAD[c] == 3 for c in columnas(propio)):
+                return utilidad_final(diferencia)
+            # Solo al llenar una columna se puede congelar un par y entrar a la tabla de finales
+            if self._finales is not None:
+                exacto = self._finales.valor_tras_jugada(propio, tablero_rival, diferencia)
+                if exacto is not None:
+                    return exacto
+        if profundidad == 1:
+            return diferencia
+        hijo = (propio, tablero_rival) if jugador == 0 else (tablero_rival, propio)
+        return -self._azar(hijo, rival, profundidad - 1, clave, -diferencia)
+
+    def _azar(self, estado: tuple, jugador: int, profundidad: int, clave: int, diferencia: int) -> float:
+        return sum(self._decision(estado, jugador, dado, profundidad, clave, diferencia) for dado in CARAS) / 6
+
+    def _decision(self, estado: tuple, jugador: int, dado: int, profundidad: int, clave: int, diferencia: int) -> float:
+        clave_nodo = clave ^ self._clave_dado[dado]
+        entrada = self._tabla.get(clave_nodo)
+        if entrada is not None and entrada[0] >= profundidad:
+            return entrada[1]
+        if time.perf_counter() > self._limite:
+            raise _TiempoAgotado()
+        self._nodos += 1
+        mejor = -float('inf')
+        for indice in columnas_libres(estado[jugador]):
+            valor = self._valor_jugada(estado, jugador, indice, dado, profundidad, clave, diferencia)
+            if valor > mejor:
+                mejor = valor
+        self._tabla[clave_nodo] = (profundidad, mejor)
+        return mejor
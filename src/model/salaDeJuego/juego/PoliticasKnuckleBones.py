@@ -0,0 +1,128 @@
+"""
+Políticas de juego de KnuckleBones sin entrada ni salida.
+
+Una política es una función ``politica(estado, jugador, dado) -> columna`` que
+recibe el estado compacto de ``TableroKnuckleBones`` y retorna la columna lógica
+donde poner el dado. Se usan en la arena de partidas (``ArenaKnuckleBones``) y
+pueden construirse por nombre con ``crear_politica``.
+"""
+
+from typing import Callable
+
+from servidor.src.model.salaDeJuego.juego.TableroKnuckleBones import (
+    CANTIDAD, COLUMNAS, columna, columna_en_mesa, columnas_libres, jugar, puntos_de
+)
+from servidor.src.utils.aleatorio import GeneradorAleatorio, GeneradorSeguro
+
+ALEATORIA = 'aleatoria'
+HEURISTICA = 'heuristica'
+BUSQUEDA = 'busqueda'
+POLITICAS = (ALEATORIA, HEURISTICA, BUSQUEDA)
+
+
+def _columna_optima(codigo: int) -> int:
+    # Bonificación según las casillas vacías de la columna: 3 -> 2, 2 -> 1, 1 -> 0, 0 -> -2
+    return (-2, 0, 1, 2)[3 - CANTIDAD[codigo]]
+
+
+def _columna_paralela(codigo_rival: int, codigo_propio: int, puntuacion_columna: int, dado: int) -> int:
+    contador = -sum(1 for valor in COLUMNAS[codigo_rival] if valor > dado)
+    if puntuacion_columna in (0, 1):
+        contador -= sum(1 for valor in COLUMNAS[codigo_propio] if valor < dado)
+    return contador
+
+
+def elegir_posicion_heuristica(estado: tuple, jugador: int, dado: int) -> int:
+    """
+    Heurística original de un nivel de ``KnuckleBones.knuckle_bot_think`` como
+    función pura: para cada columna proyecta todas las respuestas posibles del
+    rival y suma bonificaciones por el estado de la columna.
+
+    Los puntajes se calculan igual que antes, con posiciones de la mesa; solo se
+    eligen columnas con espacio.
+
+    Returns:
+        int: La columna lógica elegida
+    """
+    rival = 1 - jugador
+    puntos_bot, puntos_jugador = puntos_de(estado[jugador]), puntos_de(estado[rival])
+    respuestas = [
+        (c, valor) for valor in range(1, 7) for c in columnas_libres(estado[rival])
+    ]
+    mejor, mejor_puntaje = None, None
+    for posicion in range(3):
+        propia = columna_en_mesa(jugador, posicion)
+        if CANTIDAD[columna(estado[jugador], propia)] == 3:
+            continue
+        despues = jugar(estado, jugador, propia, dado)
+        puntaje = 0
+        for c, valor in respuestas:
+            proyectado = jugar(despues, rival, c, valor)
+            # Como en la versión original, el primer valor es el puntaje del rival
+            proyectados_bot, proyectados_jugador = puntos_de(proyectado[rival]), puntos_de(proyectado[jugador])
+            if puntos_bot < puntos_jugador:
+                cambio = proyectados_bot * 9 if proyectados_jugador == 0 else proyectados_jugador
+                if proyectados_bot > puntos_bot:
+                    puntaje += cambio
+                elif proyectados_bot == proyectados_jugador:
+                    puntaje += 5
+                else:
+                    puntaje -= cambio
+            elif puntos_bot > puntos_jugador:
+                puntaje += 10
+        codigo_propio = columna(estado[jugador], propia)
+        puntuacion_columna = _columna_optima(codigo_propio)
+        puntaje += puntuacion_columna
+        codigo_paralelo = columna(estado[rival], columna_en_mesa(rival, posicion))
+        puntaje += _columna_paralela(codigo_paralelo, codigo_propio, puntuacion_columna, dado)
+        if mejor_puntaje is None or puntaje > mejor_puntaje:
+            mejor, mejor_puntaje = propia, puntaje
+    return mejor
+
+
+def politica_aleatoria(generador: GeneradorAleatorio = None) -> Callable:
+    """Crea una política que elige una columna libre al azar."""
+    generador = generador or GeneradorSeguro()
+
+    def politica(estado: tuple, jugador: int, dado: int) -> int:
+        return generador.elegir(columnas_libres(estado[jugador]))
+    return politica
+
+
+def politica_busqueda(profundidad: int = 2, tiempo_limite: float = float('inf'), finales: bool = True) -> Callable:
+    """
+    Crea una política con su propio KnuckleBonesBot.
+
+    Args:
+        profundidad (int, optional): Profundidad máxima de búsqueda
+        tiempo_limite (float, optional): Segundos por jugada. Sin límite los
+            resultados son reproducibles
+        finales (bool, optional): Consultar la tabla de finales exactos, si ya se
+            generó (``python -m servidor.src.model.salaDeJuego.juego.FinalesKnuckleBones``)
+    """
+    from servidor.src.model.salaDeJuego.juego.KnuckleBonesBot import KnuckleBonesBot
+    from servidor.src.model.salaDeJuego.juego.FinalesKnuckleBones import TablaFinales
+
+    bot = KnuckleBonesBot(profundidad, tiempo_limite, finales=TablaFinales.cargar() if finales else None)
+    return bot.elegir_columna
+
+
+def crear_politica(nombre: str, generador: GeneradorAleatorio = None, **opciones) -> Callable:
+    """
+    Construye una política por nombre: 'aleatoria', 'heuristica' o 'busqueda'.
+
+    Args:
+        nombre (str): Nombre de la política
+        generador (GeneradorAleatorio, optional): Generador de la política aleatoria
+        **opciones: Opciones de politica_busqueda
+
+    Raises:
+        ValueError: Si la política no existe
+    """
+    if nombre == ALEATORIA:
+        return politica_aleatoria(generador)
+    if nombre == HEURISTICA:
+        return elegir_posicion_heuristica
+    if nombre == BUSQUEDA:
+        return politica_busqueda(**opciones)
+    raise ValueError(f"Política desconocida: {nombre}. Opciones: {', '.join(POLITICAS)}")
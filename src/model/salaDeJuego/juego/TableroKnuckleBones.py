@@ -0,0 +1,186 @@
+"""
+Codificación compacta e inmutable del estado de KnuckleBones.
+
+Una columna es un multiconjunto de hasta tres dados (el orden de las filas no
+cambia los puntos), así que solo hay 84 columnas posibles; cada una se identifica
+con un código de 0 a 83 (0 es la columna vacía). El tablero de un jugador es el
+entero ``c0 + 84·c1 + 84²·c2`` y el estado completo la tupla
+``(tablero_0, tablero_1)``, que es inmutable y sirve como clave de diccionario.
+
+Las columnas son lógicas: la columna ``c`` de un jugador enfrenta a la columna
+``c`` del rival. En ``_mesa_de_juego`` la columna ``c`` del jugador 1 se guarda en
+el índice ``2 - c`` (ver ``columna_en_mesa``).
+
+Poner, quitar, contar y puntuar son accesos a tablas precalculadas, incluidas
+las diferencias de puntos que produce cada jugada (``DELTA_PONER`` y
+``DELTA_QUITAR``) y los puntos de las 7³ columnas de ``_mesa_de_juego`` tal como
+están guardadas, con ceros en las casillas vacías (``PUNTOS_CELDAS``).
+"""
+
+from itertools import combinations_with_replacement
+
+CARAS = range(1, 7)
+
+# Todas las columnas posibles como tuplas ordenadas: vacía, 1, 2 y 3 dados
+COLUMNAS = tuple(
+    columna for cantidad in range(4) for columna in combinations_with_replacement(CARAS, cantidad)
+)
+NUM_COLUMNAS = len(COLUMNAS)
+POTENCIAS = (1, NUM_COLUMNAS, NUM_COLUMNAS * NUM_COLUMNAS)
+NUM_TABLEROS = NUM_COLUMNAS ** 3
+LLENA = -1
+
+_CODIGOS = {columna: codigo for codigo, columna in enumerate(COLUMNAS)}
+
+# Dados en cada columna
+CANTIDAD = tuple(len(columna) for columna in COLUMNAS)
+# Puntos de cada columna: cada valor repetido n veces suma valor·n²
+PUNTOS = tuple(sum(valor * columna.count(valor) for valor in columna) for columna in COLUMNAS)
+# CUENTA[codigo][dado]: veces que aparece el dado en la columna
+CUENTA = tuple(tuple(columna.count(dado) for dado in range(7)) for columna in COLUMNAS)
+# PONER[codigo][dado]: columna después de agregar el dado (LLENA si no cabe)
+PONER = tuple(
+    tuple(
+        _CODIGOS[tuple(sorted(columna + (dado,)))] if dado and len(columna) < 3 else LLENA
+        for dado in range(7)
+    )
+    for columna in COLUMNAS
+)
+# QUITAR[codigo][dado]: columna después de quitar todos los dados con ese valor
+QUITAR = tuple(
+    tuple(_CODIGOS[tuple(v for v in columna if v != dado)] for dado in range(7))
+    for columna in COLUMNAS
+)
+
+# DELTA_PONER[codigo][dado]: puntos que gana la columna al agregar el dado
+DELTA_PONER = tuple(
+    tuple(PUNTOS[nuevo] - PUNTOS[codigo] if nuevo != LLENA else 0 for nuevo in PONER[codigo])
+    for codigo in range(NUM_COLUMNAS)
+)
+# DELTA_QUITAR[codigo][dado]: puntos que pierde la columna al quitar ese valor (<= 0)
+DELTA_QUITAR = tuple(
+    tuple(PUNTOS[nuevo] - PUNTOS[codigo] for nuevo in QUITAR[codigo])
+    for codigo in range(NUM_COLUMNAS)
+)
+# PUNTOS_CELDAS[a·49 + b·7 + c]: puntos de la columna de celdas [a, b, c] (0 = vacía)
+PUNTOS_CELDAS = tuple(
+    PUNTOS[_CODIGOS[tuple(sorted(v for v in (a, b, c) if v))]]
+    for a in range(7) for b in range(7) for c in range(7)
+)
+
+VACIO = (0, 0)
+
+# Bonificación de un final ganado sobre la diferencia de puntos
+VICTORIA = 1000
+
+
+def utilidad_final(diferencia: int) -> int:
+    """Valor de un juego terminado con esa diferencia de puntos para el jugador."""
+    return diferencia + (VICTORIA if diferencia > 0 else -VICTORIA if diferencia < 0 else 0)
+
+
+def puntos_celdas(columna: list) -> int:
+    """Puntos de una columna de ``_mesa_de_juego`` (tres celdas, 0 = vacía)."""
+    return PUNTOS_CELDAS[columna[0] * 49 + columna[1] * 7 + columna[2]]
+
+
+def codificar_columna(dados) -> int:
+    """
+    Retorna el código de la columna con esos dados (los ceros son casillas vacías).
+
+    Raises:
+        ValueError: Si la columna tiene más de tres dados o valores fuera de 1-6
+    """
+    columna = tuple(sorted(dado for dado in dados if dado))
+    if columna not in _CODIGOS:
+        raise ValueError(f"Columna inválida: {list(dados)}")
+    return _CODIGOS[columna]
+
+
+def codificar_tablero(columnas) -> int:
+    """Codifica las tres columnas (lógicas) de un jugador."""
+    return sum(codificar_columna(dados) * potencia for dados, potencia in zip(columnas, POTENCIAS))
+
+
+def columna(tablero: int, indice: int) -> int:
+    """Retorna el código de una columna del tablero."""
+    return tablero // POTENCIAS[indice] % NUM_COLUMNAS
+
+
+def columnas(tablero: int) -> tuple:
+    """Retorna los códigos de las tres columnas del tablero."""
+    c0, resto = tablero % NUM_COLUMNAS, tablero // NUM_COLUMNAS
+    return c0, resto % NUM_COLUMNAS, resto // NUM_COLUMNAS
+
+
+def dados_de(tablero: int) -> int:
+    """Retorna la cantidad de dados del tablero."""
+    c0, c1, c2 = columnas(tablero)
+    return CANTIDAD[c0] + CANTIDAD[c1] + CANTIDAD[c2]
+
+
+def puntos_de(tablero: int) -> int:
+    """Retorna los puntos del tablero."""
+    c0, c1, c2 = columnas(tablero)
+    return PUNTOS[c0] + PUNTOS[c1] + PUNTOS[c2]
+
+
+def columnas_libres(tablero: int) -> list:
+    """Retorna los índices de las columnas que aún tienen espacio."""
+    return [i for i, codigo in enumerate(columnas(tablero)) if CANTIDAD[codigo] < 3]
+
+
+def jugar(estado: tuple, jugador: int, indice: int, dado: int) -> tuple:
+    """
+    Pone el dado en la columna del jugador y quita los dados iguales de la columna
+    enfrentada del rival.
+
+    Returns:
+        tuple: El nuevo estado
+
+    Raises:
+        ValueError: Si la columna está llena
+    """
+    potencia = POTENCIAS[indice]
+    propio, rival = estado[jugador], estado[1 - jugador]
+    codigo = propio // potencia % NUM_COLUMNAS
+    nuevo = PONER[codigo][dado]
+    if nuevo == LLENA:
+        raise ValueError(f"La columna {indice + 1} está llena")
+    propio += (nuevo - codigo) * potencia
+    codigo_rival = rival // potencia % NUM_COLUMNAS
+    if CUENTA[codigo_rival][dado]:
+        rival += (QUITAR[codigo_rival][dado] - codigo_rival) * potencia
+    return (propio, rival) if jugador == 0 else (rival, propio)
+
+
+def terminado(estado: tuple) -> bool:
+    """El juego termina cuando algún tablero tiene sus nueve dados."""
+    return dados_de(estado[0]) == 9 or dados_de(estado[1]) == 9
+
+
+def columna_en_mesa(jugador: int, indice: int) -> int:
+    """Convierte una columna lógica al índice de columna de ``_mesa_de_juego``."""
+    return indice if jugador == 0 else 2 - indice
+
+
+def desde_mesa(mesa_de_juego: list) -> tuple:
+    """Convierte la mesa ``[2][3][3]`` de KnuckleBones al estado compacto."""
+    return tuple(
+        codificar_tablero(mesa_de_juego[jugador][columna_en_mesa(jugador, c)] for c in range(3))
+        for jugador in range(2)
+    )
+
+
+def a_mesa(estado: tuple) -> list:
+    """
+    Convierte el estado compacto a la mesa ``[2][3][3]`` con los dados de cada
+    columna ordenados desde el lado del jugador.
+    """
+    mesa = [[None] * 3 for _ in range(2)]
+    for jugador in range(2):
+        for c, codigo in enumerate(columnas(estado[jugador])):
+            dados = list(COLUMNAS[codigo]) + [0] * (3 - CANTIDAD[codigo])
+            # El jugador 1 llena sus filas de abajo hacia arriba
+            mesa[jugador][columna_en_mesa(jugador, c)] = dados if jugador == 0 else dados[::-1]
+    return mesa
@@ -1,5 +1,8 @@
 from .JuegoDeCartas import JuegoDeCartas
-import random
+from .Carta import VALORES
+from .Mazo import Mazo
+from servidor.src.utils.aleatorio import GeneradorAleatorio
+from .ManoBlackJack import ManoBlackJack
 from servidor.src.model.usuario import Usuario
 
 
@@ -7,12 +10,17 @@ class BlackJack(JuegoDeCartas):
     _plantarse: bool = False
     _cartas: dict[str,int] = {"2":2,"3":3,"4":4,"5":5,"6":6,"7":7,"8":8,"9":9,"10":10,
             "J":10,"Q":10,"K":10,"A":11}
+    # Valor de cada carta indexado por su rango (Carta.rango)
+    _valores_por_rango: tuple = tuple(map(_cartas.__getitem__, VALORES))
     _apuesta: int = 1
 
-    def __init__(self, jugador: str, capacidad: int, capacidadMinima: int, valor_entrada_mesa: int ,_plantarse: bool, _apuesta: int):
-        super().__init__(jugador, capacidad, capacidadMinima, valor_entrada_mesa)
+    def __init__(self, jugador: str, capacidad: int, capacidadMinima: int, valor_entrada_mesa: int ,_plantarse: bool, _apuesta: int,
+                 numero_de_mazos: int = 6, penetracion: float = 0.75, generador: GeneradorAleatorio = None):
+        super().__init__(jugador, capacidad, capacidadMinima, valor_entrada_mesa, generador)
         self._apuesta = _apuesta
         self._plantarse = _plantarse
+        # Zapato de varios mazos como en las mesas reales
+        self._mazo = Mazo(52, numero_de_mazos, penetracion, self._mazo.get_generador())
 
     def ganador(self, mano_jugador, mano_crupier):
         puntos_jugador = self.calcular_puntos(mano_jugador)
@@ -29,13 +37,15 @@ class BlackJack(JuegoDeCartas):
             print("El crupier ha ganado.")
             print(f"Mano del crupier: {mano_crupier}  || Puntos: {puntos_crupier}")
 
+    def nueva_mano(self, cartas=()) -> ManoBlackJack:
+        # Crea una mano que acumula sus puntos con los valores de esta mesa.
+        return ManoBlackJack(self._valores_por_rango, cartas)
+
     def calcular_puntos(self, mano) -> int:
-        # Calcula los puntos de la mano dada
-        puntos = sum(BlackJack._cartas[carta] for carta in mano)
-        # Si hay un As y los puntos son mayores a 21, resta 10 puntos
-        if 'A' in mano and puntos > 21:
-            puntos -= 10
-        return puntos
+        # Calcula los puntos de la mano dada; las listas de cartas se acumulan una vez
+        if not isinstance(mano, ManoBlackJack):
+            mano = self.nueva_mano(mano)
+        return mano.get_puntos()
 
 
     def separar(self, jugador: Usuario):
@@ -46,13 +56,13 @@ class BlackJack(JuegoDeCartas):
         print("falta implementar retirarse()")
         pass
 
-    def repartir_cartas(self) -> str:
-        # Reparte una carta al jugador o al crupier y devuelve el valor de la carta.
-        return random.choice(list(BlackJack._cartas.keys()))
+    def repartir_cartas(self) -> int:
+        # Reparte una carta del zapato al jugador o al crupier y devuelve la carta.
+        return self._mazo.sacar_carta()
 
     def cartasIniciales(self):
         # Reparte dos cartas al jugador y devuelve el valor de las cartas.
-        mano_inicial = [self.repartir_cartas(), self.repartir_cartas()]
+        mano_inicial = self.nueva_mano(self._mazo.sacar_cartas(2))
         return mano_inicial
 
     def mostrar_CartasYPuntos(self, mano_jugador, mano_crupier):
@@ -65,6 +75,45 @@ class BlackJack(JuegoDeCartas):
         print("falta implementar apostar()")
         pass
 
+    def sugerir_jugada(self, mano, carta_visible_crupier, puede_doblar: bool = False, puede_separar: bool = False) -> str:
+        """
+        Sugiere la jugada de estrategia básica para la mano contra la carta visible
+        del crupier: 'pedir', 'plantarse', 'doblar' o 'separar'.
+        La tabla se carga de la caché en disco una sola vez por proceso.
+        """
+        from .EstrategiaBlackJack import EstrategiaBasica
+        valores = BlackJack._valores_por_rango
+        if not isinstance(mano, ManoBlackJack):
+            mano = self.nueva_mano(mano)
+        puntos, blanda = mano.get_puntos(), mano.es_blanda()
+        pareja = None
+        if len(mano) == 2 and valores[mano[0] >> 2] == valores[mano[1] >> 2]:
+            pareja = valores[mano[0] >> 2]
+        carta_visible = valores[carta_visible_crupier >> 2]
+        return EstrategiaBasica.cargar().decidir(
+            puntos, blanda, carta_visible, pareja,
+            puede_doblar=puede_doblar and len(mano) == 2,
+            puede_separar=puede_separar and pareja is not None
+        )
+
+    def simular_partidas(self, manos: int, estrategia=None, pago_blackjack: float = 1.5, semilla: int = None) -> dict:
+        """
+        Simula sin interacción manos de esta mesa (un asiento por jugador) para
+        validar sus reglas y pagos. Ver SimuladorBlackJack.simular.
+
+        Returns:
+            dict: Ventaja de la casa, varianza y tasas de victoria y de pasarse
+        """
+        from .SimuladorBlackJack import simular, estrategia_crupier
+        return simular(
+            manos,
+            asientos=max(len(self.get_jugadores()), 1),
+            estrategia=estrategia or estrategia_crupier,
+            pago_blackjack=pago_blackjack,
+            semilla=semilla,
+            valores=self._valores_por_rango
+        )
+
     def crear_sala_activa_con_jugador(self, jugador: Usuario) -> str:
         """
         Crea una nueva sala de BlackJack activa con el jugador especificado.
@@ -98,7 +147,8 @@ class BlackJack(JuegoDeCartas):
 
     def inicializar_juego(self):
         """Inicializa el juego de BlackJack para 4 jugadores más el crupier."""
-        # Agregar el usuario real si se proporciona
+        # Se baraja el zapato entre rondas si ya salió la carta de corte
+        self._mazo.nueva_ronda()
         manos_jugadores = [self.cartasIniciales() for _ in range(4)]
         mano_crupier = self.cartasIniciales()
         plantados = [False] * 4
@@ -112,17 +162,17 @@ class BlackJack(JuegoDeCartas):
                 if puntos >= 21:
                     plantados[i] = True
                     break
+                print(f"Sugerencia: {self.sugerir_jugada(mano, mano_crupier[0])}")
                 plantarse = str(input(f"{jugadores[i].get_nombre()}, ¿Quieres plantarte? (S/N): ").lower())
                 if plantarse == "n":
-                    mano.append(self.repartir_cartas())
+                    mano.agregar(self.repartir_cartas())
                 elif plantarse == "s":
                     plantados[i] = True
 
         # Turno del crupier
-        puntos_crupier = self.calcular_puntos(mano_crupier)
+        puntos_crupier = mano_crupier.get_puntos()
         while puntos_crupier < 17:
-            mano_crupier.append(self.repartir_cartas())
-            puntos_crupier = self.calcular_puntos(mano_crupier)
+            puntos_crupier = mano_crupier.agregar(self.repartir_cartas())
         print(f"\nMano final del crupier: {mano_crupier}  || Puntos: {puntos_crupier}")
 
         # Determinar ganadores
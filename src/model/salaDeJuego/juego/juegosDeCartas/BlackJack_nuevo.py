@@ -1,4 +1,6 @@
 from .JuegoDeCartas import JuegoDeCartas
+from .Carta import CARTAS, VALORES
+from .ManoBlackJack import ManoBlackJack
 import random
 from servidor.src.model.usuario import Usuario
 
@@ -7,6 +9,8 @@ class BlackJack(JuegoDeCartas):
     _plantarse: bool = False
     _cartas: dict[str,int] = {"2":2,"3":3,"4":4,"5":5,"6":6,"7":7,"8":8,"9":9,"10":10,
             "J":10,"Q":10,"K":10,"A":11}
+    # Valor de cada carta indexado por su rango (Carta.rango)
+    _valores_por_rango: tuple = tuple(map(_cartas.__getitem__, VALORES))
     _apuesta: int = 1
 
     def __init__(self, jugador: str, capacidad: int, capacidadMinima: int, valor_entrada_mesa: int ,_plantarse: bool, _apuesta: int):
@@ -29,13 +33,15 @@ class BlackJack(JuegoDeCartas):
             print("El crupier ha ganado.")
             print(f"Mano del crupier: {mano_crupier}  || Puntos: {puntos_crupier}")
 
+    def nueva_mano(self, cartas=()) -> ManoBlackJack:
+        # Crea una mano que acumula sus puntos con los valores de esta mesa.
+        return ManoBlackJack(self._valores_por_rango, cartas)
+
     def calcular_puntos(self, mano) -> int:
-        # Calcula los puntos de la mano dada
-        puntos = sum(BlackJack._cartas[carta] for carta in mano)
-        # Si hay un As y los puntos son mayores a 21, resta 10 puntos
-        if 'A' in mano and puntos > 21:
-            puntos -= 10
-        return puntos
+        # Calcula los puntos de la mano dada; las listas de cartas se acumulan una vez
+        if not isinstance(mano, ManoBlackJack):
+            mano = self.nueva_mano(mano)
+        return mano.get_puntos()
 
     def doblar(self, jugador: Usuario):
         print("falta implementar doblear()")
@@ -49,9 +55,9 @@ class BlackJack(JuegoDeCartas):
         print("falta implementar retirarse()")
         pass
 
-    def repartir_cartas(self) -> str:
-        # Reparte una carta al jugador o al crupier y devuelve el valor de la carta.
-        return random.choice(list(BlackJack._cartas.keys()))
+    def repartir_cartas(self) -> int:
+        # Reparte una carta al jugador o al crupier y devuelve la carta.
+        return CARTAS[random.randrange(52)]
 
     def cartasIniciales(self):
         # Reparte dos cartas al jugador y devuelve el valor de las cartas.
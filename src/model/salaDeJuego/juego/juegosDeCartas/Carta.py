@@ -0,0 +1,91 @@
+"""
+Módulo que define la representación compacta de las cartas de la baraja francesa.
+
+Cada carta es un entero entre 0 y 51 con el rango en los bits altos y el palo en
+los dos bits bajos (``carta = rango << 2 | palo``), de modo que ambos se recuperan
+con operaciones de bits. El texto (por ejemplo ``"10♥"``) solo se usa para mostrar.
+"""
+
+from typing import override
+
+PALOS = ('♠', '♥', '♦', '♣')
+VALORES = ('2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A')
+
+AS = 12  # Rango del As
+
+
+class Carta(int):
+    """
+    Carta codificada como entero ``rango << 2 | palo``.
+
+    Se comporta como un ``int`` (hash, comparación y aritmética nativos) y solo
+    construye su texto al imprimirse.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, valor: int) -> 'Carta':
+        if not 0 <= valor < 52:
+            raise ValueError("La carta debe ser un entero entre 0 y 51")
+        return super().__new__(cls, valor)
+
+    @classmethod
+    def crear(cls, rango: int, palo: int) -> 'Carta':
+        """
+        Crea una carta a partir de su rango (0 = '2', 12 = 'A') y su palo (0-3).
+        """
+        return CARTAS[rango << 2 | palo]
+
+    @classmethod
+    def desde_texto(cls, texto: str) -> 'Carta':
+        """
+        Crea una carta a partir de su texto, por ejemplo ``"10♥"`` o ``"A♠"``.
+
+        Raises:
+            ValueError: Si el texto no corresponde a ninguna carta
+        """
+        try:
+            return _CARTAS_POR_TEXTO[texto]
+        except KeyError:
+            raise ValueError(f"Carta inválida: {texto}") from None
+
+    @property
+    def rango(self) -> int:
+        """Retorna el rango de la carta (0 = '2', 12 = 'A')"""
+        return self >> 2
+
+    @property
+    def palo(self) -> int:
+        """Retorna el palo de la carta (índice en ``PALOS``)"""
+        return self & 3
+
+    @override
+    def __str__(self) -> str:
+        return _TEXTOS[self]
+
+    @override
+    def __repr__(self) -> str:
+        return _TEXTOS[self]
+
+
+def rango_de(carta: int) -> int:
+    """Retorna el rango de una carta codificada (0 = '2', 12 = 'A')."""
+    return carta >> 2
+
+
+def palo_de(carta: int) -> int:
+    """Retorna el palo de una carta codificada (0-3)."""
+    return carta & 3
+
+
+def texto_de(carta: int) -> str:
+    """Retorna el texto de una carta codificada, por ejemplo ``"10♥"``."""
+    return _TEXTOS[carta]
+
+
+_TEXTOS = tuple(f"{VALORES[c >> 2]}{PALOS[c & 3]}" for c in range(52))
+
+# Instancias únicas de cada carta: crear un mazo nunca construye cartas nuevas
+CARTAS = tuple(int.__new__(Carta, c) for c in range(52))
+
+_CARTAS_POR_TEXTO = {texto: CARTAS[c] for c, texto in enumerate(_TEXTOS)}
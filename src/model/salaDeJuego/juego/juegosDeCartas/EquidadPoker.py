@@ -0,0 +1,136 @@
+"""
+Cálculo de equidad (probabilidades de ganar, empatar y perder) en Texas Hold'em.
+
+Con pocas cartas comunitarias por salir (flop, turn o river) se enumeran todos los
+tableros posibles; antes del flop se muestrea por Monte Carlo en lotes y se detiene
+en cuanto el intervalo de confianza de la equidad de cada jugador es lo bastante
+estrecho. Las manos se evalúan en lotes vectorizados con ``evaluar_lote``.
+
+Requiere NumPy.
+"""
+
+from itertools import combinations
+from math import comb, sqrt
+
+import numpy as np
+
+from .EvaluadorDeManos import evaluar_lote
+
+# Por encima de esta cantidad de tableros posibles se muestrea en lugar de enumerar
+MAX_TABLEROS_EXACTOS = 50_000
+
+Z_95 = 1.96
+
+
+def calcular_equidad(
+    manos: list,
+    comunidad: list = (),
+    iteraciones: int = 20_000,
+    tolerancia: float = 0.01,
+    tamano_lote: int = 2_000,
+    semilla: int = None,
+    rng=None
+) -> dict:
+    """
+    Calcula la equidad de cada mano frente a las demás.
+
+    Args:
+        manos (list): Cartas propias de cada jugador, por ejemplo ``[[c1, c2], [c3, c4]]``
+        comunidad (list, optional): Cartas comunitarias ya repartidas (0 a 5)
+        iteraciones (int, optional): Máximo de tableros a muestrear en Monte Carlo
+        tolerancia (float, optional): Semiancho del intervalo de confianza del 95 %
+            a partir del cual se detiene el muestreo
+        tamano_lote (int, optional): Tableros evaluados por lote
+        semilla (int, optional): Semilla para reproducir el muestreo
+        rng (numpy.random.Generator, optional): Generador a usar en lugar de la semilla
+
+    Returns:
+        dict: ``jugadores`` (lista con ``ganar``, ``empatar``, ``perder`` y
+        ``equidad`` de cada mano), ``muestras`` (tableros evaluados) y ``exacto``
+
+    Raises:
+        ValueError: Si hay cartas repetidas, menos de dos manos o más de 5 comunitarias
+    """
+    manos = [list(mano) for mano in manos]
+    comunidad = list(comunidad)
+    conocidas = [c for mano in manos for c in mano] + comunidad
+    if len(manos) < 2:
+        raise ValueError("Se necesitan al menos dos manos para calcular la equidad")
+    if len(comunidad) > 5:
+        raise ValueError("No puede haber más de 5 cartas comunitarias")
+    if len(set(conocidas)) != len(conocidas):
+        raise ValueError("Hay cartas repetidas entre las manos y la comunidad")
+
+    usadas = set(conocidas)
+    resto = np.array([c for c in range(52) if c not in usadas], dtype=np.intp)
+    faltantes = 5 - len(comunidad)
+    conteo = _Conteo(len(manos))
+
+    if comb(len(resto), faltantes) <= MAX_TABLEROS_EXACTOS:
+        tableros = np.array(list(combinations(resto.tolist(), faltantes)), dtype=np.intp)
+        tableros = tableros.reshape(comb(len(resto), faltantes), faltantes)
+        for inicio in range(0, len(tableros), tamano_lote):
+            conteo.sumar(_evaluar_tableros(manos, comunidad, tableros[inicio:inicio + tamano_lote]))
+        return conteo.resultado(exacto=True)
+
+    if rng is None:
+        rng = np.random.default_rng(semilla)
+    while conteo.muestras < iteraciones:
+        lote = min(tamano_lote, iteraciones - conteo.muestras)
+        # Muestreo sin reemplazo por fila: las k claves aleatorias más pequeñas
+        indices = rng.random((lote, len(resto))).argpartition(faltantes, axis=1)[:, :faltantes]
+        conteo.sumar(_evaluar_tableros(manos, comunidad, resto[indices]))
+        if conteo.semiancho_maximo() <= tolerancia:
+            break
+    return conteo.resultado(exacto=False)
+
+
+def _evaluar_tableros(manos: list, comunidad: list, tableros) -> np.ndarray:
+    """Retorna la matriz (jugadores, tableros) de fuerzas de cada mano."""
+    n = len(tableros)
+    fijas = np.broadcast_to(np.array(comunidad, dtype=np.intp), (n, len(comunidad)))
+    fuerzas = np.empty((len(manos), n), dtype=np.int64)
+    for i, mano in enumerate(manos):
+        propias = np.broadcast_to(np.array(mano, dtype=np.intp), (n, len(mano)))
+        fuerzas[i] = evaluar_lote(np.hstack((propias, fijas, tableros)))
+    return fuerzas
+
+
+class _Conteo:
+    """Acumula victorias, empates y la parte del pozo de cada jugador."""
+
+    def __init__(self, jugadores: int):
+        self.muestras = 0
+        self._victorias = np.zeros(jugadores, dtype=np.int64)
+        self._empates = np.zeros(jugadores, dtype=np.int64)
+        self._parte = np.zeros(jugadores)
+        self._parte_cuadrada = np.zeros(jugadores)
+
+    def sumar(self, fuerzas: np.ndarray) -> None:
+        ganan = fuerzas == fuerzas.max(axis=0)
+        cantidad = ganan.sum(axis=0)
+        unico = cantidad == 1
+        parte = ganan / cantidad
+        self.muestras += fuerzas.shape[1]
+        self._victorias += (ganan & unico).sum(axis=1)
+        self._empates += (ganan & ~unico).sum(axis=1)
+        self._parte += parte.sum(axis=1)
+        self._parte_cuadrada += (parte * parte).sum(axis=1)
+
+    def semiancho_maximo(self) -> float:
+        n = self.muestras
+        media = self._parte / n
+        varianza = np.maximum(self._parte_cuadrada / n - media * media, 0.0)
+        return float(Z_95 * sqrt(varianza.max() / n))
+
+    def resultado(self, exacto: bool) -> dict:
+        n = self.muestras
+        jugadores = []
+        for victorias, empates, parte in zip(self._victorias.tolist(), self._empates.tolist(), self._parte.tolist()):
+            jugadores.append({
+                'ganar': victorias / n,
+                'empatar': empates / n,
+                'perder': (n - victorias - empates) / n,
+                'equidad': parte / n
+            })
+        return {'jugadores': jugadores, 'muestras': n, 'exacto': exacto}
@@ -0,0 +1,296 @@
+"""
+Estrategia básica de BlackJack calculada a partir de la composición del zapato.
+
+Para cada carta visible del crupier se calcula la distribución exacta de su total
+final (17-21, pasarse o blackjack) con una recursión memorizada sobre la
+composición de cartas restantes, con las reglas de ``BlackJack``: el crupier pide
+mientras tenga menos de 17 y no revisa si tiene blackjack. Con esas distribuciones
+se obtiene el valor esperado de pedir, plantarse, doblar y separar para cada mano
+dura, blanda y pareja del jugador.
+
+Las tablas resultantes se guardan en disco (``CacheDisco``) y se cargan una sola
+vez por proceso; cada consulta posterior es un acceso a diccionario.
+"""
+
+from functools import lru_cache
+
+from .BlackJack import BlackJack
+from servidor.src.utils.cache_disco import CacheDisco
+
+PEDIR = 'pedir'
+PLANTARSE = 'plantarse'
+DOBLAR = 'doblar'
+SEPARAR = 'separar'
+
+# Índices de la distribución final del crupier
+_PASARSE = 5
+_BLACKJACK = 6
+
+_VERSION = 1
+
+_cargadas = {}
+
+
+def _composicion_inicial(num_mazos: int) -> tuple:
+    """Cantidad de cartas de cada valor (2 a 11) en el zapato."""
+    composicion = [0] * 10
+    for valor in BlackJack._valores_por_rango:
+        composicion[valor - 2] += 4 * num_mazos
+    return tuple(composicion)
+
+
+def _puntos(duro: int, ases: bool) -> int:
+    return duro + 10 if ases and duro + 10 <= 21 else duro
+
+
+@lru_cache(maxsize=None)
+def _distribucion_crupier(duro: int, ases: bool, cartas: int, composicion: tuple) -> tuple:
+    """
+    Probabilidad de cada total final del crupier: 17, 18, 19, 20, 21, pasarse y blackjack.
+    ``duro`` cuenta el As como 1 y ``ases`` indica si la mano tiene alguno.
+    """
+    puntos = _puntos(duro, ases)
+    final = [0.0] * 7
+    if puntos > 21:
+        final[_PASARSE] = 1.0
+        return tuple(final)
+    if puntos == 21 and cartas == 2:
+        final[_BLACKJACK] = 1.0
+        return tuple(final)
+    if puntos >= 17:
+        final[puntos - 17] = 1.0
+        return tuple(final)
+    total = sum(composicion)
+    for i, cantidad in enumerate(composicion):
+        if not cantidad:
+            continue
+        valor = i + 2
+        restante = composicion[:i] + (cantidad - 1,) + composicion[i + 1:]
+        hijo = _distribucion_crupier(
+            duro + (1 if valor == 11 else valor), ases or valor == 11, cartas + 1, restante
+        )
+        probabilidad = cantidad / total
+        for k in range(7):
+            final[k] += probabilidad * hijo[k]
+    return tuple(final)
+
+
+def distribucion_crupier(carta_visible: int, num_mazos: int = 6) -> tuple:
+    """
+    Distribución del total final del crupier según su carta visible (2-11).
+
+    Returns:
+        tuple: Probabilidades de terminar en 17, 18, 19, 20, 21, pasarse y blackjack
+    """
+    composicion = list(_composicion_inicial(num_mazos))
+    composicion[carta_visible - 2] -= 1
+    return _distribucion_crupier(
+        1 if carta_visible == 11 else carta_visible, carta_visible == 11, 1, tuple(composicion)
+    )
+
+
+class _CalculadoraValores:
+    """Valores esperados del jugador contra una carta visible del crupier."""
+
+    def __init__(self, carta_visible: int, num_mazos: int):
+        composicion = list(_composicion_inicial(num_mazos))
+        composicion[carta_visible - 2] -= 1
+        total = sum(composicion)
+        self._probabilidades = [(i + 2, cantidad / total) for i, cantidad in enumerate(composicion) if cantidad]
+        self._crupier = distribucion_crupier(carta_visible, num_mazos)
+        self._optimo = {}
+
+    def plantarse(self, puntos: int) -> float:
+        if puntos > 21:
+            return -1.0
+        crupier = self._crupier
+        valor = crupier[_PASARSE] - crupier[_BLACKJACK]
+        for k in range(5):
+            total_crupier = 17 + k
+            if puntos > total_crupier:
+                valor += crupier[k]
+            elif puntos < total_crupier:
+                valor -= crupier[k]
+        return valor
+
+    def _robar(self, duro: int, ases: bool, valor: int) -> tuple:
+        return duro + (1 if valor == 11 else valor), ases or valor == 11
+
+    def optimo(self, duro: int, ases: bool) -> float:
+        """Valor de la mano jugando óptimamente entre pedir y plantarse."""
+        clave = (duro, ases)
+        if clave not in self._optimo:
+            puntos = _puntos(duro, ases)
+            if puntos > 21:
+                valor = -1.0
+            elif puntos == 21:
+                # BlackJack se planta automáticamente con 21
+                valor = self.plantarse(21)
+            else:
+                valor = max(self.plantarse(puntos), self.pedir(duro, ases))
+            self._optimo[clave] = valor
+        return self._optimo[clave]
+
+    def pedir(self, duro: int, ases: bool) -> float:
+        return sum(p * self.optimo(*self._robar(duro, ases, valor)) for valor, p in self._probabilidades)
+
+    def doblar(self, duro: int, ases: bool) -> float:
+        return 2 * sum(
+            p * self.plantarse(_puntos(*self._robar(duro, ases, valor))) for valor, p in self._probabilidades
+        )
+
+    def separar(self, valor_carta: int) -> float:
+        duro, ases = (1, True) if valor_carta == 11 else (valor_carta, False)
+        if valor_carta == 11:
+            # Los ases separados reciben una sola carta
+            mano = sum(p * self.plantarse(_puntos(*self._robar(duro, ases, v))) for v, p in self._probabilidades)
+        else:
+            mano = sum(p * self.optimo(*self._robar(duro, ases, v)) for v, p in self._probabilidades)
+        return 2 * mano
+
+
+def calcular_tablas(num_mazos: int = 6) -> dict:
+    """
+    Calcula los valores esperados de cada jugada para todas las manos iniciales.
+
+    Returns:
+        dict: ``duras``, ``blandas`` y ``parejas`` con entradas
+        ``[total, carta_visible, {jugada: valor esperado}]``, y ``crupier`` con la
+        distribución final del crupier por carta visible
+    """
+    tablas = {'duras': [], 'blandas': [], 'parejas': [], 'crupier': {}}
+    for carta_visible in range(2, 12):
+        calculadora = _CalculadoraValores(carta_visible, num_mazos)
+        tablas['crupier'][str(carta_visible)] = list(distribucion_crupier(carta_visible, num_mazos))
+        for total in range(4, 22):
+            valores = {
+                PEDIR: calculadora.pedir(total, False),
+                PLANTARSE: calculadora.plantarse(total),
+                DOBLAR: calculadora.doblar(total, False)
+            }
+            tablas['duras'].append([total, carta_visible, valores])
+        for total in range(12, 22):
+            duro = total - 10
+            valores = {
+                PEDIR: calculadora.pedir(duro, True),
+                PLANTARSE: calculadora.plantarse(total),
+                DOBLAR: calculadora.doblar(duro, True)
+            }
+            tablas['blandas'].append([total, carta_visible, valores])
+        for valor_carta in range(2, 12):
+            duro, ases = (2, True) if valor_carta == 11 else (2 * valor_carta, False)
+            valores = {
+                PEDIR: calculadora.pedir(duro, ases),
+                PLANTARSE: calculadora.plantarse(_puntos(duro, ases)),
+                DOBLAR: calculadora.doblar(duro, ases),
+                SEPARAR: calculadora.separar(valor_carta)
+            }
+            tablas['parejas'].append([valor_carta, carta_visible, valores])
+    _distribucion_crupier.cache_clear()
+    return tablas
+
+
+class EstrategiaBasica:
+    """
+    Tabla de estrategia básica de BlackJack con consultas O(1).
+
+    Se obtiene con ``EstrategiaBasica.cargar(num_mazos)``, que lee la tabla de la
+    caché en disco (o la calcula y la guarda la primera vez).
+    """
+
+    def __init__(self, tablas: dict, num_mazos: int):
+        self._num_mazos = num_mazos
+        self._valores = {}
+        for tipo in ('duras', 'blandas', 'parejas'):
+            for total, carta_visible, valores in tablas[tipo]:
+                self._valores[(tipo, total, carta_visible)] = valores
+        self._crupier = {int(carta): tuple(distribucion) for carta, distribucion in tablas['crupier'].items()}
+        self._pedir_vectorizado = None
+
+    @classmethod
+    def cargar(cls, num_mazos: int = 6, cache: CacheDisco = None) -> 'EstrategiaBasica':
+        """
+        Carga la estrategia para un zapato de ``num_mazos`` mazos.
+
+        Args:
+            num_mazos (int, optional): Mazos del zapato. Por defecto 6
+            cache (CacheDisco, optional): Caché a usar. Por defecto ``CacheDisco('estrategia_blackjack')``
+
+        Returns:
+            EstrategiaBasica: La misma instancia en cada llamada del proceso
+        """
+        if num_mazos not in _cargadas:
+            cache = cache or CacheDisco('estrategia_blackjack')
+            clave = f"v{_VERSION}|mazos={num_mazos}|valores={list(BlackJack._valores_por_rango)}"
+            tablas = cache.obtener(clave)
+            if tablas is None:
+                tablas = calcular_tablas(num_mazos)
+                cache.guardar(clave, tablas)
+            _cargadas[num_mazos] = cls(tablas, num_mazos)
+        return _cargadas[num_mazos]
+
+    def get_num_mazos(self) -> int:
+        """Retorna la cantidad de mazos para la que se calculó la tabla"""
+        return self._num_mazos
+
+    def distribucion_crupier(self, carta_visible: int) -> tuple:
+        """
+        Probabilidades de que el crupier termine en 17, 18, 19, 20, 21, se pase o
+        tenga blackjack, según su carta visible (2-11).
+        """
+        return self._crupier[carta_visible]
+
+    def valores(self, puntos: int, blanda: bool, carta_visible: int, pareja: int = None) -> dict:
+        """
+        Retorna el valor esperado (por unidad apostada) de cada jugada posible.
+
+        Args:
+            puntos (int): Puntos de la mano
+            blanda (bool): Si un As de la mano vale 11
+            carta_visible (int): Valor de la carta visible del crupier (2-11)
+            pareja (int, optional): Valor de la carta repetida si la mano es una pareja
+        """
+        if pareja is not None:
+            return self._valores[('parejas', pareja, carta_visible)]
+        if blanda:
+            return self._valores[('blandas', puntos, carta_visible)]
+        return self._valores[('duras', max(puntos, 4), carta_visible)]
+
+    def decidir(self, puntos: int, blanda: bool, carta_visible: int, pareja: int = None,
+                puede_doblar: bool = True, puede_separar: bool = True) -> str:
+        """
+        Retorna la mejor jugada: ``'pedir'``, ``'plantarse'``, ``'doblar'`` o ``'separar'``.
+
+        Con tres cartas o más no se puede doblar ni separar, por lo que la decisión
+        se limita a pedir o plantarse.
+        """
+        if puntos >= 21:
+            return PLANTARSE
+        valores = self.valores(puntos, blanda, carta_visible, pareja if puede_separar else None)
+        permitidas = [PEDIR, PLANTARSE]
+        if puede_doblar:
+            permitidas.append(DOBLAR)
+        if puede_separar and SEPARAR in valores:
+            permitidas.append(SEPARAR)
+        return max(permitidas, key=valores.__getitem__)
+
+    def como_estrategia(self):
+        """
+        Retorna la estrategia vectorizada de pedir o plantarse para SimuladorBlackJack.
+        """
+        if self._pedir_vectorizado is None:
+            import numpy as np
+
+            # Tabla [blanda, puntos, carta_visible] -> pedir
+            tabla = np.zeros((2, 32, 12), dtype=bool)
+            for carta_visible in range(2, 12):
+                for puntos in range(4, 21):
+                    tabla[0, puntos, carta_visible] = self.decidir(puntos, False, carta_visible, puede_doblar=False) == PEDIR
+                for puntos in range(12, 21):
+                    tabla[1, puntos, carta_visible] = self.decidir(puntos, True, carta_visible, puede_doblar=False) == PEDIR
+
+            def estrategia(puntos, blanda, carta_visible):
+                return tabla[blanda.astype(np.intp), np.minimum(puntos, 31), carta_visible]
+
+            self._pedir_vectorizado = estrategia
+        return self._pedir_vectorizado
@@ -0,0 +1,232 @@
+"""
+Evaluador de manos de Texas Hold'em basado en tablas precalculadas.
+
+La fuerza de una mano es un entero comparable: ``categoria << 20`` más los rangos
+de desempate empaquetados en cinco nibbles, de mayor a menor importancia. Una mano
+gana a otra si y solo si su fuerza es mayor, y empatan si es igual.
+
+Las tablas se construyen una sola vez, la primera vez que se evalúa una mano:
+
+- ``_SIN_COLOR``: para cada multiconjunto de rangos (hasta 7 cartas) la mejor mano
+  sin color, indexada por la suma de ``1 << 3 * rango`` de sus cartas.
+- ``_COLOR``: para cada máscara de 13 bits de rangos de un mismo palo, la mejor
+  escalera de color o color que contiene (0 si tiene menos de 5 cartas).
+
+Con 7 cartas no pueden coexistir un color y un full o un póker, así que la fuerza
+final es el máximo entre ambas búsquedas.
+"""
+
+from .Carta import VALORES
+
+CARTA_ALTA = 0
+PAR = 1
+DOBLE_PAR = 2
+TRIO = 3
+ESCALERA = 4
+COLOR = 5
+FULL = 6
+POKER = 7
+ESCALERA_DE_COLOR = 8
+
+NOMBRES_CATEGORIAS = (
+    'Carta alta',
+    'Par',
+    'Doble par',
+    'Trío',
+    'Escalera',
+    'Color',
+    'Full',
+    'Póker',
+    'Escalera de color'
+)
+
+# Claves por carta: contador de 3 bits por rango y bit de rango para las máscaras de palo
+_CLAVE = tuple(1 << 3 * (c >> 2) for c in range(52))
+_BIT = tuple(1 << (c >> 2) for c in range(52))
+
+_CUENTA_BITS = tuple(bin(m).count('1') for m in range(1 << 13))
+
+_SIN_COLOR: dict = None
+_COLOR: list = None
+
+# Versiones NumPy de las tablas para la evaluación por lotes
+_TABLAS_LOTE: tuple = None
+
+
+def _fuerza(categoria: int, rangos: list) -> int:
+    """Empaqueta una categoría y hasta cinco rangos de desempate en un entero."""
+    fuerza = categoria
+    for i in range(5):
+        fuerza = (fuerza << 4) | (rangos[i] if i < len(rangos) else 0)
+    return fuerza
+
+
+def _escalera_mas_alta(mascara: int) -> int:
+    """Retorna el rango más alto de la mejor escalera de la máscara o -1 si no hay."""
+    for alto in range(12, 3, -1):
+        ventana = 0b11111 << (alto - 4)
+        if mascara & ventana == ventana:
+            return alto
+    # Escalera baja: A-2-3-4-5
+    if mascara & 0b1000000001111 == 0b1000000001111:
+        return 3
+    return -1
+
+
+def _mejor_sin_color(cuentas: list) -> int:
+    """Calcula la mejor mano sin color de un multiconjunto de rangos."""
+    por_cuenta = ([], [], [], [], [])
+    mascara = 0
+    for rango in range(12, -1, -1):
+        n = cuentas[rango]
+        if n:
+            por_cuenta[n].append(rango)
+            mascara |= 1 << rango
+    pokers, trios, pares, sueltas = por_cuenta[4], por_cuenta[3], por_cuenta[2], por_cuenta[1]
+
+    if pokers:
+        alto = pokers[0]
+        resto = [r for r in range(12, -1, -1) if cuentas[r] and r != alto]
+        return _fuerza(POKER, [alto] + resto[:1])
+    if trios and (len(trios) > 1 or pares):
+        alto = trios[0]
+        pareja = max(trios[1:] + pares)
+        return _fuerza(FULL, [alto, pareja])
+    escalera = _escalera_mas_alta(mascara)
+    if escalera >= 0:
+        return _fuerza(ESCALERA, [escalera])
+    if trios:
+        return _fuerza(TRIO, trios[:1] + sueltas[:2])
+    if len(pares) >= 2:
+        resto = sorted(pares[2:] + sueltas, reverse=True)
+        return _fuerza(DOBLE_PAR, pares[:2] + resto[:1])
+    if pares:
+        return _fuerza(PAR, pares[:1] + sueltas[:3])
+    return _fuerza(CARTA_ALTA, sueltas[:5])
+
+
+def _mejor_color(mascara: int) -> int:
+    """Calcula la mejor escalera de color o color de una máscara de un solo palo."""
+    if _CUENTA_BITS[mascara] < 5:
+        return 0
+    escalera = _escalera_mas_alta(mascara)
+    if escalera >= 0:
+        return _fuerza(ESCALERA_DE_COLOR, [escalera])
+    rangos = [r for r in range(12, -1, -1) if mascara >> r & 1]
+    return _fuerza(COLOR, rangos[:5])
+
+
+def _construir_tablas() -> None:
+    """Construye las tablas de búsqueda (unos 74 000 multiconjuntos de rangos)."""
+    global _SIN_COLOR, _COLOR
+    sin_color = {}
+    cuentas = [0] * 13
+
+    def recorrer(rango: int, restantes: int, clave: int) -> None:
+        if rango == 13:
+            if clave:
+                sin_color[clave] = _mejor_sin_color(cuentas)
+            return
+        for n in range(min(4, restantes) + 1):
+            cuentas[rango] = n
+            recorrer(rango + 1, restantes - n, clave + (n << 3 * rango))
+        cuentas[rango] = 0
+
+    recorrer(0, 7, 0)
+    _COLOR = [_mejor_color(m) for m in range(1 << 13)]
+    _SIN_COLOR = sin_color
+
+
+def evaluar(cartas) -> int:
+    """
+    Evalúa una mano de 1 a 7 cartas codificadas (ver Carta).
+
+    Args:
+        cartas (Iterable[int]): Cartas de la mano, por ejemplo mano + cartas comunitarias
+
+    Returns:
+        int: Fuerza de la mejor mano de 5 cartas; mayor es mejor
+
+    Ejemplo:
+        >>> evaluar([Carta.desde_texto(t) for t in ('A♠', 'A♥', 'K♦', 'K♣', '2♠')]) > \\
+        ...     evaluar([Carta.desde_texto(t) for t in ('A♠', 'A♥', 'Q♦', 'J♣', '2♠')])
+        True
+    """
+    if _SIN_COLOR is None:
+        _construir_tablas()
+    clave = 0
+    m0 = m1 = m2 = m3 = 0
+    for c in cartas:
+        clave += _CLAVE[c]
+        palo = c & 3
+        if palo == 0:
+            m0 |= _BIT[c]
+        elif palo == 1:
+            m1 |= _BIT[c]
+        elif palo == 2:
+            m2 |= _BIT[c]
+        else:
+            m3 |= _BIT[c]
+    return max(_SIN_COLOR[clave], _COLOR[m0], _COLOR[m1], _COLOR[m2], _COLOR[m3])
+
+
+def evaluar_lote(cartas):
+    """
+    Evalúa un lote de manos con NumPy.
+
+    Args:
+        cartas (numpy.ndarray): Matriz de enteros de forma (N, k) con 1 <= k <= 7
+
+    Returns:
+        numpy.ndarray: Vector int64 con la fuerza de cada mano
+    """
+    import numpy as np
+
+    claves_ordenadas, fuerzas_ordenadas, color, clave_np, bit_np = _tablas_lote()
+    cartas = np.asarray(cartas, dtype=np.intp)
+    claves = clave_np[cartas].sum(axis=1)
+    fuerza = fuerzas_ordenadas[np.searchsorted(claves_ordenadas, claves)]
+    bits = bit_np[cartas]
+    palos = cartas & 3
+    for palo in range(4):
+        mascara = np.where(palos == palo, bits, 0).sum(axis=1)
+        np.maximum(fuerza, color[mascara], out=fuerza)
+    return fuerza
+
+
+def _tablas_lote() -> tuple:
+    """Convierte (una sola vez) las tablas de búsqueda a arreglos NumPy."""
+    global _TABLAS_LOTE
+    if _TABLAS_LOTE is None:
+        import numpy as np
+
+        if _SIN_COLOR is None:
+            _construir_tablas()
+        claves = np.fromiter(sorted(_SIN_COLOR), dtype=np.int64, count=len(_SIN_COLOR))
+        fuerzas = np.fromiter((_SIN_COLOR[k] for k in claves.tolist()), dtype=np.int64, count=len(claves))
+        _TABLAS_LOTE = (
+            claves,
+            fuerzas,
+            np.array(_COLOR, dtype=np.int64),
+            np.array(_CLAVE, dtype=np.int64),
+            np.array(_BIT, dtype=np.intp),
+        )
+    return _TABLAS_LOTE
+
+
+def categoria_de(fuerza: int) -> int:
+    """Retorna la categoría (CARTA_ALTA ... ESCALERA_DE_COLOR) de una fuerza."""
+    return fuerza >> 20
+
+
+def nombre_de_mano(fuerza: int) -> str:
+    """
+    Retorna una descripción legible de la fuerza, por ejemplo ``"Full (K sobre 7)"``.
+    """
+    categoria = fuerza >> 20
+    alto = VALORES[fuerza >> 16 & 0xF]
+    if categoria == FULL:
+        return f"{NOMBRES_CATEGORIAS[categoria]} ({alto} sobre {VALORES[fuerza >> 12 & 0xF]})"
+    if categoria in (ESCALERA, ESCALERA_DE_COLOR):
+        return f"{NOMBRES_CATEGORIAS[categoria]} al {alto}"
+    return f"{NOMBRES_CATEGORIAS[categoria]} de {alto}"
@@ -4,6 +4,7 @@ from ...SalaDeJuego import SalaDeJuego
 from abc import ABC, abstractmethod
 
 from ....usuario.Usuario import Usuario
+from servidor.src.utils.aleatorio import GeneradorAleatorio
 
 class JuegoDeCartas(SalaDeJuego, ABC):
     _mazo: Mazo
@@ -12,14 +13,15 @@ class JuegoDeCartas(SalaDeJuego, ABC):
     _mano_de_jugadores: list
     _mano_de_casino: list
     
-    def __init__(self, id: str, capacidad: int, capacidadMinima: int, valor_entrada_mesa: int):
+    def __init__(self, id: str, capacidad: int, capacidadMinima: int, valor_entrada_mesa: int, generador: GeneradorAleatorio = None):
         # ARREGLO: SalaDeJuego solo acepta capacidad y capacidadMinima
         super().__init__(capacidad, capacidadMinima)
         
         # Establecer el ID después de la inicialización del padre
         self._id = id
         
-        self._mazo = Mazo(52)
+        # Cada mesa baraja con su propio flujo aleatorio
+        self._mazo = Mazo(52, generador=generador)
         self._monto_descartes = []
         self._valor_entrada_mesa = valor_entrada_mesa
         self._mano_de_jugadores = []
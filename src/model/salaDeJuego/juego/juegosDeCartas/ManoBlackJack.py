@@ -0,0 +1,77 @@
+from typing import override
+
+
+class ManoBlackJack:
+    """
+    Mano de BlackJack que acumula sus puntos a medida que recibe cartas.
+
+    Guarda el total duro (cada As cuenta 1) y la cantidad de ases, así que agregar
+    una carta y consultar los puntos son O(1) y sin recorrer la mano. Un As vale 11
+    solo si con eso la mano no pasa de 21, por lo que varias cartas de As se
+    puntúan correctamente.
+    """
+
+    __slots__ = ('_cartas', '_valores', '_duro', '_ases')
+
+    def __init__(self, valores: tuple, cartas=()):
+        """
+        Args:
+            valores (tuple): Valor de cada rango de carta; el As es el que vale 11
+            cartas (Iterable[int], optional): Cartas iniciales de la mano
+        """
+        self._cartas = []
+        self._valores = valores
+        self._duro = 0
+        self._ases = 0
+        for carta in cartas:
+            self.agregar(carta)
+
+    def agregar(self, carta: int) -> int:
+        """
+        Agrega una carta a la mano.
+
+        Returns:
+            int: Los puntos de la mano después de agregarla
+        """
+        self._cartas.append(carta)
+        valor = self._valores[carta >> 2]
+        if valor == 11:
+            self._duro += 1
+            self._ases += 1
+        else:
+            self._duro += valor
+        return self.get_puntos()
+
+    def get_puntos(self) -> int:
+        """Retorna los puntos de la mano"""
+        duro = self._duro
+        return duro + 10 if self._ases and duro <= 11 else duro
+
+    def get_total_duro(self) -> int:
+        """Retorna los puntos contando cada As como 1"""
+        return self._duro
+
+    def get_ases(self) -> int:
+        """Retorna la cantidad de ases de la mano"""
+        return self._ases
+
+    def es_blanda(self) -> bool:
+        """Retorna si un As de la mano está valiendo 11"""
+        return self._ases > 0 and self._duro <= 11
+
+    def get_cartas(self) -> list:
+        """Retorna las cartas de la mano"""
+        return self._cartas
+
+    def __len__(self) -> int:
+        return len(self._cartas)
+
+    def __iter__(self):
+        return iter(self._cartas)
+
+    def __getitem__(self, indice):
+        return self._cartas[indice]
+
+    @override
+    def __repr__(self) -> str:
+        return repr(self._cartas)
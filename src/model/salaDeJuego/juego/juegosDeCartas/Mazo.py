@@ -1,22 +1,59 @@
-import random
 from typing import override
+from .Carta import CARTAS
+from servidor.src.utils.aleatorio import GeneradorAleatorio, GeneradorSeguro
 
 
 class Mazo:
+    """
+    Mazo o zapato de cartas.
+
+    Con ``numero_de_mazos`` mayor a 1 funciona como el zapato de una mesa de
+    BlackJack: las cartas de todos los mazos se guardan en una lista creada una
+    sola vez y se reparten avanzando un cursor, sin crear objetos por carta. La
+    ``penetracion`` marca dónde va la carta de corte; al pasarla,
+    ``nueva_ronda`` vuelve a barajar antes de la siguiente ronda.
+
+    El barajado usa el generador inyectado: ``GeneradorSeguro`` por defecto o un
+    ``GeneradorSimulacion`` con semilla para repetir una partida.
+    """
     _tamanoDeMazo: int
     _mazo: list
     _cartas_originales: list
-    
-    def __init__(self, tamanoDeMazo: int):
+
+    def __init__(self, tamanoDeMazo: int, numero_de_mazos: int = 1, penetracion: float = 1.0,
+                 generador: GeneradorAleatorio = None):
+        """
+        Args:
+            tamanoDeMazo (int): Cartas por mazo
+            numero_de_mazos (int, optional): Mazos del zapato. Por defecto 1
+            penetracion (float, optional): Fracción del zapato que se reparte antes
+                de la carta de corte (0 < penetracion <= 1). Por defecto 1
+            generador (GeneradorAleatorio, optional): Generador para barajar.
+                Por defecto uno nuevo GeneradorSeguro
+
+        Raises:
+            ValueError: Si la cantidad de mazos o la penetración no son válidas
+        """
+        if numero_de_mazos < 1:
+            raise ValueError("El zapato debe tener al menos un mazo")
+        if not 0 < penetracion <= 1:
+            raise ValueError("La penetración debe estar entre 0 y 1")
         self.__tamanoDeMazo = tamanoDeMazo
-        self.__mazo = []
+        self.__numero_de_mazos = numero_de_mazos
+        self.__penetracion = penetracion
+        self.__generador = generador or GeneradorSeguro()
         self._cartas_originales = self._generar_cartas_estandar()
+        self.__mazo = self._cartas_originales * numero_de_mazos
+        self.__posicion = 0
+        self.__corte = self._calcular_corte()
         self.crear_mazo()
 
     def _generar_cartas_estandar(self):
-        palos = ['♠', '♥', '♦', '♣']
-        valores = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
-        return [f"{valor}{palo}" for palo in palos for valor in valores]
+        # Las cartas son enteros 0-51 (ver Carta); se reutilizan las mismas instancias
+        return list(CARTAS)
+
+    def _calcular_corte(self) -> int:
+        return int(len(self.__mazo) * self.__penetracion)
 
     def get_tamanoDeMazo(self) -> int:
         return self.__tamanoDeMazo
@@ -24,32 +61,108 @@ class Mazo:
     def set_tamanoDeMazo(self, tamanoDeMazo: int):
         self.__tamanoDeMazo = tamanoDeMazo
 
+    def get_numero_de_mazos(self) -> int:
+        return self.__numero_de_mazos
+
+    def get_penetracion(self) -> float:
+        return self.__penetracion
+
+    def set_penetracion(self, penetracion: float):
+        if not 0 < penetracion <= 1:
+            raise ValueError("La penetración debe estar entre 0 y 1")
+        self.__penetracion = penetracion
+        self.__corte = self._calcular_corte()
+
+    def get_generador(self) -> GeneradorAleatorio:
+        return self.__generador
+
+    def set_generador(self, generador: GeneradorAleatorio):
+        self.__generador = generador
+
     def get_mazo(self) -> list:
-        return self.__mazo
+        """Retorna las cartas que quedan por repartir"""
+        return self.__mazo[self.__posicion:]
 
     def set_mazo(self, mazo: list):
-        self.__mazo = mazo
-    
+        self.__mazo = list(mazo)
+        self.__posicion = 0
+        self.__corte = self._calcular_corte()
+
+    def cartas_restantes(self) -> int:
+        """Retorna la cantidad de cartas que quedan por repartir"""
+        return len(self.__mazo) - self.__posicion
+
     def baragear(self):
-        random.shuffle(self.__mazo)
+        # Baraja en el lugar solo las cartas que quedan por repartir
+        self.__generador.barajar(self.__mazo, self.__posicion)
 
     def sacar_carta(self):
-        if not self.__mazo:
-            print("El mazo está vacío, recreando y barajando...")
+        if self.__posicion >= len(self.__mazo):
+            # Zapato agotado a mitad de ronda: se recogen las cartas y se baraja
+            self.crear_mazo()
+            if not self.__mazo:
+                return None
+        carta = self.__mazo[self.__posicion]
+        self.__posicion += 1
+        return carta
+
+    def sacar_cartas(self, cantidad: int) -> list:
+        """
+        Saca varias cartas de una vez.
+
+        Returns:
+            list: Las cartas en el orden en que salen del zapato
+
+        Raises:
+            ValueError: Si se piden más cartas de las que tiene el zapato completo
+        """
+        if cantidad > len(self.__mazo):
+            raise ValueError(f"El zapato solo tiene {len(self.__mazo)} cartas")
+        if self.__posicion + cantidad > len(self.__mazo):
             self.crear_mazo()
-            self.baragear()
-        return self.__mazo.pop() if self.__mazo else None
+        inicio = self.__posicion
+        self.__posicion += cantidad
+        return self.__mazo[inicio:self.__posicion]
 
     def ingresar_carta(self, carta):
-        self.__mazo.append(carta)
+        # La carta devuelta es la próxima en salir
+        if self.__posicion > 0 and self.__mazo[self.__posicion - 1] == carta:
+            # Es la última repartida: basta con retroceder el cursor
+            self.__posicion -= 1
+        else:
+            # Cualquier otra se agrega sin pisar las cartas ya repartidas
+            self.__mazo.insert(self.__posicion, carta)
+            self.__corte = self._calcular_corte()
+
+    def necesita_barajar(self) -> bool:
+        """Retorna si ya se repartió la carta de corte"""
+        return self.__posicion >= self.__corte
+
+    def nueva_ronda(self) -> bool:
+        """
+        Prepara el zapato para una nueva ronda, barajando si se pasó la carta de corte.
+
+        Returns:
+            bool: True si se barajó el zapato
+        """
+        if self.necesita_barajar():
+            self.crear_mazo()
+            return True
+        return False
 
     def crear_mazo(self):
-        self.__mazo = self._cartas_originales.copy()
+        # Recoge todas las cartas en la misma lista y las baraja; las devueltas con
+        # ingresar_carta que no eran la última repartida se descartan
+        self.__mazo[:] = self._cartas_originales * self.__numero_de_mazos
+        self.__posicion = 0
+        self.__corte = self._calcular_corte()
         self.baragear()
 
     @override
     def __repr__(self) -> str:
         return (
             f"tamanoDeMazo: {self.__tamanoDeMazo}\n"
-            f"mazo: {self.__mazo}"
-        )
\ No newline at end of file
+            f"numero_de_mazos: {self.__numero_de_mazos}\n"
+            f"cartas_restantes: {self.cartas_restantes()}\n"
+            f"mazo: {self.get_mazo()}"
+        )
@@ -1,6 +1,11 @@
+import uuid
+from datetime import datetime
+
 from servidor.src.model.salaDeJuego.enums.Etapas import Etapas
 from servidor.src.model.usuario.Usuario import Usuario
 from servidor.src.model.salaDeJuego.juego.juegosDeCartas.JuegoDeCartas import JuegoDeCartas
+from servidor.src.model.salaDeJuego.juego.juegosDeCartas.EvaluadorDeManos import evaluar, nombre_de_mano
+from servidor.src.utils.firestore import array_union
 
 
 
@@ -16,6 +21,12 @@ class Poker(JuegoDeCartas):
         self.__etapa = Etapas.PRE_FLOP
         self.__all_in = False
         self.__pozo = 0
+        self.__numero_mano = 0
+        self.__id_mano = None
+        self.__liquidacion = None
+        self.__mano_terminada = False
+        # Manos terminadas que aún no se escriben: (id de la mano, movimientos, cambios de la sala)
+        self.__liquidaciones_pendientes = []
 
     def get_dealer(self):
         return self.__dealer
@@ -53,12 +64,9 @@ class Poker(JuegoDeCartas):
             activos = [j for j in self._mano_de_jugadores if j['en_juego']]
             if len(activos) == 1:
                 ganador = activos[0]['jugador']
-                ganador._saldo += self.__pozo
                 self._historial.append(f"{ganador._nombre} ganó el pozo de {self.__pozo} por abandono de los demás.")
                 print(f"{ganador._nombre} gana el pozo de {self.__pozo} por abandono de los demás.")
-                self.__pozo = 0
-                # Lógica de cierre de mano: preguntar si quieren seguir, reiniciar, etc.
-                self.preguntar_continuar_jugadores()
+                self._repartir_pozo([ganador])
         else:
             print(f"{usuario._nombre} no está en juego o ya se retiró.")
     
@@ -86,16 +94,12 @@ class Poker(JuegoDeCartas):
             print(f"{usuario._nombre} ya igualó la apuesta máxima.")
             return
         if usuario._saldo >= diferencia:
-            usuario._saldo -= diferencia
-            jugador_info['apuesta'] += diferencia
-            self.__pozo += diferencia
+            self._aportar(jugador_info, diferencia)
             self._historial.append(f"{usuario._nombre} igualó con {diferencia}")
         elif usuario._saldo > 0:
             # ALL IN: iguala con todo lo que tiene
             all_in_monto = usuario._saldo
-            jugador_info['apuesta'] += all_in_monto
-            self.__pozo += all_in_monto
-            usuario._saldo = 0
+            self._aportar(jugador_info, all_in_monto)
             self.set_all_in(True)
             self._historial.append(f"{usuario._nombre} fue ALL IN igualando con {all_in_monto}")
         else:
@@ -116,16 +120,12 @@ class Poker(JuegoDeCartas):
             print(f"El monto a subir debe ser mayor a 0.")
             return
         if usuario._saldo >= total:
-            usuario._saldo -= total
-            jugador_info['apuesta'] += total
-            self.__pozo += total
+            self._aportar(jugador_info, total)
             self._historial.append(f"{usuario._nombre} subió la apuesta en {monto}")
         elif usuario._saldo > 0:
             # ALL IN: sube con todo lo que tiene
             all_in_monto = usuario._saldo
-            jugador_info['apuesta'] += all_in_monto
-            self.__pozo += all_in_monto
-            usuario._saldo = 0
+            self._aportar(jugador_info, all_in_monto)
             self.set_all_in(True)
             self._historial.append(f"{usuario._nombre} fue ALL IN subiendo con {all_in_monto}")
         else:
@@ -137,9 +137,15 @@ class Poker(JuegoDeCartas):
             self._mazo.baragear()
         # Repartir 2 cartas a cada jugador activo
         self._mano_de_jugadores = []
+        self.__numero_mano += 1
+        # El número de mano vuelve a 1 en cada instancia; el id identifica la mano en la base de datos
+        self.__id_mano = uuid.uuid4().hex
+        self.__liquidacion = None
+        self.__mano_terminada = False
         for jugador in self.get_jugadores_activos():
             mano = [self._mazo.sacar_carta(), self._mazo.sacar_carta()]
-            self._mano_de_jugadores.append({'jugador': jugador, 'mano': mano, 'en_juego': True, 'apuesta': 0})
+            # 'apuesta' es lo apostado en la ronda actual y 'aportado' lo puesto en toda la mano
+            self._mano_de_jugadores.append({'jugador': jugador, 'mano': mano, 'en_juego': True, 'apuesta': 0, 'aportado': 0})
         # Inicializar cartas comunitarias
         self.cartas_comunitarias = []
 
@@ -156,9 +162,7 @@ class Poker(JuegoDeCartas):
         if monto <= 0 or monto > usuario._saldo:
             print(f"Monto inválido para apostar.")
             return
-        usuario._saldo -= monto
-        jugador_info['apuesta'] += monto
-        self.__pozo += monto
+        self._aportar(jugador_info, monto)
         self._historial.append(f"{usuario._nombre} apostó {monto}")
 
     def get_jugadores_activos(self) -> list:
@@ -188,16 +192,20 @@ class Poker(JuegoDeCartas):
             print(f"{jugador_info['jugador']._nombre}: {jugador_info['mano']}")
 
     def avanzar_etapa(self):
+        if self.__mano_terminada:
+            print("La mano ya terminó.")
+            return
         # Si solo queda un jugador, termina la partida y le da el pozo
         activos = [j for j in self._mano_de_jugadores if j['en_juego']]
         if len(activos) == 1:
             ganador = activos[0]['jugador']
-            ganador._saldo += self.__pozo
             self._historial.append(f"{ganador._nombre} ganó el pozo de {self.__pozo} por abandono de los demás.")
             print(f"{ganador._nombre} gana el pozo de {self.__pozo} por abandono de los demás.")
-            self.__pozo = 0
-            self.set_etapa(Etapas.SHOWDOWN)
+            self._repartir_pozo([ganador])
             return
+        # Las apuestas de la ronda se reinician en cada calle; lo aportado a la mano se mantiene
+        for jugador_info in self._mano_de_jugadores:
+            jugador_info['apuesta'] = 0
         # Avanza la etapa del juego y reparte cartas comunitarias
         if self.__etapa == Etapas.PRE_FLOP:
             # Flop: 3 cartas comunitarias
@@ -225,45 +233,192 @@ class Poker(JuegoDeCartas):
 
     def showdown(self):
         # Si ya hay un ganador por abandono, no hacer nada
+        if self.__mano_terminada:
+            return
         if self.__etapa != Etapas.SHOWDOWN:
             print("No es la etapa de showdown aún.")
             return
         activos = [j for j in self._mano_de_jugadores if j['en_juego']]
         if len(activos) == 1:
             ganador = activos[0]['jugador']
-            ganador._saldo += self.__pozo
             self._historial.append(f"{ganador._nombre} ganó el pozo de {self.__pozo} por abandono de los demás.")
             print(f"{ganador._nombre} gana el pozo de {self.__pozo} por abandono de los demás.")
-            self.__pozo = 0
-            # Preguntar si quieren continuar después de determinar el ganador por abandono
-            self.preguntar_continuar_jugadores()
+            self._repartir_pozo([ganador])
             return
         if not activos:
             print("No hay jugadores activos para el showdown.")
             return
-        # Evaluar manos (simplificado: mayor carta de la mano + comunidad)
-        def mejor_carta(mano, comunidad):
-            valores = {'2':2,'3':3,'4':4,'5':5,'6':6,'7':7,'8':8,'9':9,'10':10,'J':11,'Q':12,'K':13,'A':14}
-            return max([valores.get(str(c)[:-1], 0) for c in mano + comunidad])
-        
-        mejor = -1
-        ganador = None
-        for jugador_info in activos:
-            valor = mejor_carta(jugador_info['mano'], self.cartas_comunitarias)
-            if valor > mejor:
-                mejor = valor
-                ganador = jugador_info['jugador']
-                
-        if ganador:
-            ganador._saldo += self.__pozo
-            self._historial.append(f"{ganador._nombre} ganó el pozo de {self.__pozo} en el showdown.")
-            print(f"{ganador._nombre} es el ganador y recibe el pozo de {self.__pozo}!")
-            self.__pozo = 0
+        # Evaluar la mejor mano de 5 cartas de cada jugador (mano + comunidad)
+        fuerzas = [evaluar(j['mano'] + self.cartas_comunitarias) for j in activos]
+        mejor = max(fuerzas)
+        ganadores = [j['jugador'] for j, fuerza in zip(activos, fuerzas) if fuerza == mejor]
+        pozo = self.__pozo
+        premios = self._repartir_pozo(ganadores)
+        if len(ganadores) == 1:
+            ganador = ganadores[0]
+            self._historial.append(f"{ganador._nombre} ganó el pozo de {pozo} en el showdown con {nombre_de_mano(mejor)}.")
+            print(f"{ganador._nombre} es el ganador con {nombre_de_mano(mejor)} y recibe el pozo de {pozo}!")
+        else:
+            nombres = ", ".join(g._nombre for g in ganadores)
+            self._historial.append(f"{nombres} empataron con {nombre_de_mano(mejor)} y dividieron el pozo de {pozo}: {premios}.")
+            print(f"Empate entre {nombres} con {nombre_de_mano(mejor)}. Se divide el pozo de {pozo}.")
+
+    def _repartir_pozo(self, ganadores: list) -> list:
+        """
+        Divide el pozo en partes iguales entre los ganadores y lo deja en 0.
+        Con pozos enteros, las fichas sobrantes van a los primeros ganadores.
+        Deja lista la liquidación de la mano (ver get_liquidacion), la encola
+        para que liquidar la escriba y termina la mano: hasta repartir de nuevo
+        no se vuelve a repartir el pozo.
+
+        Returns:
+            list: Monto entregado a cada ganador, en el mismo orden
+        """
+        if self.__mano_terminada:
+            return []
+        pozo = self.__pozo
+        if isinstance(pozo, int):
+            parte, sobrante = divmod(pozo, len(ganadores))
+            premios = [parte + (1 if i < sobrante else 0) for i in range(len(ganadores))]
         else:
-            print("Empate o no se pudo determinar el ganador.")
-            
-        # Preguntar si quieren continuar después de determinar el ganador
-        self.preguntar_continuar_jugadores()
+            premios = [pozo / len(ganadores)] * len(ganadores)
+        for ganador, premio in zip(ganadores, premios):
+            ganador._saldo += premio
+        self.__pozo = 0
+        self.__liquidacion = self._armar_liquidacion(ganadores, premios)
+        resumen = {
+            "id_mano": self.__id_mano,
+            "mano": self.__numero_mano,
+            "pozo": pozo,
+            "ganadores": [ganador.get_id() for ganador in ganadores],
+            "premios": premios,
+            "fecha_hora": str(datetime.now())
+        }
+        cambios_sala = {"pozo": self.__pozo, "historial": array_union([resumen])}
+        self.__liquidaciones_pendientes.append((self.__id_mano, self.__liquidacion, cambios_sala))
+        self.__mano_terminada = True
+        self.__etapa = Etapas.SHOWDOWN
+        return premios
+
+    def _aportar(self, jugador_info: dict, monto: float) -> None:
+        """Pasa el monto del saldo del jugador al pozo."""
+        jugador_info['jugador']._saldo -= monto
+        jugador_info['apuesta'] += monto
+        jugador_info['aportado'] = jugador_info.get('aportado', 0) + monto
+        self.__pozo += monto
+
+    def _armar_liquidacion(self, ganadores: list, premios: list) -> list:
+        fecha_hora = str(datetime.now())
+        liquidacion = []
+        for jugador_info in self._mano_de_jugadores:
+            jugador = jugador_info['jugador']
+            premio = sum(p for ganador, p in zip(ganadores, premios) if ganador is jugador)
+            aportado = jugador_info.get('aportado', 0)
+            if not aportado and not premio:
+                continue
+            registro = {
+                "mesa": self._id,
+                "tipo_juego": self.__class__.__name__,
+                "mano": self.__numero_mano,
+                "id_mano": self.__id_mano,
+                "apostado": aportado,
+                "premio": premio,
+                "monto": premio - aportado,
+                "fecha_hora": fecha_hora
+            }
+            liquidacion.append((jugador, premio - aportado, registro))
+        return liquidacion
+
+    def mano_terminada(self) -> bool:
+        """Indica si la mano actual ya terminó y se repartió su pozo."""
+        return self.__mano_terminada
+
+    def get_id_mano(self) -> str | None:
+        """Retorna el id único de la última mano repartida (None si no se ha repartido)."""
+        return self.__id_mano
+
+    def get_liquidacion(self) -> list | None:
+        """
+        Retorna el resultado de la última mano repartida para SalaDeJuegoServicio.liquidar_apuestas:
+        tuplas (usuario, monto neto, registro de historial), o None si la mano no ha terminado.
+        """
+        return self.__liquidacion
+
+    def tiene_liquidacion_pendiente(self) -> bool:
+        """Indica si hay manos terminadas cuyo resultado aún no se escribe (ver liquidar)."""
+        return bool(self.__liquidaciones_pendientes)
+
+    def jugar_turno(self, usuario):
+        return super().jugar_turno(usuario)
+
+    async def actualizar_jugador_activo(self, id: str, usuario: Usuario):
+        """
+        Actualiza el jugador activo en Firestore usando el servicio
+        Args:
+            id (str): ID de la sala de juego
+            usuario (Usuario): Usuario que será el turno activo
+        """
+        from servidor.src.model.salaDeJuego.SalaDeJuegoServicio import SalaDeJuegoServicio
+        try:
+            await SalaDeJuegoServicio().actualizar_jugador_activo(id, usuario)
+        except Exception as e:
+            print(f"Error al actualizar jugador activo: {e}")
+
+    async def liquidar(self, servicio=None) -> list:
+        """
+        Escribe el resultado de las manos terminadas en los saldos de los jugadores,
+        cada una en un lote atómico junto con el pozo y el historial de la sala. El id
+        de la liquidación es el id único de la mano (se crea al repartir), así que
+        llamarla de nuevo no cobra ni paga dos veces.
+
+        Las jugadas solo cambian los saldos en memoria: quien termina la mano debe
+        llamarla. Las acciones de Poker del anfitrión de mesas (AccionesMesa) lo
+        hacen después de cada jugada; el juego por consola no escribe los saldos.
+        Terminar la mano no pregunta nada ni reparte otra: eso lo hace quien juega
+        la mesa (jugar_partida en la consola).
+
+        Returns:
+            list: El resultado de liquidar_apuestas por cada mano escrita, en orden
+
+        Raises:
+            ValueError: Si no existe la sala activa o algún jugador; la mano queda
+                pendiente para reintentarla
+        """
+        if servicio is None:
+            from servidor.src.model.salaDeJuego.SalaDeJuegoServicio import SalaDeJuegoServicio
+            servicio = SalaDeJuegoServicio()
+        resultados = []
+        while self.__liquidaciones_pendientes:
+            id_mano, movimientos, cambios_sala = self.__liquidaciones_pendientes[0]
+            resultados.append(await servicio.liquidar_apuestas(
+                self._id, movimientos, id_liquidacion=id_mano, cambios_sala=cambios_sala
+            ))
+            self.__liquidaciones_pendientes.pop(0)
+        return resultados
+
+    def calcular_equidad(self, manos: list = None, comunidad: list = None, iteraciones: int = 20_000, tolerancia: float = 0.01, semilla: int = None) -> dict:
+        """
+        Calcula las probabilidades de ganar, empatar y perder de cada mano en juego.
+        Sin argumentos usa las manos de los jugadores activos y las cartas
+        comunitarias de la etapa actual; desde el flop el cálculo es exacto y antes
+        se estima por Monte Carlo (ver EquidadPoker.calcular_equidad).
+
+        Returns:
+            dict: ``jugadores`` (probabilidades por mano, con la clave ``jugador``
+            cuando se usan las manos de la mesa), ``muestras`` y ``exacto``
+        """
+        from servidor.src.model.salaDeJuego.juego.juegosDeCartas.EquidadPoker import calcular_equidad
+        activos = None
+        if manos is None:
+            activos = [j for j in self._mano_de_jugadores if j['en_juego']]
+            manos = [j['mano'] for j in activos]
+        if comunidad is None:
+            comunidad = getattr(self, 'cartas_comunitarias', [])
+        resultado = calcular_equidad(manos, comunidad, iteraciones=iteraciones, tolerancia=tolerancia, semilla=semilla)
+        if activos is not None:
+            for jugador_info, probabilidades in zip(activos, resultado['jugadores']):
+                probabilidades['jugador'] = jugador_info['jugador']
+        return resultado
 
     def preguntar_continuar_jugadores(self):
         jugadores_a_remover = []
@@ -310,9 +465,7 @@ class Poker(JuegoDeCartas):
         jugador_info = next((j for j in self._mano_de_jugadores if j['jugador'] == usuario and j['en_juego']), None)
         if jugador_info and usuario._saldo > 0:
             monto = usuario._saldo
-            jugador_info['apuesta'] += monto
-            self.__pozo += monto
-            usuario._saldo = 0
+            self._aportar(jugador_info, monto)
             self.set_all_in(True)
             self._historial.append(f"{usuario._nombre} fue ALL IN con {monto}")
         else:
@@ -406,8 +559,6 @@ class Poker(JuegoDeCartas):
             elif len(acciones_realizadas) == len([j for j in jugadores if any(m['jugador'] == j and m['en_juego'] for m in self._mano_de_jugadores)]):
                 if all(j['apuesta'] == max(j2['apuesta'] for j2 in activos) for j in activos):
                     self.avanzar_etapa()
-                    for j in activos:
-                        j['apuesta'] = 0
                     acciones_realizadas.clear()
             turno += 1
         limpiar()
@@ -417,4 +568,6 @@ class Poker(JuegoDeCartas):
         self.showdown()
         print("\nHistorial:")
         for h in self._historial:
-            print(h)
\ No newline at end of file
+            print(h)
+        # Terminada la mano, se pregunta quién sigue y se reparte otra si hay jugadores
+        self.preguntar_continuar_jugadores()
\ No newline at end of file
@@ -0,0 +1,323 @@
+"""
+Rangos de manos iniciales de Texas Hold'em y equidad rango contra rango.
+
+Notación aceptada (separada por comas):
+
+- ``AA``, ``AKs``, ``AKo``, ``AK`` (suited y offsuit)
+- ``QQ+``, ``ATs+``, ``KTo+``: la mano y las mejores con la misma carta alta
+- ``99-66``, ``A5s-A2s``: intervalos
+- ``AsKd``: una combinación concreta
+- ``top 20%`` o ``20%``: el mejor 20 % de las combinaciones según la fórmula de Chen
+
+La equidad preflop se estima por Monte Carlo para cada par de combinaciones. Los
+pares equivalentes por isomorfismo de palos se calculan una sola vez, el trabajo
+se reparte entre procesos y los resultados se guardan en una caché en disco
+indexada por los rangos canónicos, de modo que consultas equivalentes la comparten.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import permutations
+
+import numpy as np
+
+from .Carta import Carta
+from .EquidadPoker import calcular_equidad
+from servidor.src.utils.cache_disco import CacheDisco
+
+_RANGOS = '23456789TJQKA'
+_PERMUTACIONES_PALOS = tuple(permutations(range(4)))
+TOTAL_COMBINACIONES = 1326
+
+
+def _rango_de_letra(letra: str) -> int:
+    letra = 'T' if letra == '1' else letra.upper()
+    indice = _RANGOS.find(letra)
+    if indice < 0:
+        raise ValueError(f"Rango de carta inválido: {letra}")
+    return indice
+
+
+def _carta_de_texto(texto: str) -> int:
+    """Convierte ``As`` o ``Td`` (letra de palo s, h, d, c) a carta codificada."""
+    palo = 'shdc'.find(texto[1].lower())
+    if palo < 0:
+        raise ValueError(f"Palo inválido: {texto}")
+    return Carta.crear(_rango_de_letra(texto[0]), palo)
+
+
+def nombre_de_clase(alto: int, bajo: int, suited: bool) -> str:
+    """Retorna el nombre de la clase de mano, por ejemplo ``AKs``, ``T9o`` o ``77``."""
+    if alto == bajo:
+        return _RANGOS[alto] * 2
+    return f"{_RANGOS[alto]}{_RANGOS[bajo]}{'s' if suited else 'o'}"
+
+
+def combinaciones_de_clase(alto: int, bajo: int, suited: bool) -> list:
+    """Retorna las combinaciones (c1 > c2) de una clase de mano."""
+    combinaciones = []
+    for p1 in range(4):
+        for p2 in range(4):
+            if alto == bajo and p2 <= p1:
+                continue
+            if alto != bajo and (p1 == p2) != suited:
+                continue
+            c1, c2 = Carta.crear(alto, p1), Carta.crear(bajo, p2)
+            combinaciones.append((max(c1, c2), min(c1, c2)))
+    return combinaciones
+
+
+def puntaje_chen(alto: int, bajo: int, suited: bool) -> float:
+    """
+    Puntúa una mano inicial con la fórmula de Bill Chen.
+    """
+    puntos_carta = {12: 10, 11: 8, 10: 7, 9: 6}
+    puntos = puntos_carta.get(alto, (alto + 2) / 2)
+    if alto == bajo:
+        return max(puntos * 2, 5)
+    if suited:
+        puntos += 2
+    hueco = alto - bajo - 1
+    puntos -= (0, 1, 2, 4)[hueco] if hueco < 4 else 5
+    if hueco <= 1 and alto < 10:
+        puntos += 1
+    return puntos
+
+
+def _clases_ordenadas() -> list:
+    """Las 169 clases de mano de mejor a peor según Chen (desempate por rangos)."""
+    clases = []
+    for alto in range(13):
+        for bajo in range(alto + 1):
+            for suited in ((False,) if alto == bajo else (True, False)):
+                clases.append((alto, bajo, suited))
+    return sorted(clases, key=lambda c: (puntaje_chen(*c), c[0] == c[1], c[0], c[1], c[2]), reverse=True)
+
+
+CLASES_ORDENADAS = _clases_ordenadas()
+
+
+def _mejores(porcentaje: float) -> list:
+    objetivo = TOTAL_COMBINACIONES * porcentaje / 100
+    combinaciones = []
+    for clase in CLASES_ORDENADAS:
+        if len(combinaciones) >= objetivo:
+            break
+        combinaciones.extend(combinaciones_de_clase(*clase))
+    return combinaciones
+
+
+def _clase_de_texto(texto: str) -> tuple:
+    """Convierte ``AKs``, ``AKo``, ``AK`` o ``QQ`` en (alto, bajo, tipos)."""
+    alto, bajo = _rango_de_letra(texto[0]), _rango_de_letra(texto[1])
+    if alto < bajo:
+        alto, bajo = bajo, alto
+    sufijo = texto[2:].lower()
+    if alto == bajo:
+        if sufijo:
+            raise ValueError(f"Un par no puede ser suited u offsuit: {texto}")
+        return alto, bajo, (False,)
+    tipos = {'s': (True,), 'o': (False,), '': (True, False)}.get(sufijo)
+    if tipos is None:
+        raise ValueError(f"Mano inválida: {texto}")
+    return alto, bajo, tipos
+
+
+def _combinaciones_de_token(token: str) -> list:
+    token = token.strip()
+    if not token:
+        return []
+    minuscula = token.lower()
+    if minuscula.endswith('%'):
+        return _mejores(float(minuscula.removeprefix('top').strip(' %')))
+    token = token.replace('10', 'T')
+    if len(token) == 4 and token[1].lower() in 'shdc' and token[3].lower() in 'shdc':
+        c1, c2 = _carta_de_texto(token[:2]), _carta_de_texto(token[2:])
+        if c1 == c2:
+            raise ValueError(f"Combinación con cartas repetidas: {token}")
+        return [(max(c1, c2), min(c1, c2))]
+
+    clases = []
+    if '-' in token:
+        inicio, fin = (_clase_de_texto(parte) for parte in token.split('-'))
+        if inicio[0] == inicio[1] and fin[0] == fin[1]:
+            for rango in range(min(inicio[0], fin[0]), max(inicio[0], fin[0]) + 1):
+                clases.append((rango, rango, (False,)))
+        elif inicio[0] == fin[0] and inicio[2] == fin[2]:
+            for bajo in range(min(inicio[1], fin[1]), max(inicio[1], fin[1]) + 1):
+                clases.append((inicio[0], bajo, inicio[2]))
+        else:
+            raise ValueError(f"Intervalo inválido: {token}")
+    elif token.endswith('+'):
+        alto, bajo, tipos = _clase_de_texto(token[:-1])
+        if alto == bajo:
+            clases.extend((rango, rango, tipos) for rango in range(alto, 13))
+        else:
+            clases.extend((alto, kicker, tipos) for kicker in range(bajo, alto))
+    else:
+        clases.append(_clase_de_texto(token))
+
+    combinaciones = []
+    for alto, bajo, tipos in clases:
+        for suited in tipos:
+            combinaciones.extend(combinaciones_de_clase(alto, bajo, suited))
+    return combinaciones
+
+
+def parsear_rango(rango: str) -> frozenset:
+    """
+    Convierte un rango en notación de texto a su conjunto de combinaciones.
+
+    Args:
+        rango (str): Por ejemplo ``"AKs,QQ+"`` o ``"top 20%"``
+
+    Returns:
+        frozenset: Combinaciones ``(c1, c2)`` con ``c1 > c2``
+
+    Raises:
+        ValueError: Si el rango está vacío o tiene notación inválida
+    """
+    combinaciones = frozenset(c for token in rango.split(',') for c in _combinaciones_de_token(token))
+    if not combinaciones:
+        raise ValueError(f"El rango no contiene combinaciones: {rango!r}")
+    return combinaciones
+
+
+def _permutar(carta: int, permutacion: tuple) -> int:
+    return (carta & ~3) | permutacion[carta & 3]
+
+
+def _permutar_combinacion(combinacion: tuple, permutacion: tuple) -> tuple:
+    a, b = _permutar(combinacion[0], permutacion), _permutar(combinacion[1], permutacion)
+    return (a, b) if a > b else (b, a)
+
+
+def clave_canonica(rango_1: frozenset, rango_2: frozenset) -> str:
+    """
+    Retorna una clave para el par de rangos que es la misma para todas las
+    consultas equivalentes por permutación de palos.
+    """
+    mejor = None
+    for permutacion in _PERMUTACIONES_PALOS:
+        forma = (
+            sorted(_permutar_combinacion(c, permutacion) for c in rango_1),
+            sorted(_permutar_combinacion(c, permutacion) for c in rango_2),
+        )
+        if mejor is None or forma < mejor:
+            mejor = forma
+    return json.dumps([[[int(a), int(b)] for a, b in combinaciones] for combinaciones in mejor], separators=(',', ':'))
+
+
+def _par_canonico(mano_1: tuple, mano_2: tuple) -> tuple:
+    return min(
+        (_permutar_combinacion(mano_1, p), _permutar_combinacion(mano_2, p))
+        for p in _PERMUTACIONES_PALOS
+    )
+
+
+def pares_canonicos(rango_1: frozenset, rango_2: frozenset) -> list:
+    """
+    Agrupa los enfrentamientos sin cartas repetidas por isomorfismo de palos.
+
+    Returns:
+        list: Tuplas ``(mano_1, mano_2, peso)`` ordenadas, una por clase de equivalencia
+    """
+    pesos = {}
+    for mano_1 in rango_1:
+        for mano_2 in rango_2:
+            if mano_1[0] in mano_2 or mano_1[1] in mano_2:
+                continue
+            par = _par_canonico(mano_1, mano_2)
+            pesos[par] = pesos.get(par, 0) + 1
+    return [(m1, m2, peso) for (m1, m2), peso in sorted(pesos.items())]
+
+
+def _evaluar_fragmento(pares: list, iteraciones: int, semilla: int) -> list:
+    """Retorna ganar, empatar y equidad del jugador 1, ponderados, para cada par."""
+    parciales = []
+    for mano_1, mano_2, peso in pares:
+        # La semilla depende solo del par, así el resultado no depende del reparto
+        rng = np.random.default_rng([semilla, *mano_1, *mano_2])
+        resultado = calcular_equidad([mano_1, mano_2], iteraciones=iteraciones, tolerancia=0.0,
+                                     tamano_lote=iteraciones, rng=rng)
+        jugador = resultado['jugadores'][0]
+        parciales.append((peso * jugador['ganar'], peso * jugador['empatar'], peso * jugador['equidad']))
+    return parciales
+
+
+def calcular_equidad_rangos(
+    rango_1: str,
+    rango_2: str,
+    iteraciones: int = 2_000,
+    procesos: int = None,
+    semilla: int = 0,
+    cache: CacheDisco = None,
+    usar_cache: bool = True
+) -> dict:
+    """
+    Calcula la equidad preflop de un rango contra otro.
+
+    Args:
+        rango_1 (str): Rango del primer jugador, por ejemplo ``"AKs,QQ+"``
+        rango_2 (str): Rango del segundo jugador, por ejemplo ``"top 20%"``
+        iteraciones (int, optional): Tableros muestreados por enfrentamiento canónico
+        procesos (int, optional): Procesos del pool. Por defecto os.cpu_count(); 1 lo
+            calcula en el proceso actual
+        semilla (int, optional): Semilla base del muestreo
+        cache (CacheDisco, optional): Caché a usar. Por defecto ``CacheDisco('equidad_rangos')``
+        usar_cache (bool, optional): Si es False no se lee ni se escribe la caché
+
+    Returns:
+        dict: ``ganar``, ``empatar``, ``perder`` y ``equidad`` del primer rango,
+        ``equidad_rival``, ``enfrentamientos`` (pares de combinaciones),
+        ``pares_canonicos`` y ``desde_cache``
+
+    Raises:
+        ValueError: Si algún rango es inválido o no hay enfrentamientos posibles
+    """
+    combinaciones_1, combinaciones_2 = parsear_rango(rango_1), parsear_rango(rango_2)
+    clave = f"{clave_canonica(combinaciones_1, combinaciones_2)}|{iteraciones}|{semilla}"
+    if usar_cache:
+        cache = cache or CacheDisco('equidad_rangos')
+        guardado = cache.obtener(clave)
+        if guardado is not None:
+            return {**guardado, 'desde_cache': True}
+
+    pares = pares_canonicos(combinaciones_1, combinaciones_2)
+    if not pares:
+        raise ValueError("Los rangos no tienen enfrentamientos sin cartas repetidas")
+    procesos = min(procesos or os.cpu_count() or 1, len(pares))
+    tamano = -(-len(pares) // procesos)
+    fragmentos = [pares[i:i + tamano] for i in range(0, len(pares), tamano)]
+
+    if len(fragmentos) == 1:
+        parciales = _evaluar_fragmento(fragmentos[0], iteraciones, semilla)
+    else:
+        with ProcessPoolExecutor(max_workers=len(fragmentos)) as pool:
+            resultados = pool.map(_evaluar_fragmento, fragmentos,
+                                  [iteraciones] * len(fragmentos), [semilla] * len(fragmentos))
+            parciales = [parcial for fragmento in resultados for parcial in fragmento]
+
+    # Los fragmentos son contiguos y se suman en el orden canónico de los pares,
+    # así el resultado es idéntico con cualquier cantidad de procesos
+    total = sum(peso for _, _, peso in pares)
+    ganar = empatar = equidad = 0.0
+    for parcial_ganar, parcial_empatar, parcial_equidad in parciales:
+        ganar += parcial_ganar
+        empatar += parcial_empatar
+        equidad += parcial_equidad
+    ganar, empatar, equidad = ganar / total, empatar / total, equidad / total
+    resultado = {
+        'ganar': ganar,
+        'empatar': empatar,
+        'perder': 1 - ganar - empatar,
+        'equidad': equidad,
+        'equidad_rival': 1 - equidad,
+        'enfrentamientos': total,
+        'pares_canonicos': len(pares)
+    }
+    if usar_cache:
+        cache.guardar(clave, resultado)
+    return {**resultado, 'desde_cache': False}
+
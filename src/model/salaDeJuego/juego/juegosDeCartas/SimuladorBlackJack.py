@@ -0,0 +1,174 @@
+"""
+Simulador de BlackJack por lotes para validar reglas y pagos de mesa.
+
+Juega N manos × M asientos a la vez en arreglos NumPy, sin entrada ni salida, con
+las mismas reglas que ``BlackJack.inicializar_juego``: cartas con los valores de
+``BlackJack._cartas`` tomadas de un mazo infinito (aproxima el zapato de la
+mesa), el jugador deja de pedir al llegar a 21 y el crupier pide mientras tenga menos de 17 (se planta con 17 blando).
+Un blackjack natural paga ``pago_blackjack`` y empata contra otro natural.
+
+Las estrategias son funciones vectorizadas
+``estrategia(puntos, blanda, carta_visible) -> pedir`` que reciben arreglos con los
+puntos de cada mano, si son blandas y el valor de la carta visible del crupier
+(2-11), y retornan un arreglo booleano indicando qué manos piden carta.
+
+Requiere NumPy.
+"""
+
+from math import sqrt
+from typing import Callable
+
+import numpy as np
+
+from .BlackJack import BlackJack
+
+
+def estrategia_plantarse_en(limite: int) -> Callable:
+    """
+    Crea una estrategia que pide carta mientras los puntos sean menores que el límite.
+    """
+    def estrategia(puntos, blanda, carta_visible):
+        return puntos < limite
+    return estrategia
+
+
+# Por defecto el jugador imita al crupier
+estrategia_crupier = estrategia_plantarse_en(17)
+
+
+def _puntos(duro, ases):
+    """Puntos de las manos: el As vale 11 si no se pasa de 21 (con ``duro`` contando 1)."""
+    blanda = ases & (duro + 10 <= 21)
+    return np.where(blanda, duro + 10, duro), blanda
+
+
+def simular(
+    manos: int,
+    asientos: int = 1,
+    estrategia: Callable = estrategia_crupier,
+    pago_blackjack: float = 1.5,
+    semilla: int = None,
+    rng=None,
+    tamano_lote: int = 500_000,
+    valores: tuple = None
+) -> dict:
+    """
+    Simula manos de BlackJack y retorna las estadísticas de la mesa.
+
+    Args:
+        manos (int): Cantidad de rondas a jugar
+        asientos (int, optional): Jugadores por ronda contra el mismo crupier
+        estrategia (Callable, optional): Estrategia vectorizada del jugador
+        pago_blackjack (float, optional): Pago de un blackjack natural (3:2 = 1.5)
+        semilla (int, optional): Semilla para reproducir la simulación
+        rng (numpy.random.Generator, optional): Generador a usar en lugar de la semilla
+        tamano_lote (int, optional): Rondas simuladas a la vez
+        valores (tuple, optional): Valor de cada rango. Por defecto los de BlackJack
+
+    Returns:
+        dict: ``manos`` (manos de jugador jugadas), ``ventaja_casa`` (ganancia
+        esperada de la casa por unidad apostada), ``retorno_medio``, ``varianza``,
+        ``desviacion``, ``error_estandar``, ``tasa_victoria``, ``tasa_empate``,
+        ``tasa_derrota``, ``tasa_blackjack``, ``tasa_pasarse_jugador`` y
+        ``tasa_pasarse_crupier`` (por ronda)
+
+    Raises:
+        ValueError: Si la cantidad de manos o de asientos no es positiva
+    """
+    if manos < 1:
+        raise ValueError("La cantidad de manos debe ser positiva")
+    if asientos < 1:
+        raise ValueError("La cantidad de asientos debe ser positiva")
+    if rng is None:
+        rng = np.random.default_rng(semilla)
+    tabla = np.array(valores or BlackJack._valores_por_rango, dtype=np.int8)
+    # El As se identifica por valer 11; en los totales duros cuenta como 1
+    tabla_duro = np.where(tabla == 11, 1, tabla).astype(np.int16)
+    es_as = tabla == 11
+
+    suma = suma_cuadrados = 0.0
+    victorias = empates = derrotas = blackjacks = pasadas_jugador = pasadas_crupier = 0
+    restantes = manos
+    while restantes > 0:
+        lote = min(tamano_lote, restantes)
+        restantes -= lote
+        forma = (lote, asientos)
+
+        def robar(tamano):
+            rangos = rng.integers(0, len(tabla), size=tamano, dtype=np.int8)
+            return tabla_duro[rangos], es_as[rangos]
+
+        # Reparto inicial: dos cartas por asiento y dos para el crupier
+        (d1, a1), (d2, a2) = robar(forma), robar(forma)
+        duro, ases = d1 + d2, a1 | a2
+        (c1, ac1), (c2, ac2) = robar(lote), robar(lote)
+        duro_crupier, ases_crupier = c1 + c2, ac1 | ac2
+        carta_visible = np.broadcast_to(np.where(ac1, 11, c1)[:, None], forma)
+
+        puntos, blanda = _puntos(duro, ases)
+        natural = puntos == 21
+        activas = ~natural
+        while activas.any():
+            pide = activas & np.asarray(estrategia(puntos, blanda, carta_visible), dtype=bool)
+            if not pide.any():
+                break
+            d, a = robar(forma)
+            duro = np.where(pide, duro + d, duro)
+            ases = ases | (pide & a)
+            puntos, blanda = _puntos(duro, ases)
+            activas = pide & (puntos < 21)
+
+        # Turno del crupier: pide mientras tenga menos de 17
+        puntos_crupier, _ = _puntos(duro_crupier, ases_crupier)
+        natural_crupier = puntos_crupier == 21
+        pide = puntos_crupier < 17
+        while pide.any():
+            d, a = robar(lote)
+            duro_crupier = np.where(pide, duro_crupier + d, duro_crupier)
+            ases_crupier = ases_crupier | (pide & a)
+            puntos_crupier, _ = _puntos(duro_crupier, ases_crupier)
+            pide = puntos_crupier < 17
+
+        crupier = puntos_crupier[:, None]
+        natural_crupier = natural_crupier[:, None]
+        se_pasa = puntos > 21
+        crupier_se_pasa = crupier > 21
+        retorno = np.select(
+            [
+                natural & natural_crupier,
+                natural,
+                natural_crupier,
+                se_pasa,
+                crupier_se_pasa | (puntos > crupier),
+                puntos == crupier,
+            ],
+            [0.0, pago_blackjack, -1.0, -1.0, 1.0, 0.0],
+            default=-1.0
+        )
+
+        suma += float(retorno.sum())
+        suma_cuadrados += float((retorno * retorno).sum())
+        victorias += int((retorno > 0).sum())
+        empates += int((retorno == 0).sum())
+        derrotas += int((retorno < 0).sum())
+        blackjacks += int(natural.sum())
+        pasadas_jugador += int(se_pasa.sum())
+        pasadas_crupier += int(crupier_se_pasa.sum())
+
+    total = manos * asientos
+    media = suma / total
+    varianza = max(suma_cuadrados / total - media * media, 0.0)
+    return {
+        'manos': total,
+        'ventaja_casa': -media,
+        'retorno_medio': media,
+        'varianza': varianza,
+        'desviacion': sqrt(varianza),
+        'error_estandar': sqrt(varianza / total),
+        'tasa_victoria': victorias / total,
+        'tasa_empate': empates / total,
+        'tasa_derrota': derrotas / total,
+        'tasa_blackjack': blackjacks / total,
+        'tasa_pasarse_jugador': pasadas_jugador / total,
+        'tasa_pasarse_crupier': pasadas_crupier / manos
+    }
@@ -1,13 +1,17 @@
 # Módulo de juegos de cartas del Casino Virtual
 
 from .BlackJack import BlackJack
+from .Carta import Carta
 from .JuegoDeCartas import JuegoDeCartas
+from .ManoBlackJack import ManoBlackJack
 from .Mazo import Mazo
 from .Poker import Poker
 
 __all__ = [
     'BlackJack',
+    'Carta',
     'JuegoDeCartas', 
+    'ManoBlackJack',
     'Mazo',
     'Poker'
 ]
\ No newline at end of file
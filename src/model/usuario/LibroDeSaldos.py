@@ -0,0 +1,407 @@
+"""
+Módulo que define el libro de saldos: escrituras diferidas y agrupadas de los
+saldos y totales apostados de los usuarios.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import shutil
+import time
+from collections import deque
+
+from ...utils.cache_disco import directorio_cache
+from ...utils.datos_disco import bloquear_archivo, directorio_datos
+from ...utils.firestore import batch_write, get_data, increment
+from ...utils.persistencia import ACTUALIZAR, ESTABLECER, MAXIMO_LOTE
+
+# Campos numéricos del documento del usuario que maneja el libro
+CAMPOS = ('saldo', 'total_apostado')
+
+# Un documento por libro con la última secuencia escrita en la base de datos
+COLECCION_LIBROS = 'libros_de_saldos'
+
+
+class LibroDeSaldos:
+    """
+    Libro de escritura diferida para los cambios de saldo y total apostado.
+
+    Cada cambio se anota primero en un registro en disco (una línea JSON con un
+    número de secuencia creciente) y después se escribe en la base de datos: los
+    cambios que llegan dentro de una ventana corta se suman por usuario y se
+    escriben en un solo lote, junto con la secuencia del último cambio incluido
+    en el documento del libro. Al iniciar, los cambios del registro con
+    secuencia mayor a la guardada se vuelven a enviar, así que un cambio
+    anotado no se pierde ni se aplica dos veces aunque el proceso termine.
+
+    Los lotes siempre cubren un prefijo de la secuencia y tienen a lo sumo
+    ``maximo_usuarios`` usuarios, para caber en un lote atómico de Firestore.
+    Cada proceso que escribe a la vez necesita su propio nombre de libro: el
+    libro toma un bloqueo sobre ``<registro>.lock`` al iniciar y falla si otro
+    proceso ya usa ese nombre.
+    """
+
+    def __init__(
+        self,
+        nombre: str = 'principal',
+        ruta: str = None,
+        ventana: float = 0.05,
+        maximo_usuarios: int = MAXIMO_LOTE - 1,
+        sincronizar: bool = True,
+        maximo_confirmadas: int = 1000
+    ):
+        """
+        Args:
+            nombre (str, optional): Nombre del libro (id de su documento)
+            ruta (str, optional): Archivo del registro. Por defecto en directorio_datos()
+            ventana (float, optional): Segundos que se juntan cambios antes de escribir
+            maximo_usuarios (int, optional): Usuarios por lote; al llegar se escribe sin esperar
+            sincronizar (bool, optional): Esperar fsync del registro antes de confirmar un cambio
+            maximo_confirmadas (int, optional): Líneas ya escritas que se toleran antes de compactar
+
+        Raises:
+            ValueError: Si maximo_usuarios no cabe en un lote o la ventana es negativa
+        """
+        if not 1 <= maximo_usuarios < MAXIMO_LOTE:
+            raise ValueError(f"maximo_usuarios debe estar entre 1 y {MAXIMO_LOTE - 1}")
+        if ventana < 0:
+            raise ValueError("La ventana no puede ser negativa")
+        self._nombre = nombre
+        self._ruta = ruta or os.path.join(directorio_datos(), f"libro_saldos_{nombre}.wal")
+        # Antes el registro estaba en la caché en disco; se mueve al iniciar si quedó ahí
+        self._ruta_anterior = None if ruta else os.path.join(directorio_cache(), f"libro_saldos_{nombre}.wal")
+        self._bloqueo = None
+        self._ventana = ventana
+        self._maximo_usuarios = maximo_usuarios
+        self._sincronizar = sincronizar
+        self._maximo_confirmadas = maximo_confirmadas
+        # Cambios anotados y todavía no escritos: (secuencia, usuario, cambios, momento)
+        self._entradas = deque()
+        self._secuencia = 0
+        self._confirmada = 0
+        self._sincronizada = 0
+        self._lineas_confirmadas = 0
+        self._archivo = None
+        self._loop = None
+        self._inicio = None
+        self._tarea = None
+        self._despertar = None
+        self._candado = None
+        self._fsync = None
+        self._cerrando = False
+        self._metricas = {
+            'registrados': 0, 'lotes': 0, 'escrituras': 0, 'coalescidos': 0, 'errores': 0, 'descartados': 0,
+            'latencia_total': 0.0, 'latencia_maxima': 0.0, 'latencia_ultima': 0.0, 'escritura_total': 0.0
+        }
+
+    def get_nombre(self) -> str:
+        return self._nombre
+
+    def get_ruta(self) -> str:
+        return self._ruta
+
+    def bloquear(self) -> bool:
+        """
+        Toma el nombre del libro para este proceso; se llama sola al iniciar.
+
+        Returns:
+            bool: False si otro proceso (u otro libro) ya usa el nombre
+        """
+        if self._bloqueo is None:
+            self._bloqueo = bloquear_archivo(f"{self._ruta}.lock")
+        return self._bloqueo is not None
+
+    def get_pendientes(self) -> int:
+        """Retorna la cantidad de cambios anotados que faltan por escribir."""
+        return len(self._entradas)
+
+    async def iniciar(self) -> None:
+        """
+        Recupera los cambios no escritos del registro y arranca la escritura en el
+        bucle de eventos actual. Se llama sola al registrar el primer cambio.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # Los registros simultáneos del primer uso esperan a una sola recuperación
+        if self._inicio is None or self._inicio[0] is not loop:
+            self._inicio = (loop, asyncio.Lock())
+        async with self._inicio[1]:
+            if self._loop is loop:
+                return
+            if self._archivo is None:
+                if not self.bloquear():
+                    raise RuntimeError(f"El libro de saldos '{self._nombre}' ya está en uso por otro proceso")
+                if self._ruta_anterior and os.path.exists(self._ruta_anterior) and not os.path.exists(self._ruta):
+                    os.makedirs(os.path.dirname(os.path.abspath(self._ruta)), exist_ok=True)
+                    shutil.move(self._ruta_anterior, self._ruta)
+                await self._recuperar()
+                os.makedirs(os.path.dirname(os.path.abspath(self._ruta)), exist_ok=True)
+                self._archivo = open(self._ruta, 'a', encoding='utf-8')
+            # Las primitivas de asyncio quedan atadas a su bucle: si el anterior terminó se crean de nuevo
+            self._despertar = asyncio.Event()
+            self._candado = asyncio.Lock()
+            self._fsync = None
+            self._cerrando = False
+            self._tarea = loop.create_task(self._ejecutar())
+            self._loop = loop
+            if self._entradas:
+                self._despertar.set()
+
+    async def _recuperar(self) -> None:
+        libro = await get_data(COLECCION_LIBROS, self._nombre)
+        self._confirmada = libro['confirmada'] if libro else 0
+        self._secuencia = self._sincronizada = self._confirmada
+        try:
+            with open(self._ruta, encoding='utf-8') as archivo:
+                lineas = archivo.readlines()
+        except FileNotFoundError:
+            return
+        for linea in lineas:
+            try:
+                entrada = json.loads(linea)
+            except ValueError:
+                # Una línea cortada por una caída a mitad de escritura nunca se confirmó
+                continue
+            secuencia = entrada['secuencia']
+            self._secuencia = max(self._secuencia, secuencia)
+            if secuencia <= self._confirmada:
+                self._lineas_confirmadas += 1
+            else:
+                self._entradas.append((secuencia, entrada['usuario'], entrada['cambios'], time.monotonic()))
+        self._sincronizada = self._secuencia
+
+    async def registrar(self, usuario_id: str, saldo: float = 0.0, total_apostado: float = 0.0) -> int:
+        """
+        Anota un cambio de saldo y/o total apostado; se escribe en la base de datos
+        en el siguiente lote.
+
+        Args:
+            usuario_id (str): ID del usuario
+            saldo (float, optional): Monto a sumar al saldo (negativo para restar)
+            total_apostado (float, optional): Monto a sumar al total apostado
+
+        Returns:
+            int: Número de secuencia del cambio
+
+        Raises:
+            ValueError: Si no hay usuario o ningún monto distinto de cero
+        """
+        if not usuario_id:
+            raise ValueError("El ID del usuario no puede estar vacío")
+        cambios = {campo: monto for campo, monto in zip(CAMPOS, (saldo, total_apostado)) if monto}
+        if not cambios:
+            raise ValueError("Se necesita al menos un monto distinto de cero")
+        await self.iniciar()
+        self._secuencia += 1
+        secuencia = self._secuencia
+        self._archivo.write(json.dumps(
+            {'secuencia': secuencia, 'usuario': usuario_id, 'cambios': cambios}, separators=(',', ':')
+        ) + '\n')
+        self._archivo.flush()
+        self._entradas.append((secuencia, usuario_id, cambios, time.monotonic()))
+        self._metricas['registrados'] += 1
+        self._despertar.set()
+        if self._sincronizar:
+            await self._sincronizar_hasta(secuencia)
+        return secuencia
+
+    async def _sincronizar_hasta(self, secuencia: int) -> None:
+        # Un solo fsync cubre todas las líneas escritas antes de empezar, así que los registros simultáneos lo comparten
+        while self._sincronizada < secuencia:
+            if self._fsync is None:
+                self._fsync = asyncio.ensure_future(self._hacer_fsync())
+            await asyncio.shield(self._fsync)
+
+    async def _hacer_fsync(self) -> None:
+        hasta = self._secuencia
+        try:
+            await asyncio.to_thread(os.fsync, self._archivo.fileno())
+            self._sincronizada = max(self._sincronizada, hasta)
+        finally:
+            self._fsync = None
+
+    async def _ejecutar(self) -> None:
+        while not self._cerrando:
+            if not self._entradas:
+                self._despertar.clear()
+                await self._despertar.wait()
+                continue
+            espera = self._entradas[0][3] + self._ventana - time.monotonic()
+            if espera > 0 and len({entrada[1] for entrada in self._entradas}) < self._maximo_usuarios:
+                self._despertar.clear()
+                try:
+                    await asyncio.wait_for(self._despertar.wait(), espera)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self._vaciar_lote()
+            except Exception as e:
+                self._metricas['errores'] += 1
+                print(f"❌ Error al escribir el libro de saldos: {e}")
+                await asyncio.sleep(max(self._ventana, 0.5))
+
+    def _tomar_lote(self) -> list:
+        # El prefijo más largo de la secuencia con a lo sumo maximo_usuarios usuarios
+        usuarios = set()
+        lote = []
+        while self._entradas:
+            usuario_id = self._entradas[0][1]
+            if usuario_id not in usuarios and len(usuarios) == self._maximo_usuarios:
+                break
+            usuarios.add(usuario_id)
+            lote.append(self._entradas.popleft())
+        return lote
+
+    async def _vaciar_lote(self) -> int:
+        async with self._candado:
+            lote = self._tomar_lote()
+            if not lote:
+                return 0
+            try:
+                escritos = await self._escribir(lote)
+            except BaseException:
+                self._entradas.extendleft(reversed(lote))
+                raise
+            self._lineas_confirmadas += len(lote)
+            self._compactar()
+            return escritos
+
+    async def _escribir(self, lote: list) -> int:
+        from .UsuarioServicio import UsuarioServicio
+
+        sumas = {}
+        for _, usuario_id, cambios, _ in lote:
+            suma = sumas.setdefault(usuario_id, {})
+            for campo, monto in cambios.items():
+                suma[campo] = suma.get(campo, 0) + monto
+        ultima = lote[-1][0]
+        inicio = time.monotonic()
+        while True:
+            operaciones = [
+                (ACTUALIZAR, 'usuarios', usuario_id, {campo: increment(monto) for campo, monto in suma.items() if monto})
+                for usuario_id, suma in sumas.items() if any(suma.values())
+            ]
+            operaciones.append((ESTABLECER, COLECCION_LIBROS, self._nombre, {'confirmada': ultima}))
+            try:
+                await batch_write(operaciones)
+                break
+            except ValueError:
+                # Un usuario eliminado hace fallar todo el lote: se descartan sus cambios y se reintenta
+                faltantes = [usuario_id for usuario_id in sumas if await get_data('usuarios', usuario_id) is None]
+                if not faltantes:
+                    raise
+                for usuario_id in faltantes:
+                    del sumas[usuario_id]
+                self._metricas['descartados'] += sum(1 for entrada in lote if entrada[1] in faltantes)
+        descartados = sum(1 for entrada in lote if entrada[1] not in sumas)
+        fin = time.monotonic()
+        self._confirmada = ultima
+        for usuario_id in sumas:
+            UsuarioServicio.invalidar_cache_usuario(usuario_id)
+        latencia = fin - lote[0][3]
+        self._metricas['lotes'] += 1
+        self._metricas['escrituras'] += len(operaciones) - 1
+        self._metricas['coalescidos'] += len(lote) - descartados - len(sumas)
+        self._metricas['latencia_total'] += latencia
+        self._metricas['latencia_maxima'] = max(self._metricas['latencia_maxima'], latencia)
+        self._metricas['latencia_ultima'] = latencia
+        self._metricas['escritura_total'] += fin - inicio
+        return len(operaciones) - 1
+
+    def _compactar(self) -> None:
+        # Las líneas ya confirmadas sobran; no se toca el archivo mientras un fsync lo usa
+        if self._fsync is not None or self._lineas_confirmadas == 0:
+            return
+        if not self._entradas:
+            self._archivo.truncate(0)
+        elif self._lineas_confirmadas >= self._maximo_confirmadas:
+            temporal = f"{self._ruta}.tmp"
+            with open(temporal, 'w', encoding='utf-8') as archivo:
+                for secuencia, usuario_id, cambios, _ in self._entradas:
+                    archivo.write(json.dumps(
+                        {'secuencia': secuencia, 'usuario': usuario_id, 'cambios': cambios}, separators=(',', ':')
+                    ) + '\n')
+                archivo.flush()
+                os.fsync(archivo.fileno())
+            self._archivo.close()
+            os.replace(temporal, self._ruta)
+            self._archivo = open(self._ruta, 'a', encoding='utf-8')
+        else:
+            return
+        self._lineas_confirmadas = 0
+
+    async def vaciar(self) -> int:
+        """
+        Escribe ya todos los cambios pendientes.
+
+        Returns:
+            int: Cantidad de documentos de usuario escritos
+        """
+        if self._loop is not asyncio.get_running_loop():
+            await self.iniciar()
+        escritos = 0
+        while self._entradas:
+            escritos += await self._vaciar_lote()
+        return escritos
+
+    async def cerrar(self) -> None:
+        """Escribe los cambios pendientes, detiene la escritura y cierra el registro."""
+        if self._archivo is None:
+            return
+        await self.vaciar()
+        self._cerrando = True
+        self._despertar.set()
+        await self._tarea
+        if self._fsync is not None:
+            await self._fsync
+        self._compactar()
+        self._archivo.close()
+        self._archivo = None
+        self._loop = None
+        self._bloqueo.close()
+        self._bloqueo = None
+
+    def get_metricas(self) -> dict:
+        """
+        Returns:
+            dict: ``registrados``, ``lotes``, ``escrituras`` (documentos de usuario),
+            ``coalescidos`` (cambios que se sumaron a otro), ``pendientes``,
+            ``errores``, ``descartados`` (de usuarios que ya no existen),
+            ``latencia_media``/``latencia_maxima``/``latencia_ultima`` (segundos
+            desde el cambio más antiguo de un lote hasta que se escribió) y
+            ``escritura_media`` (segundos de cada escritura en la base de datos)
+        """
+        metricas = dict(self._metricas)
+        lotes = metricas['lotes']
+        metricas['pendientes'] = len(self._entradas)
+        metricas['latencia_media'] = metricas.pop('latencia_total') / lotes if lotes else 0.0
+        metricas['escritura_media'] = metricas.pop('escritura_total') / lotes if lotes else 0.0
+        return metricas
+
+    def __repr__(self) -> str:
+        return f"LibroDeSaldos(nombre={self._nombre!r}, pendientes={len(self._entradas)})"
+
+
+_libro = None
+
+
+def obtener_libro() -> LibroDeSaldos:
+    """
+    Retorna el LibroDeSaldos del proceso. Su nombre es CASINO_LIBRO_SALDOS (por
+    defecto 'principal') o, si otro proceso ya lo usa, el primero libre de
+    '<nombre>-1', '<nombre>-2', ... Así cada trabajador tiene su propio registro
+    y, al reiniciar, vuelve a tomar uno de los nombres y reenvía lo que quedó
+    pendiente en él.
+    """
+    global _libro
+    if _libro is None:
+        nombre = os.getenv('CASINO_LIBRO_SALDOS', 'principal')
+        for numero in itertools.count():
+            libro = LibroDeSaldos(nombre if numero == 0 else f"{nombre}-{numero}")
+            if libro.bloquear():
+                _libro = libro
+                break
+    return _libro
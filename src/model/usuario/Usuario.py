@@ -16,7 +16,10 @@ class Usuario:
         _apellido (str): Apellido del usuario
         _saldo (float): Saldo actual del usuario
         _total_apostado (float): Total de dinero apostado por el usuario
-        _historial (list): Historial de transacciones del usuario
+        _historial (list): Registros de historial agregados en esta sesión; el
+            historial completo está en la base de datos (ver obtener_historial)
+        _resumen_historial (dict): Resumen de todo el historial: ``registros``,
+            ``ganadas``, ``perdidas``, ``ganancia_neta`` y ``ultimo``
     """
 
     _id: str
@@ -27,6 +30,7 @@ class Usuario:
     _correo: str
     _contraseña: str
     _historial: list
+    _resumen_historial: dict
     _vip: bool
     _ciudad: str
 
@@ -41,7 +45,8 @@ class Usuario:
         total_apostado: float = 0.0,
         historial: list = [],
         vip: bool = False,
-        ciudad:str = 'Ciudad no especificada'
+        ciudad:str = 'Ciudad no especificada',
+        resumen_historial: dict = None
     ) -> None:
         """
         Inicializa un nuevo usuario
@@ -53,6 +58,7 @@ class Usuario:
             saldo (float, optional): Saldo inicial. Por defecto 0.0
             total_apostado (float, optional): Total apostado inicial. Por defecto 0.0
             historial (list, optional): Historial de transacciones. Por defecto []
+            resumen_historial (dict, optional): Resumen del historial guardado. Por defecto vacío
 
         """
         self.set_nombre(nombre)
@@ -63,7 +69,8 @@ class Usuario:
         self.set_vip(vip) 
         self.set_saldo(saldo)
         self.set_total_apostado(total_apostado)
-        self.__set_historial(historial)
+        self.__set_historial(list(historial))
+        self._resumen_historial = dict(resumen_historial or {})
         
     @classmethod
     async def crear_usuario(cls, nombre: str, apellido: str, correo: str, contraseña: str) -> 'Usuario':
@@ -118,7 +125,6 @@ class Usuario:
         Returns:
             Usuario: Nueva instancia de Usuario
         """
-        print(data)
         id = data.get('id', '')
         nombre = data.get('nombre', '')
         apellido = data.get('apellido', '')
@@ -127,10 +133,12 @@ class Usuario:
         total_apostado = data.get('total_apostado', 0.0)
         correo = data.get('correo', '')
         contraseña = data.get('contraseña', '')
+        # Los usuarios anteriores a la subcolección de historial aún pueden traer el arreglo
         historial = data.get('historial', [])
-        
+        resumen_historial = data.get('resumen_historial', {})
 
-        return cls(id, nombre, apellido, correo, contraseña, saldo, total_apostado, historial, vip)
+        return cls(id, nombre, apellido, correo, contraseña, saldo, total_apostado, historial, vip,
+                   resumen_historial=resumen_historial)
 
     def get_id(self) -> str:
         """Retorna el ID del usuario"""
@@ -161,9 +169,13 @@ class Usuario:
         return self._contraseña
 
     def get_historial(self) -> list:
-        """Retorna el historial de transacciones del usuario"""
+        """Retorna los registros de historial agregados en esta sesión"""
         return self._historial
 
+    def get_resumen_historial(self) -> dict:
+        """Retorna el resumen de todo el historial del usuario"""
+        return self._resumen_historial
+
     def generar_id(self) -> str:
         """
         Genera un ID único para el usuario usando las iniciales y un número aleatorio
@@ -307,20 +319,36 @@ class Usuario:
         from .UsuarioServicio import UsuarioServicio
         servicio = UsuarioServicio()
         """
-        Agrega un nuevo registro al historial
+        Agrega un nuevo registro al historial y actualiza el resumen
 
         Args:
-            registro (list): Registro a agregar
+            registro (dict): Registro a agregar
         """
+        from .UsuarioServicio import resumir_historial
         self._historial.append(registro)
+        for campo, valor in resumir_historial([registro]).items():
+            self._resumen_historial[campo] = self._resumen_historial.get(campo, 0) + valor
         await servicio.agregar_historial(self._id, registro)
 
-    async def aumentar_saldo(self, monto: float) -> None:
+    async def obtener_historial(self, limite: int = 20, cursor: str = None) -> dict:
         from .UsuarioServicio import UsuarioServicio
-        servicio = UsuarioServicio()
-        
         """
-        Aumenta el saldo del usuario
+        Obtiene una página del historial guardado, del registro más reciente al más antiguo
+
+        Args:
+            limite (int, optional): Máximo de registros. Por defecto 20
+            cursor (str, optional): Cursor de la página anterior; None para la primera
+
+        Returns:
+            dict: 'registros' de la página y 'cursor' de la siguiente (None si no hay más)
+        """
+        return await UsuarioServicio().obtener_historial(self._id, limite, cursor)
+
+    async def aumentar_saldo(self, monto: float) -> None:
+        from .LibroDeSaldos import obtener_libro
+        """
+        Aumenta el saldo del usuario. El cambio se anota en el libro de saldos,
+        que lo escribe en la base de datos junto con otros en el siguiente lote.
 
         Args:
             monto (float): Cantidad a aumentar
@@ -330,7 +358,7 @@ class Usuario:
         """
         if monto > 0:
             self._saldo += monto
-            await servicio.aumentar_saldo(self._id, monto)
+            await obtener_libro().registrar(self._id, saldo=monto)
         else:
             raise ValueError("El monto a aumentar debe ser positivo")
 
@@ -345,10 +373,9 @@ class Usuario:
         return self._ciudad
 
     async def disminuir_saldo(self, monto: float) -> None:
-        from .UsuarioServicio import UsuarioServicio
-        servicio = UsuarioServicio()
+        from .LibroDeSaldos import obtener_libro
         """
-        Disminuye el saldo del usuario
+        Disminuye el saldo del usuario (se escribe a través del libro de saldos)
 
         Args:
             monto (float): Cantidad a disminuir
@@ -358,17 +385,16 @@ class Usuario:
         """
         if monto > 0 or monto < self._saldo:
             self._saldo -= monto
-            await servicio.disminuir_saldo(self._id, monto)
+            await obtener_libro().registrar(self._id, saldo=-monto)
         else:    
             raise ValueError(
                 "El monto a disminuir debe ser positivo y no puede ser mayor al saldo actual"
             )
             
     async def incrementar_total_apostado(self, monto: float) -> None:
-        from .UsuarioServicio import UsuarioServicio
-        servicio = UsuarioServicio()
+        from .LibroDeSaldos import obtener_libro
         """
-        Aumenta el total apostado del usuario
+        Aumenta el total apostado del usuario (se escribe a través del libro de saldos)
 
         Args:
             monto (float): Cantidad a aumentar
@@ -378,7 +404,7 @@ class Usuario:
         """
         if monto > 0:
             self._total_apostado += monto
-            await servicio.incrementar_total_apostado(self._id, monto)
+            await obtener_libro().registrar(self._id, total_apostado=monto)
         else:
             raise ValueError("El monto a aumentar debe ser positivo")
         
@@ -397,7 +423,7 @@ class Usuario:
             "total_apostado": self._total_apostado,
             "correo": self._correo,
             "contraseña": self._contraseña,
-            "historial": self._historial,
+            "resumen_historial": self._resumen_historial,
             "vip": self._vip
         }
 
@@ -410,6 +436,6 @@ class Usuario:
             f"total_apostado: {self._total_apostado}\n"
             f"correo: {self._correo}\n"
             f"contraseña: {self._contraseña}\n"
-            f"historial: {self._historial}\n"
+            f"resumen_historial: {self._resumen_historial}\n"
             f"vip: {self._vip}\n"
         )
@@ -1,12 +1,282 @@
 import asyncio
+import copy
+import os
+import time
+import uuid
 from .Usuario import Usuario
-from ...utils.firestore import add_data_with_id, delete_data, get_data, update_data, get_collection_data, increment, decrement, array_union
+from ...utils.cache_lru import CacheLRU
+from ...utils.firestore import add_data_with_id, add_collection_listener, batch_write, delete_data, delete_field, get_data, update_data, get_collection_data, query_equal, query_page, increment, decrement
+from ...utils.persistencia import ACTUALIZAR, CREAR, ESTABLECER, MAXIMO_LOTE, DocumentoExistente
+
+# Índice único correo -> id: un documento por correo normalizado, con el id del usuario
+COLECCION_CORREOS = 'correos_usuarios'
+
+# Caché del índice compartida por todas las instancias del servicio en el proceso
+_ids_por_correo = CacheLRU(4096)
+
+# Caché de lectura de usuarios (sus documentos) y lecturas en curso por id
+_usuarios = CacheLRU(
+    int(os.getenv('CASINO_CACHE_USUARIOS', '2048')),
+    ttl=float(os.getenv('CASINO_CACHE_USUARIOS_TTL', '30'))
+)
+_lecturas_en_curso = {}
+_lecturas_compartidas = 0
+
+# Migraciones del arreglo 'historial' en curso por id, para no aplicar dos veces el resumen
+_migraciones_en_curso = {}
+
+# Documento de la subcolección de historial que marca al usuario como migrado (no tiene 'orden')
+MARCA_MIGRACION = '_migrado'
+
+
+def normalizar_correo(correo: str) -> str:
+    """Clave del índice de correos: sin espacios alrededor y en minúsculas."""
+    return correo.strip().lower()
+
+
+def coleccion_historial(usuario_id: str) -> str:
+    """Subcolección con el historial del usuario, un documento por registro."""
+    return f'usuarios/{usuario_id}/historial'
+
+
+def resumir_historial(registros: list) -> dict:
+    """
+    Resume registros de historial: cuántos son, cuántos ganaron o perdieron
+    (según su ``monto`` neto) y la ganancia neta.
+
+    Returns:
+        dict: ``registros``, ``ganadas``, ``perdidas`` y ``ganancia_neta``
+    """
+    montos = [registro.get('monto') for registro in registros]
+    montos = [monto for monto in montos if isinstance(monto, (int, float)) and not isinstance(monto, bool)]
+    return {
+        'registros': len(registros),
+        'ganadas': sum(1 for monto in montos if monto > 0),
+        'perdidas': sum(1 for monto in montos if monto < 0),
+        'ganancia_neta': sum(montos)
+    }
+
+
+def preparar_historial(usuario_id: str, registros: list) -> tuple[list, dict]:
+    """
+    Prepara las escrituras para agregar registros al historial de un usuario.
+
+    Cada registro es un documento nuevo de su subcolección, con un campo
+    ``orden`` que crece con el tiempo y sirve de cursor. El resumen del
+    documento del usuario se actualiza con incrementos, así que el documento
+    no crece con el historial.
+
+    Args:
+        usuario_id (str): ID del usuario
+        registros (list): Registros a agregar, del más antiguo al más reciente
+
+    Returns:
+        tuple[list, dict]: Las escrituras CREAR de los registros y los cambios
+        del resumen para la escritura ACTUALIZAR del usuario
+    """
+    base = time.time_ns()
+    sufijo = uuid.uuid4().hex[:8]
+    creaciones = []
+    for posicion, registro in enumerate(registros):
+        orden = f'{base + posicion:020d}-{sufijo}'
+        creaciones.append((CREAR, coleccion_historial(usuario_id), orden, dict(registro, orden=orden)))
+    return creaciones, cambios_resumen(registros, creaciones)
+
+
+def cambios_resumen(registros: list, creaciones: list) -> dict:
+    """
+    Cambios del resumen de historial del usuario por unos registros ya
+    preparados con :func:`preparar_historial`: los incrementos de sus conteos
+    y el último registro creado.
+
+    Args:
+        registros (list): Registros agregados
+        creaciones (list): Sus escrituras CREAR, en el mismo orden
+
+    Returns:
+        dict: Cambios para la escritura ACTUALIZAR del usuario
+    """
+    cambios = {f'resumen_historial.{campo}': increment(valor)
+               for campo, valor in resumir_historial(registros).items() if valor}
+    if creaciones:
+        cambios['resumen_historial.ultimo'] = creaciones[-1][2]
+    return cambios
+
 
 class UsuarioServicio:
     """
     Servicio para gestionar operaciones CRUD sobre usuarios en Firestore.
+
+    Mantiene el índice de correos (colección ``correos_usuarios``) al agregar,
+    actualizar y eliminar usuarios, para buscar por correo sin recorrer la
+    colección de usuarios.
+
+    Las lecturas de usuarios pasan por una caché LRU con tiempo de vida
+    (``CASINO_CACHE_USUARIOS`` entradas, ``CASINO_CACHE_USUARIOS_TTL`` segundos)
+    que las escrituras del servicio invalidan; las lecturas simultáneas del
+    mismo usuario comparten una sola consulta. La caché guarda el documento y
+    cada llamada recibe un Usuario nuevo, así que modificarlo no la altera.
+
+    El historial de cada usuario vive en la subcolección
+    ``usuarios/<id>/historial`` (solo se agregan registros) y se lee por páginas;
+    el documento del usuario solo guarda su resumen (``resumen_historial``).
+    Los usuarios que aún tienen el arreglo ``historial`` se migran al leerlos.
     """
 
+    @staticmethod
+    def invalidar_cache_usuario(id: str) -> None:
+        """Quita al usuario de la caché de lecturas; se llama después de escribirlo."""
+        # Quitar la lectura en curso evita que guarde en la caché datos anteriores a la escritura
+        _usuarios.invalidar(id)
+        _lecturas_en_curso.pop(id, None)
+
+    async def _obtener_dict(self, id: str, usar_cache: bool = True) -> dict | None:
+        """
+        Lee el documento del usuario a través de la caché.
+
+        Returns:
+            dict | None: Una copia del documento o None si no existe
+        """
+        global _lecturas_compartidas
+        if usar_cache:
+            usuario_dict = _usuarios.obtener(id)
+            if usuario_dict is not None:
+                return copy.deepcopy(usuario_dict)
+            lectura = _lecturas_en_curso.get(id)
+            if lectura is not None and lectura.get_loop() is asyncio.get_running_loop():
+                _lecturas_compartidas += 1
+                return copy.deepcopy(await asyncio.shield(lectura))
+        lectura = asyncio.ensure_future(get_data('usuarios', id))
+        _lecturas_en_curso[id] = lectura
+        try:
+            usuario_dict = await asyncio.shield(lectura)
+        finally:
+            if _lecturas_en_curso.get(id) is lectura:
+                del _lecturas_en_curso[id]
+                if lectura.done() and not lectura.cancelled() and lectura.exception() is None \
+                        and lectura.result() is not None:
+                    _usuarios.guardar(id, lectura.result())
+        return copy.deepcopy(usuario_dict)
+
+    @staticmethod
+    def escuchar_cambios_usuarios(error_callback=None):
+        """
+        Invalida la caché de usuarios cuando cambian en la base de datos, también
+        por escrituras de otros procesos.
+
+        Returns:
+            function: Función para detener el listener
+        """
+        def al_cambiar(_documentos, cambios, _momento):
+            for cambio in cambios:
+                UsuarioServicio.invalidar_cache_usuario(cambio['id'])
+
+        return add_collection_listener('usuarios', al_cambiar, None, error_callback)
+
+    @staticmethod
+    def get_metricas_cache() -> dict:
+        """
+        Returns:
+            dict: Métricas de la caché de usuarios (ver CacheLRU.get_metricas), más
+            ``lecturas_compartidas`` y ``lecturas_en_curso``
+        """
+        metricas = _usuarios.get_metricas()
+        metricas['lecturas_compartidas'] = _lecturas_compartidas
+        metricas['lecturas_en_curso'] = len(_lecturas_en_curso)
+        return metricas
+
+    async def _id_por_correo(self, correo: str, usar_cache: bool = True) -> str | None:
+        """
+        Busca el id del usuario con ese correo: en la caché, luego en el índice y,
+        para usuarios creados antes del índice, con una consulta por igualdad que
+        agrega la entrada que faltaba.
+
+        El índice no distingue mayúsculas, pero la consulta de respaldo compara el
+        correo tal como se escribió: un usuario antiguo guardado como
+        ``Ana@X.com`` no se encuentra con ``ana@x.com`` hasta que su entrada
+        exista (ver indexar_correos).
+
+        Returns:
+            str | None: El id del usuario o None si no hay usuario con ese correo
+        """
+        clave = normalizar_correo(correo)
+        if usar_cache:
+            usuario_id = _ids_por_correo.obtener(clave)
+            if usuario_id is not None:
+                return usuario_id
+        indice = await get_data(COLECCION_CORREOS, clave)
+        if indice is not None:
+            usuario_id = indice['usuario']
+        else:
+            encontrados = await query_equal('usuarios', 'correo', correo, 1)
+            if not encontrados:
+                return None
+            usuario_id = await self._reclamar_correo(clave, encontrados[0]['id'])
+        _ids_por_correo.guardar(clave, usuario_id)
+        return usuario_id
+
+    async def _reclamar_correo(self, clave: str, usuario_id: str) -> str:
+        """
+        Crea la entrada del índice para el usuario. La escritura es CREAR, así que
+        si dos usuarios reclaman el mismo correo a la vez solo uno la consigue.
+
+        Returns:
+            str: El id del usuario dueño de la entrada (puede ser otro)
+        """
+        while True:
+            try:
+                await batch_write([(CREAR, COLECCION_CORREOS, clave, {'usuario': usuario_id})])
+                return usuario_id
+            except DocumentoExistente:
+                indice = await get_data(COLECCION_CORREOS, clave)
+                # Si se borró entre medio, se vuelve a intentar
+                if indice is not None:
+                    return indice['usuario']
+
+    async def _reservar_correo(self, correo: str, usuario_id: str) -> bool:
+        """
+        Returns:
+            bool: True si la entrada del índice se creó ahora (y hay que liberarla
+            si falla la escritura del usuario); False si ya era del usuario
+
+        Raises:
+            ValueError: Si otro usuario ya tiene ese correo
+        """
+        otro_id = await self._id_por_correo(correo, usar_cache=False)
+        if otro_id is not None and otro_id != usuario_id:
+            raise ValueError(f"Ya existe un usuario con el correo {correo}")
+        clave = normalizar_correo(correo)
+        if otro_id is None and await self._reclamar_correo(clave, usuario_id) != usuario_id:
+            raise ValueError(f"Ya existe un usuario con el correo {correo}")
+        _ids_por_correo.guardar(clave, usuario_id)
+        return otro_id is None
+
+    @staticmethod
+    async def indexar_correos() -> int:
+        """
+        Agrega al índice los correos de los usuarios creados antes de él, para
+        que también se encuentren sin distinguir mayúsculas. Si dos usuarios
+        antiguos comparten un correo, el índice queda con el primero.
+
+        Returns:
+            int: Cantidad de entradas agregadas
+        """
+        servicio = UsuarioServicio()
+        agregadas = 0
+        for usuario_dict in await get_collection_data('usuarios'):
+            if usuario_dict is None or not usuario_dict.get('correo'):
+                continue
+            clave = normalizar_correo(usuario_dict['correo'])
+            if await get_data(COLECCION_CORREOS, clave) is None:
+                if await servicio._reclamar_correo(clave, usuario_dict['id']) == usuario_dict['id']:
+                    agregadas += 1
+        return agregadas
+
+    async def _liberar_correo(self, correo: str) -> None:
+        clave = normalizar_correo(correo)
+        await delete_data(COLECCION_CORREOS, clave)
+        _ids_por_correo.invalidar(clave)
+
     async def agregar_usuario(self, usuario: Usuario) -> None:
         """
         Agrega un nuevo usuario a la colección 'usuarios' en Firestore.
@@ -15,14 +285,22 @@ class UsuarioServicio:
             usuario (Usuario): Instancia de Usuario con los datos del usuario a agregar.
 
         Raises:
-            ValueError: Si el ID del usuario es vacío.
+            ValueError: Si el ID del usuario es vacío o el correo ya está registrado.
         """
         usuario_id = usuario.get_id()
         
         if not usuario_id:
             raise ValueError("El ID del usuario no puede estar vacío")
         
-        usuario_id = await add_data_with_id('usuarios', usuario.to_dict(), usuario_id)
+        reservado = await self._reservar_correo(usuario.get_correo(), usuario_id)
+        try:
+            usuario_id = await add_data_with_id('usuarios', usuario.to_dict(), usuario_id)
+        except Exception:
+            # Sin el usuario, la entrada reclamada dejaría el correo ocupado para siempre
+            if reservado:
+                await self._liberar_correo(usuario.get_correo())
+            raise
+        self.invalidar_cache_usuario(usuario_id)
         print(f'Usuario agregado con ID: {usuario_id}')
 
     async def eliminar_usuario(self, id: str) -> None:
@@ -32,7 +310,11 @@ class UsuarioServicio:
         Args:
             id (str): ID del usuario a eliminar.
         """
+        usuario_dict = await get_data('usuarios', id)
         usuario_id = await delete_data('usuarios', id)
+        self.invalidar_cache_usuario(id)
+        if usuario_dict is not None and usuario_dict.get('correo'):
+            await self._liberar_correo(usuario_dict['correo'])
         print(f'Usuario eliminado con ID: {usuario_id}')
 
     async def actualizar_usuario(self, id: str, usuario_dict: dict) -> None:
@@ -44,17 +326,33 @@ class UsuarioServicio:
             usuario_dict (dict): Diccionario con los datos a actualizar.
 
         Raises:
-            ValueError: Si se intenta actualizar el ID, saldo, total_apostado o historial del usuario.
+            ValueError: Si se intenta actualizar el ID, saldo, total_apostado o historial del usuario,
+                o si el correo nuevo ya está registrado.
         """
-        if not "id" in usuario_dict and not "saldo" in usuario_dict and not "total_apostado" in usuario_dict and not "historial" in usuario_dict:
-            usuario_id = await update_data('usuarios', id, usuario_dict)
+        protegidos = ("id", "saldo", "total_apostado", "historial", "resumen_historial")
+        if not any(campo.split('.')[0] in protegidos for campo in usuario_dict):
+            correo_anterior = None
+            reservado = False
+            if 'correo' in usuario_dict:
+                actual = await get_data('usuarios', id)
+                correo_anterior = actual.get('correo') if actual else None
+                reservado = await self._reservar_correo(usuario_dict['correo'], id)
+            try:
+                usuario_id = await update_data('usuarios', id, usuario_dict)
+            except Exception:
+                if reservado:
+                    await self._liberar_correo(usuario_dict['correo'])
+                raise
+            self.invalidar_cache_usuario(id)
+            if correo_anterior and normalizar_correo(correo_anterior) != normalizar_correo(usuario_dict['correo']):
+                await self._liberar_correo(correo_anterior)
             print(f'Usuario actualizado con ID: {usuario_id}')
         else:
             raise ValueError("No se puede actualizar el ID, saldo, total_apostado o historial del usuario")
 
     async def obtener_usuario(self, id: str) -> Usuario:
         """
-        Obtiene un usuario de la colección 'usuarios' en Firestore.
+        Obtiene un usuario de la colección 'usuarios' en Firestore, usando la caché.
 
         Args:
             id (str): ID del usuario a obtener.
@@ -62,9 +360,11 @@ class UsuarioServicio:
         Returns:
             Usuario: Instancia de Usuario con los datos obtenidos.
         """
-        usuario_dict = await get_data('usuarios', id)
+        usuario_dict = await self._obtener_dict(id)
         if usuario_dict is None:
             raise ValueError(f"No se encontró usuario con ID: {id}")
+        if 'historial' in usuario_dict:
+            usuario_dict = await self._migrar_historial(id, usuario_dict)
         usuario = Usuario.from_dict(usuario_dict)
         return usuario
 
@@ -93,6 +393,7 @@ class UsuarioServicio:
         """
         if monto > 0:
             usuario_id = await update_data('usuarios', id, {'saldo': increment(monto)})
+            self.invalidar_cache_usuario(id)
             print(f'Saldo actualizado con ID: {usuario_id}')
         else:
             raise ValueError("Monto debe ser mayor a 0")
@@ -110,6 +411,7 @@ class UsuarioServicio:
         """
         if monto > 0:
             usuario_id = await update_data('usuarios', id, {'saldo': decrement(monto)})
+            self.invalidar_cache_usuario(id)
             print(f'Saldo actualizado con ID: {usuario_id}')
         else:
             raise ValueError("Monto debe ser mayor a 0")
@@ -127,25 +429,115 @@ class UsuarioServicio:
         """
         if monto > 0:
             usuario_id = await update_data('usuarios', id, {'total_apostado': increment(monto)})
+            self.invalidar_cache_usuario(id)
             print(f'Total apostado actualizado con ID: {usuario_id}')
         else:
             raise ValueError("Monto debe ser mayor a 0")
         
     async def agregar_historial(self, id: str, historial: dict) -> None:
         """
-        Agrega un historial de apuestas a un usuario en Firestore.
+        Agrega un registro al historial de un usuario: lo crea en su subcolección
+        y actualiza el resumen del usuario en el mismo lote.
 
         Args:
             id (str): ID del usuario.
-            historial (dict): Diccionario de historiales de apuestas a agregar.
+            historial (dict): Registro de la apuesta a agregar.
+
+        Raises:
+            ValueError: Si no existe el usuario.
         """
-        
-        usuario_id = await update_data('usuarios', id, {'historial': array_union([historial])})
-        print(f'historial actualizado del usuario: {usuario_id}')
+        creaciones, cambios = preparar_historial(id, [historial])
+        await batch_write(creaciones + [(ACTUALIZAR, 'usuarios', id, cambios)])
+        self.invalidar_cache_usuario(id)
+        print(f'historial actualizado del usuario: {id}')
+
+    async def obtener_historial(self, id: str, limite: int = 20, cursor: str = None) -> dict:
+        """
+        Obtiene una página del historial de un usuario, del registro más reciente
+        al más antiguo.
+
+        Args:
+            id (str): ID del usuario.
+            limite (int, optional): Máximo de registros. Por defecto 20.
+            cursor (str, optional): Cursor que devolvió la página anterior; None para la primera.
+
+        Returns:
+            dict: 'registros' de la página y 'cursor' para pedir la siguiente (None si no hay más).
+
+        Raises:
+            ValueError: Si el límite es menor que 1.
+        """
+        if limite < 1:
+            raise ValueError("El límite debe ser al menos 1")
+        if cursor is None:
+            usuario_dict = await self._obtener_dict(id)
+            if usuario_dict is not None and 'historial' in usuario_dict:
+                await self._migrar_historial(id, usuario_dict)
+        documentos = await query_page(coleccion_historial(id), 'orden', limite, cursor)
+        for documento in documentos:
+            documento.pop('id', None)
+        siguiente = documentos[-1]['orden'] if len(documentos) == limite else None
+        return {'registros': documentos, 'cursor': siguiente}
+
+    async def _migrar_historial(self, id: str, usuario_dict: dict) -> dict:
+        """
+        Pasa el arreglo 'historial' de un usuario antiguo a su subcolección y lo
+        quita del documento, dejando el resumen en su lugar. Los registros
+        migrados tienen ids fijos, así que repetir una migración interrumpida no
+        los duplica, y el arreglo solo se quita en el último lote. Ese lote crea
+        además la marca ``usuarios/<id>/historial/_migrado``: si otro proceso ya
+        migró al usuario, falla entero y el resumen no se suma dos veces.
+
+        Returns:
+            dict: El documento del usuario sin el arreglo y con el resumen
+        """
+        migracion = _migraciones_en_curso.get(id)
+        if migracion is None or migracion.get_loop() is not asyncio.get_running_loop():
+            migracion = asyncio.ensure_future(self._aplicar_migracion_historial(id))
+            _migraciones_en_curso[id] = migracion
+
+            def al_terminar(tarea):
+                if _migraciones_en_curso.get(id) is tarea:
+                    del _migraciones_en_curso[id]
+
+            migracion.add_done_callback(al_terminar)
+        return await asyncio.shield(migracion) or usuario_dict
+
+    async def _aplicar_migracion_historial(self, id: str) -> dict | None:
+        usuario_dict = await self._obtener_dict(id, usar_cache=False)
+        if usuario_dict is None or 'historial' not in usuario_dict:
+            return usuario_dict
+        registros = [registro for registro in usuario_dict.get('historial') or [] if isinstance(registro, dict)]
+        # Los registros antiguos quedan antes que cualquiera nuevo
+        escrituras = []
+        for posicion, registro in enumerate(registros):
+            orden = f'{0:020d}-{posicion:08d}'
+            escrituras.append((ESTABLECER, coleccion_historial(id), orden, dict(registro, orden=orden)))
+        cambios = {f'resumen_historial.{campo}': increment(valor)
+                   for campo, valor in resumir_historial(registros).items() if valor}
+        if escrituras and not (usuario_dict.get('resumen_historial') or {}).get('ultimo'):
+            cambios['resumen_historial.ultimo'] = escrituras[-1][2]
+        cambios['historial'] = delete_field()
+        # El último lote lleva además la marca y la actualización del usuario
+        tamaño = MAXIMO_LOTE - 2
+        partes = [escrituras[i:i + tamaño] for i in range(0, len(escrituras), tamaño)] or [[]]
+        for parte in partes[:-1]:
+            await batch_write(parte)
+        marca = (CREAR, coleccion_historial(id), MARCA_MIGRACION, {'registros': len(registros)})
+        final = partes[-1] + [marca, (ACTUALIZAR, 'usuarios', id, cambios)]
+        assert len(final) <= MAXIMO_LOTE, "el último lote de la migración debe ser atómico"
+        try:
+            await batch_write(final)
+            print(f'Historial del usuario {id} migrado: {len(registros)} registros')
+        except DocumentoExistente:
+            print(f'Historial del usuario {id} ya migrado por otro proceso')
+        self.invalidar_cache_usuario(id)
+        return await self._obtener_dict(id)
 
     async def buscar_usuario_por_correo(self, correo: str) -> Usuario | None:
         """
-        Busca un usuario por su correo electrónico en Firestore.
+        Busca un usuario por su correo electrónico en Firestore, usando el índice
+        de correos (sin distinguir mayúsculas).
 
         Args:
             correo (str): Correo electrónico del usuario a buscar.
@@ -154,10 +546,18 @@ class UsuarioServicio:
             Usuario | None: Instancia de Usuario si se encuentra, None si no existe.
         """
         try:
-            usuarios_dict = await get_collection_data('usuarios')
-            for usuario_dict in usuarios_dict:
-                if usuario_dict.get('correo') == correo:
+            clave = normalizar_correo(correo)
+            for usar_cache in (True, False):
+                usuario_id = await self._id_por_correo(correo, usar_cache)
+                if usuario_id is None:
+                    return None
+                usuario_dict = await self._obtener_dict(usuario_id, usar_cache)
+                if usuario_dict is not None and normalizar_correo(usuario_dict.get('correo', '')) == clave:
+                    if 'historial' in usuario_dict:
+                        usuario_dict = await self._migrar_historial(usuario_id, usuario_dict)
                     return Usuario.from_dict(usuario_dict)
+                # La caché apuntaba a un usuario que ya no tiene ese correo
+                _ids_por_correo.invalidar(clave)
             return None
         except Exception as e:
             print(f"Error al buscar usuario por correo: {e}")
@@ -2,8 +2,11 @@
 
 from .Usuario import Usuario
 from .UsuarioServicio import UsuarioServicio
+from .LibroDeSaldos import LibroDeSaldos, obtener_libro
 
 __all__ = [
     'Usuario',
-    'UsuarioServicio'
+    'UsuarioServicio',
+    'LibroDeSaldos',
+    'obtener_libro'
 ]
\ No newline at end of file
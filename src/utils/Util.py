@@ -3,11 +3,15 @@ Módulo de utilidades para el Casino
 Proporciona funciones auxiliares utilizadas en todo el proyecto
 """
 
-import secrets
+from .aleatorio import obtener_pool
 
 def generador_random(minimo: int, maximo: int) -> int:
     """
-    Genera un número aleatorio criptográficamente seguro entre un rango dado
+    Genera un número aleatorio criptográficamente seguro entre un rango dado.
+
+    Los valores salen del pool de entropía del sistema compartido por el proceso
+    (ver aleatorio.PoolEntropia), que es seguro entre hilos y evita una lectura
+    del sistema por llamada.
     
     Args:
         minimo (int): El valor mínimo del rango (inclusive)
@@ -15,11 +19,37 @@ def generador_random(minimo: int, maximo: int) -> int:
         
     Returns:
         int: Un número aleatorio entre minimo y maximo
+
+    Raises:
+        ValueError: Si minimo es mayor que maximo
         
     Ejemplo:
         >>> generador_random(1, 10)
         7
     """
-    return secrets.randbelow(maximo - minimo + 1) + minimo
+    return obtener_pool().entero(minimo, maximo)
+
+
+def generar_randoms(minimo: int, maximo: int, cantidad: int) -> list:
+    """
+    Genera varios números aleatorios criptográficamente seguros entre un rango dado
+    con una sola toma del pool de entropía.
+
+    Args:
+        minimo (int): El valor mínimo del rango (inclusive)
+        maximo (int): El valor máximo del rango (inclusive)
+        cantidad (int): Cantidad de números a generar
+
+    Returns:
+        list: Lista de números aleatorios entre minimo y maximo
+
+    Raises:
+        ValueError: Si minimo es mayor que maximo o la cantidad es negativa
+
+    Ejemplo:
+        >>> generar_randoms(1, 6, 3)
+        [4, 1, 6]
+    """
+    return obtener_pool().enteros(minimo, maximo, cantidad)
 
     
@@ -6,21 +6,57 @@ __version__ = "0.1.0"
 __author__ = "sga-encoder"
 
 # Importar funciones de utilidad
-from .Util import generador_random
+from .Util import generador_random, generar_randoms
+
+# Importar los generadores aleatorios
+from .aleatorio import GeneradorAleatorio, GeneradorSeguro, GeneradorSimulacion, PoolEntropia, obtener_pool
+
+# Importar la caché en disco
+from .cache_disco import CacheDisco, directorio_cache
+
+# Importar el directorio de datos locales
+from .datos_disco import bloquear_archivo, directorio_datos
+
+# Importar la caché LRU en memoria
+from .cache_lru import CacheLRU
 
 # Importar funciones y clase de Firestore
 from .firestore import (
     Firestore,
     increment,
     decrement,
-    array_union
+    array_union,
+    array_remove
 )
 
+# Importar el manejo de los clientes de Firestore
+from .cliente_firestore import ClientesFirestore, obtener_clientes
+
+# Importar los backends de persistencia
+from .persistencia import BackendPersistencia, configurar_backend, obtener_backend
+
 # Exportar todo lo que se debe poder importar desde el módulo utils
 __all__ = [
     'generador_random',
+    'generar_randoms',
+    'GeneradorAleatorio',
+    'GeneradorSeguro',
+    'GeneradorSimulacion',
+    'PoolEntropia',
+    'obtener_pool',
+    'CacheDisco',
+    'directorio_cache',
+    'directorio_datos',
+    'bloquear_archivo',
+    'CacheLRU',
     'Firestore',
     'increment',
     'decrement',
-    'array_union'
+    'array_union',
+    'array_remove',
+    'ClientesFirestore',
+    'obtener_clientes',
+    'BackendPersistencia',
+    'configurar_backend',
+    'obtener_backend'
 ]
@@ -0,0 +1,340 @@
+"""
+Generadores aleatorios inyectables para las mesas del Casino.
+
+Cada mesa recibe su propio generador, así sus flujos son independientes:
+
+- ``GeneradorSeguro``: usa la entropía del sistema operativo (``os.urandom``)
+  tomada del ``PoolEntropia`` compartido. Es el modo para partidas con dinero real.
+- ``GeneradorSimulacion``: usa PCG64 de NumPy con semilla. Es rápido y
+  reproducible, para simulaciones y para repetir una partida.
+
+Ambos sacan palabras de 32 bits de un búfer que se rellena en bloques, por lo que
+tiradas de dados y barajados completos salen de un mismo bloque en vez de una
+llamada al sistema por valor. Los enteros acotados se obtienen por muestreo con
+rechazo, sin el sesgo del módulo.
+
+El ``PoolEntropia`` del proceso (``obtener_pool``) mantiene bloques de
+``os.urandom`` ya leídos por un hilo de fondo, así las llamadas de las mesas no
+esperan a la lectura del sistema. Al hacer ``fork`` los búferes seguros se
+descartan en el hijo para que no repita los valores del padre.
+"""
+
+import os
+import queue
+import threading
+import weakref
+from abc import ABC, abstractmethod
+from typing import MutableSequence, Sequence
+
+_BITS = 32
+_RANGO_PALABRA = 1 << _BITS
+
+# Generadores con entropía del sistema cuyo búfer no debe heredarse en un fork
+_seguros = weakref.WeakSet()
+
+
+def _leer_urandom(cantidad: int) -> list:
+    return memoryview(os.urandom(4 * cantidad)).cast('I').tolist()
+
+
+class GeneradorAleatorio(ABC):
+    """
+    Base de los generadores: entrega enteros, barajados y elecciones a partir de
+    un búfer de palabras de 32 bits que cada subclase rellena con ``_bloque``.
+    """
+
+    def __init__(self, tamano_bloque: int = 1024):
+        """
+        Args:
+            tamano_bloque (int, optional): Palabras de 32 bits leídas por bloque
+        """
+        if tamano_bloque < 1:
+            raise ValueError("El tamaño de bloque debe ser positivo")
+        self._tamano_bloque = tamano_bloque
+        self._buffer = []
+        self._indice = 0
+        self._lock = threading.Lock()
+
+    def _descartar_buffer(self) -> None:
+        self._buffer = []
+        self._indice = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        # El lock no se copia; por ejemplo, al migrar una mesa a otro proceso
+        estado = self.__dict__.copy()
+        del estado['_lock']
+        return estado
+
+    def __setstate__(self, estado: dict) -> None:
+        self.__dict__.update(estado)
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _bloque(self, cantidad: int) -> list:
+        """Retorna ``cantidad`` palabras aleatorias de 32 bits."""
+        pass
+
+    @abstractmethod
+    def derivar(self) -> 'GeneradorAleatorio':
+        """Retorna un generador con un flujo independiente de este."""
+        pass
+
+    def _palabra(self) -> int:
+        if self._indice >= len(self._buffer):
+            self._buffer = self._bloque(self._tamano_bloque)
+            self._indice = 0
+        palabra = self._buffer[self._indice]
+        self._indice += 1
+        return palabra
+
+    def palabras(self, cantidad: int) -> list:
+        """
+        Retorna ``cantidad`` palabras aleatorias de 32 bits tomadas del búfer.
+        """
+        with self._lock:
+            return self._palabras(cantidad)
+
+    def _palabras(self, cantidad: int) -> list:
+        # Como palabras, para quien ya tiene el lock
+        resultado = []
+        while cantidad > 0:
+            if self._indice >= len(self._buffer):
+                self._buffer = self._bloque(self._tamano_bloque)
+                self._indice = 0
+            fin = min(self._indice + cantidad, len(self._buffer))
+            resultado += self._buffer[self._indice:fin]
+            cantidad -= fin - self._indice
+            self._indice = fin
+        return resultado
+
+    def _acotado(self, rango: int) -> int:
+        # Entero uniforme en [0, rango) por muestreo con rechazo
+        if rango <= _RANGO_PALABRA:
+            limite = _RANGO_PALABRA - _RANGO_PALABRA % rango
+            palabra = self._palabra()
+            while palabra >= limite:
+                palabra = self._palabra()
+            return palabra % rango
+        # Rangos mayores a 32 bits: se concatenan palabras
+        palabras = (rango.bit_length() + _BITS - 1) // _BITS
+        total = 1 << (palabras * _BITS)
+        limite = total - total % rango
+        while True:
+            valor = 0
+            for _ in range(palabras):
+                valor = (valor << _BITS) | self._palabra()
+            if valor < limite:
+                return valor % rango
+
+    def entero(self, minimo: int, maximo: int) -> int:
+        """
+        Genera un entero uniforme entre minimo y maximo (ambos inclusive).
+
+        Raises:
+            ValueError: Si minimo es mayor que maximo
+        """
+        if minimo > maximo:
+            raise ValueError("El mínimo no puede ser mayor que el máximo")
+        with self._lock:
+            return minimo + self._acotado(maximo - minimo + 1)
+
+    def enteros(self, minimo: int, maximo: int, cantidad: int) -> list:
+        """
+        Genera ``cantidad`` enteros uniformes entre minimo y maximo (inclusive).
+
+        Si el rango cabe en una palabra, el muestreo con rechazo se hace con NumPy
+        sobre bloques enteros de palabras. Cada vuelta pide exactamente las que
+        faltan, así que los valores son los mismos que con ``entero`` repetido.
+
+        Raises:
+            ValueError: Si minimo es mayor que maximo o la cantidad es negativa
+        """
+        if minimo > maximo:
+            raise ValueError("El mínimo no puede ser mayor que el máximo")
+        if cantidad < 0:
+            raise ValueError("La cantidad no puede ser negativa")
+        rango = maximo - minimo + 1
+        if rango > _RANGO_PALABRA or not -(1 << 62) <= minimo <= 1 << 62:
+            acotado = self._acotado
+            with self._lock:
+                return [minimo + acotado(rango) for _ in range(cantidad)]
+
+        import numpy as np
+        limite = _RANGO_PALABRA - _RANGO_PALABRA % rango
+        partes = []
+        faltan = cantidad
+        with self._lock:
+            while faltan > 0:
+                bloque = np.array(self._palabras(faltan), dtype=np.int64)
+                aceptadas = bloque[bloque < limite]
+                partes.append(aceptadas % rango)
+                faltan -= len(aceptadas)
+        if not partes:
+            return []
+        return (np.concatenate(partes) + minimo).tolist()
+
+    def barajar(self, lista: MutableSequence, inicio: int = 0) -> None:
+        """
+        Baraja en el lugar los elementos de ``lista`` desde ``inicio`` (Fisher-Yates).
+        """
+        acotado = self._acotado
+        with self._lock:
+            for i in range(len(lista) - 1, inicio, -1):
+                j = inicio + acotado(i - inicio + 1)
+                lista[i], lista[j] = lista[j], lista[i]
+
+    def elegir(self, secuencia: Sequence):
+        """
+        Elige un elemento al azar de la secuencia.
+
+        Raises:
+            ValueError: Si la secuencia está vacía
+        """
+        if not secuencia:
+            raise ValueError("No se puede elegir de una secuencia vacía")
+        with self._lock:
+            return secuencia[self._acotado(len(secuencia))]
+
+
+class PoolEntropia(GeneradorAleatorio):
+    """
+    Fuente compartida de entropía del sistema, segura entre hilos.
+
+    Un hilo de fondo (que arranca con el primer uso) deja listos hasta
+    ``bloques_listos`` bloques de ``os.urandom``; si en algún momento no hay
+    ninguno listo, el bloque se lee directamente en lugar de esperar.
+    """
+
+    def __init__(self, tamano_bloque: int = 16384, bloques_listos: int = 2):
+        """
+        Args:
+            tamano_bloque (int, optional): Palabras de 32 bits por bloque
+            bloques_listos (int, optional): Bloques que el hilo de fondo mantiene leídos
+        """
+        super().__init__(tamano_bloque)
+        self._bloques_listos = bloques_listos
+        self._cola = None
+        _seguros.add(self)
+
+    def _descartar_buffer(self) -> None:
+        super()._descartar_buffer()
+        # El hilo de relleno no sobrevive al fork; se vuelve a crear al usarlo
+        self._cola = None
+
+    def _iniciar_relleno(self) -> None:
+        self._cola = queue.Queue(maxsize=self._bloques_listos)
+        threading.Thread(
+            target=self._rellenar, args=(self._cola,), name='pool-entropia', daemon=True
+        ).start()
+
+    def _rellenar(self, cola: queue.Queue) -> None:
+        # Termina si la cola fue reemplazada (por ejemplo, después de un fork)
+        while cola is self._cola:
+            try:
+                cola.put(_leer_urandom(self._tamano_bloque), timeout=1)
+            except queue.Full:
+                continue
+
+    def _bloque(self, cantidad: int) -> list:
+        if self._cola is None:
+            self._iniciar_relleno()
+        if cantidad == self._tamano_bloque:
+            try:
+                return self._cola.get_nowait()
+            except queue.Empty:
+                pass
+        return _leer_urandom(cantidad)
+
+    def derivar(self) -> 'PoolEntropia':
+        return PoolEntropia(self._tamano_bloque, self._bloques_listos)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def obtener_pool() -> PoolEntropia:
+    """Retorna el PoolEntropia compartido del proceso."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PoolEntropia()
+    return _pool
+
+
+def _despues_de_fork() -> None:
+    for generador in list(_seguros):
+        generador._descartar_buffer()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_despues_de_fork)
+
+
+class GeneradorSeguro(GeneradorAleatorio):
+    """
+    Generador criptográficamente seguro que toma sus bloques del PoolEntropia.
+    """
+
+    def __init__(self, tamano_bloque: int = 1024):
+        super().__init__(tamano_bloque)
+        _seguros.add(self)
+
+    def _bloque(self, cantidad: int) -> list:
+        return obtener_pool().palabras(cantidad)
+
+    def __getstate__(self) -> dict:
+        # Dos copias nunca deben entregar las mismas palabras: la copia empieza sin búfer
+        estado = super().__getstate__()
+        estado['_buffer'] = []
+        estado['_indice'] = 0
+        return estado
+
+    def __setstate__(self, estado: dict) -> None:
+        super().__setstate__(estado)
+        _seguros.add(self)
+
+    def derivar(self) -> 'GeneradorSeguro':
+        return GeneradorSeguro(self._tamano_bloque)
+
+
+class GeneradorSimulacion(GeneradorAleatorio):
+    """
+    Generador PCG64 de NumPy con semilla para simulaciones reproducibles.
+
+    Con la misma semilla y la misma secuencia de llamadas produce exactamente los
+    mismos valores. ``derivar`` crea flujos hijos independientes a partir de la
+    misma semilla (``SeedSequence.spawn``), uno por mesa. Requiere NumPy.
+    """
+
+    def __init__(self, semilla=None, tamano_bloque: int = 1024):
+        """
+        Args:
+            semilla (int | numpy.random.SeedSequence, optional): Semilla del flujo.
+                Sin semilla se toma entropía del sistema
+            tamano_bloque (int, optional): Palabras de 32 bits generadas por bloque
+        """
+        import numpy as np
+
+        super().__init__(tamano_bloque)
+        if not isinstance(semilla, np.random.SeedSequence):
+            semilla = np.random.SeedSequence(semilla)
+        self._semilla = semilla
+        self._rng = np.random.Generator(np.random.PCG64(semilla))
+
+    def _bloque(self, cantidad: int) -> list:
+        import numpy as np
+        return self._rng.integers(0, _RANGO_PALABRA, size=cantidad, dtype=np.uint32).tolist()
+
+    def get_semilla(self) -> int:
+        """Retorna la entropía de la semilla para poder repetir la simulación"""
+        return self._semilla.entropy
+
+    def get_numpy(self):
+        """Retorna el ``numpy.random.Generator`` subyacente para cálculos vectorizados"""
+        return self._rng
+
+    def derivar(self) -> 'GeneradorSimulacion':
+        return GeneradorSimulacion(self._semilla.spawn(1)[0], self._tamano_bloque)
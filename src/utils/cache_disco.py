@@ -0,0 +1,74 @@
+"""
+Caché persistente en disco para resultados costosos de calcular (tablas de
+estrategia, equidades de rangos, etc.).
+
+Cada entrada es un archivo JSON cuyo nombre es el SHA-1 de la clave, dentro de
+un subdirectorio por caché. El directorio base se toma de la variable de entorno
+``CASINO_CACHE_DIR`` o, si no existe, de ``~/.cache/casino-virtual``.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Optional
+
+
+def directorio_cache() -> str:
+    """Retorna el directorio base de las cachés en disco."""
+    return os.getenv('CASINO_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'casino-virtual')
+
+
+class CacheDisco:
+    """
+    Caché clave-valor en disco con valores serializables en JSON.
+
+    Las escrituras son atómicas (archivo temporal + ``os.replace``), por lo que
+    varios procesos pueden compartir la misma caché.
+    """
+
+    def __init__(self, nombre: str, directorio: str = None):
+        """
+        Args:
+            nombre (str): Nombre de la caché (subdirectorio)
+            directorio (str, optional): Directorio base. Por defecto directorio_cache()
+        """
+        self._directorio = os.path.join(directorio or directorio_cache(), nombre)
+
+    def get_directorio(self) -> str:
+        """Retorna el directorio donde se guardan las entradas"""
+        return self._directorio
+
+    def _ruta(self, clave: str) -> str:
+        nombre = hashlib.sha1(clave.encode('utf-8')).hexdigest()
+        return os.path.join(self._directorio, f"{nombre}.json")
+
+    def obtener(self, clave: str) -> Optional[Any]:
+        """
+        Obtiene el valor guardado para una clave.
+
+        Returns:
+            Optional[Any]: El valor o None si no existe o está dañado
+        """
+        try:
+            with open(self._ruta(clave), encoding='utf-8') as archivo:
+                entrada = json.load(archivo)
+        except (OSError, ValueError):
+            return None
+        # Protección ante colisiones de SHA-1: se guarda la clave completa
+        return entrada.get('valor') if entrada.get('clave') == clave else None
+
+    def guardar(self, clave: str, valor: Any) -> None:
+        """
+        Guarda un valor serializable en JSON para una clave.
+        """
+        os.makedirs(self._directorio, exist_ok=True)
+        descriptor, temporal = tempfile.mkstemp(dir=self._directorio, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'w', encoding='utf-8') as archivo:
+                json.dump({'clave': clave, 'valor': valor}, archivo)
+            os.replace(temporal, self._ruta(clave))
+        except BaseException:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            raise
@@ -0,0 +1,111 @@
+"""
+Caché en memoria del proceso que descarta las entradas usadas hace más tiempo
+cuando se llena y, opcionalmente, las que superan un tiempo de vida.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class CacheLRU:
+    """
+    Caché clave-valor con capacidad fija y política LRU, segura entre hilos.
+    """
+
+    def __init__(self, capacidad: int = 1024, ttl: float = None):
+        """
+        Args:
+            capacidad (int, optional): Máximo de entradas. Por defecto 1024
+            ttl (float, optional): Segundos que vale cada entrada. Por defecto sin límite
+
+        Raises:
+            ValueError: Si la capacidad es menor que 1 o el ttl no es positivo
+        """
+        if capacidad < 1:
+            raise ValueError("La capacidad debe ser al menos 1")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("El ttl debe ser positivo")
+        self._capacidad = capacidad
+        self._ttl = ttl
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self._aciertos = 0
+        self._fallos = 0
+        self._expiradas = 0
+        self._descartadas = 0
+        self._invalidadas = 0
+
+    def get_capacidad(self) -> int:
+        return self._capacidad
+
+    def get_ttl(self) -> float | None:
+        return self._ttl
+
+    def obtener(self, clave) -> Optional[Any]:
+        """
+        Returns:
+            Optional[Any]: El valor o None si no está en la caché o ya expiró
+        """
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self._fallos += 1
+                return None
+            valor, vence = entrada
+            if vence is not None and vence <= time.monotonic():
+                del self._entradas[clave]
+                self._expiradas += 1
+                self._fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self._aciertos += 1
+            return valor
+
+    def guardar(self, clave, valor) -> None:
+        """Guarda el valor; si la caché está llena descarta la entrada menos usada."""
+        vence = time.monotonic() + self._ttl if self._ttl is not None else None
+        with self._lock:
+            self._entradas[clave] = (valor, vence)
+            self._entradas.move_to_end(clave)
+            if len(self._entradas) > self._capacidad:
+                self._entradas.popitem(last=False)
+                self._descartadas += 1
+
+    def invalidar(self, clave) -> None:
+        """Quita la entrada si existe."""
+        with self._lock:
+            if self._entradas.pop(clave, None) is not None:
+                self._invalidadas += 1
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+
+    def get_metricas(self) -> dict:
+        """
+        Returns:
+            dict: ``entradas``, ``aciertos``, ``fallos``, ``tasa_aciertos``,
+            ``expiradas``, ``descartadas`` (por capacidad) e ``invalidadas``
+        """
+        with self._lock:
+            consultas = self._aciertos + self._fallos
+            return {
+                'entradas': len(self._entradas),
+                'aciertos': self._aciertos,
+                'fallos': self._fallos,
+                'tasa_aciertos': self._aciertos / consultas if consultas else 0.0,
+                'expiradas': self._expiradas,
+                'descartadas': self._descartadas,
+                'invalidadas': self._invalidadas
+            }
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def __contains__(self, clave) -> bool:
+        return clave in self._entradas
+
+    def __repr__(self) -> str:
+        return f"CacheLRU(entradas={len(self._entradas)}, capacidad={self._capacidad}, ttl={self._ttl})"
@@ -0,0 +1,202 @@
+"""
+Ciclo de vida de los clientes asíncronos de Firestore.
+
+El canal gRPC de un cliente asíncrono queda atado al bucle de eventos donde se
+usa por primera vez, así que se mantiene un grupo de clientes por bucle: se
+crean la primera vez que se piden en ese bucle y se reutilizan en todas las
+operaciones. Con ``canales > 1`` cada cliente abre su propio canal y las
+operaciones se reparten entre ellos en ronda.
+"""
+
+import asyncio
+import itertools
+import os
+import threading
+import weakref
+
+# Opciones por defecto de google-cloud-firestore: keepalive y mensajes sin límite de tamaño
+OPCIONES_CANAL = (
+    ('grpc.keepalive_time_ms', 30000),
+    ('grpc.max_send_message_length', -1),
+    ('grpc.max_receive_message_length', -1),
+)
+
+
+def _crear_cliente(opciones_canal: list):
+    from firebase_admin import firestore_async  # noqa: F401  (registra el servicio de Firestore)
+    from google.cloud.firestore_v1 import AsyncClient
+    from google.cloud.firestore_v1.services.firestore import async_client as api
+    from google.cloud.firestore_v1.services.firestore.transports.grpc_asyncio import FirestoreGrpcAsyncIOTransport
+    import firebase_admin
+
+    class _ClienteAsync(AsyncClient):
+        # AsyncClient no permite elegir las opciones del canal: se crea aquí con las configuradas
+        @property
+        def _firestore_api(self):
+            if self._firestore_api_internal is None and self._emulator_host is None:
+                canal = FirestoreGrpcAsyncIOTransport.create_channel(
+                    self._target, credentials=self._credentials, options=opciones_canal
+                )
+                self._transport = FirestoreGrpcAsyncIOTransport(host=self._target, channel=canal)
+                self._firestore_api_internal = api.FirestoreAsyncClient(
+                    transport=self._transport, client_options=self._client_options
+                )
+            return super()._firestore_api
+
+    app = firebase_admin.get_app()
+    project = app.project_id
+    if not project:
+        raise ValueError("Se necesita el project_id de Firebase para usar Firestore")
+    return _ClienteAsync(credentials=app.credential.get_credential(), project=project)
+
+
+async def _cerrar_cliente(cliente) -> None:
+    # El canal solo existe si el cliente hizo alguna operación
+    if cliente._firestore_api_internal is not None:
+        await cliente._transport.close()
+
+
+class _EnVuelo:
+    # Cuenta una operación en curso mientras dura el bloque async with
+    __slots__ = ('_clientes',)
+
+    def __init__(self, clientes: 'ClientesFirestore'):
+        self._clientes = clientes
+
+    async def __aenter__(self):
+        self._clientes._empezar_rpc()
+        return self
+
+    async def __aexit__(self, *excepcion):
+        self._clientes._terminar_rpc()
+
+
+class ClientesFirestore:
+    """
+    Grupo de clientes asíncronos de Firestore por bucle de eventos, compartido por
+    todos los servicios del proceso.
+    """
+
+    def __init__(self, canales: int = None, opciones_canal: list = None):
+        """
+        Args:
+            canales (int, optional): Clientes (canales gRPC) por bucle. Por defecto
+                CASINO_FIRESTORE_CANALES o 1
+            opciones_canal (list, optional): Opciones gRPC ``(nombre, valor)`` que se
+                agregan a las de OPCIONES_CANAL
+        """
+        self._lock = threading.Lock()
+        self._por_bucle = weakref.WeakKeyDictionary()
+        self._creados = 0
+        self._cerrados = 0
+        self._en_vuelo = 0
+        self._maximo_en_vuelo = 0
+        self._rpc_totales = 0
+        self.configurar(canales or int(os.getenv('CASINO_FIRESTORE_CANALES', '1')), opciones_canal)
+
+    def configurar(self, canales: int = None, opciones_canal: list = None) -> None:
+        """
+        Cambia la configuración de los clientes que se creen desde ahora; los ya
+        creados se conservan hasta cerrar().
+
+        Raises:
+            ValueError: Si canales es menor que 1
+        """
+        if canales is not None:
+            if canales < 1:
+                raise ValueError("Se necesita al menos un canal")
+            self._canales = canales
+        if opciones_canal is not None or not hasattr(self, '_opciones_canal'):
+            opciones = dict(OPCIONES_CANAL)
+            opciones.update(dict(opciones_canal or ()))
+            self._opciones_canal = list(opciones.items())
+
+    def _opciones(self) -> list:
+        if self._canales == 1:
+            return self._opciones_canal
+        # Sin subcanales locales gRPC reutiliza la misma conexión para todos los canales
+        return self._opciones_canal + [('grpc.use_local_subchannel_pool', 1)]
+
+    def obtener(self):
+        """
+        Retorna un cliente para el bucle de eventos actual, creándolo la primera vez.
+
+        Raises:
+            RuntimeError: Si no hay un bucle de eventos en ejecución
+        """
+        bucle = asyncio.get_running_loop()
+        with self._lock:
+            grupo = self._por_bucle.get(bucle)
+        if grupo is None:
+            from .firestore import initialize_firebase
+            initialize_firebase()
+            clientes = [_crear_cliente(self._opciones()) for _ in range(self._canales)]
+            with self._lock:
+                # Solo este bucle crea su grupo, pero se revisa por si otro hilo lo usa
+                grupo = self._por_bucle.setdefault(bucle, (clientes, itertools.cycle(clientes)))
+                if grupo[0] is clientes:
+                    self._creados += len(clientes)
+        return next(grupo[1])
+
+    def rpc(self) -> _EnVuelo:
+        """Contexto ``async with`` que cuenta una operación en curso."""
+        return _EnVuelo(self)
+
+    def _empezar_rpc(self) -> None:
+        with self._lock:
+            self._en_vuelo += 1
+            self._rpc_totales += 1
+            self._maximo_en_vuelo = max(self._maximo_en_vuelo, self._en_vuelo)
+
+    def _terminar_rpc(self) -> None:
+        with self._lock:
+            self._en_vuelo -= 1
+
+    async def cerrar(self) -> int:
+        """
+        Cierra los clientes del bucle actual; el próximo obtener() crea otros.
+
+        Returns:
+            int: Cantidad de clientes cerrados
+        """
+        with self._lock:
+            grupo = self._por_bucle.pop(asyncio.get_running_loop(), None)
+        if grupo is None:
+            return 0
+        await asyncio.gather(*(_cerrar_cliente(cliente) for cliente in grupo[0]), return_exceptions=True)
+        with self._lock:
+            self._cerrados += len(grupo[0])
+        return len(grupo[0])
+
+    def get_metricas(self) -> dict:
+        """
+        Returns:
+            dict: ``clientes_creados``, ``clientes_cerrados``, ``bucles``,
+            ``rpc_en_vuelo``, ``rpc_maximo_en_vuelo`` y ``rpc_totales``
+        """
+        with self._lock:
+            return {
+                'clientes_creados': self._creados,
+                'clientes_cerrados': self._cerrados,
+                'bucles': len(self._por_bucle),
+                'rpc_en_vuelo': self._en_vuelo,
+                'rpc_maximo_en_vuelo': self._maximo_en_vuelo,
+                'rpc_totales': self._rpc_totales
+            }
+
+    def __repr__(self) -> str:
+        return f"ClientesFirestore(canales={self._canales}, bucles={len(self._por_bucle)})"
+
+
+_clientes = None
+_clientes_lock = threading.Lock()
+
+
+def obtener_clientes() -> ClientesFirestore:
+    """Retorna los ClientesFirestore compartidos del proceso."""
+    global _clientes
+    if _clientes is None:
+        with _clientes_lock:
+            if _clientes is None:
+                _clientes = ClientesFirestore()
+    return _clientes
@@ -0,0 +1,43 @@
+"""
+Directorio de los datos locales que no se pueden regenerar (registros de
+escritura, bloqueos), a diferencia de la caché en disco, que se puede borrar en
+cualquier momento.
+
+El directorio base se toma de la variable de entorno ``CASINO_DATOS_DIR`` o, si
+no existe, de ``%LOCALAPPDATA%\\casino-virtual`` en Windows y de
+``$XDG_DATA_HOME/casino-virtual`` (``~/.local/share/casino-virtual``) en el resto.
+"""
+
+import os
+
+
+def directorio_datos() -> str:
+    """Retorna el directorio base de los datos locales."""
+    if os.getenv('CASINO_DATOS_DIR'):
+        return os.getenv('CASINO_DATOS_DIR')
+    base = os.getenv('LOCALAPPDATA') if os.name == 'nt' else os.getenv('XDG_DATA_HOME')
+    return os.path.join(base or os.path.join(os.path.expanduser('~'), '.local', 'share'), 'casino-virtual')
+
+
+def bloquear_archivo(ruta: str):
+    """
+    Toma un bloqueo exclusivo sobre un archivo (creándolo si no existe) sin esperar.
+    El sistema lo libera cuando el archivo se cierra o el proceso termina.
+
+    Returns:
+        El archivo abierto que mantiene el bloqueo, o None si otro proceso ya lo tiene
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+    archivo = open(ruta, 'a+b')
+    try:
+        if os.name == 'nt':
+            import msvcrt
+            archivo.seek(0)
+            msvcrt.locking(archivo.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(archivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        archivo.close()
+        return None
+    return archivo
@@ -1,11 +1,14 @@
 import os
 import threading
-from dotenv import load_dotenv
-import firebase_admin
-from firebase_admin import credentials, firestore_async, firestore
-from google.cloud.firestore_v1 import Increment, ArrayUnion, ArrayRemove
-from typing import Callable, List, Dict, Any, Optional
+from typing import AsyncIterator, Callable, List, Dict, Any, Optional
 from .pretty_printer import PrettyPrinter
+from .persistencia import (
+    ACTUALIZAR, CREAR, ELIMINAR, ESTABLECER, MAXIMO_LOTE, BackendPersistencia, BorrarCampo, DocumentoExistente,
+    Incremento, UnionArreglo, RemoverArreglo, obtener_backend
+)
+from .cliente_firestore import obtener_clientes
+
+# firebase_admin se importa al usarse, para poder trabajar sin conexión con otro backend
 
 # Variable global para controlar la inicialización
 _firebase_initialized = False
@@ -19,6 +22,10 @@ def initialize_firebase():
     if _firebase_initialized:
         return
     
+    import firebase_admin
+    from firebase_admin import credentials
+    from dotenv import load_dotenv
+    
     try:
         # Verificar si ya hay una app inicializada
         firebase_admin.get_app()
@@ -55,6 +62,26 @@ def initialize_firebase():
     firebase_admin.initialize_app(cred)
     _firebase_initialized = True
 
+
+def _a_firestore(datos):
+    """
+    Convierte los valores Incremento, UnionArreglo, RemoverArreglo y BorrarCampo de
+    persistencia en las transformaciones de Firestore.
+    """
+    from google.cloud.firestore_v1 import DELETE_FIELD, Increment, ArrayUnion, ArrayRemove
+
+    if isinstance(datos, Incremento):
+        return Increment(datos.valor)
+    if isinstance(datos, UnionArreglo):
+        return ArrayUnion(datos.elementos)
+    if isinstance(datos, RemoverArreglo):
+        return ArrayRemove(datos.elementos)
+    if isinstance(datos, BorrarCampo):
+        return DELETE_FIELD
+    if isinstance(datos, dict):
+        return {clave: _a_firestore(valor) for clave, valor in datos.items()}
+    return datos
+
 class Firestore:
     """
     Clase para gestionar operaciones de Firestore de manera asíncrona.
@@ -63,10 +90,10 @@ class Firestore:
     @staticmethod
     async def get_async_client():
         """
-        Obtiene el cliente asíncrono de Firestore.
+        Obtiene el cliente asíncrono de Firestore del bucle de eventos actual
+        (ver ClientesFirestore); se crea una sola vez por bucle.
         """
-        initialize_firebase()
-        return firestore_async.client()
+        return obtener_clientes().obtener()
     
     @staticmethod
     async def add_data(collection_name: str, data: dict) -> str:
@@ -81,8 +108,9 @@ class Firestore:
             str: ID del documento agregado.
         """
         db = await Firestore.get_async_client()
-        doc_ref = await db.collection(collection_name).add(data)
-        return doc_ref[1].id 
+        async with obtener_clientes().rpc():
+            doc_ref = await db.collection(collection_name).add(_a_firestore(data))
+        return doc_ref[1].id
 
     @staticmethod
     async def add_data_with_id(collection_name: str, data: dict, id: str) -> str:
@@ -99,7 +127,8 @@ class Firestore:
         """
         db = await Firestore.get_async_client()
         doc_ref = db.collection(collection_name).document(id)
-        await doc_ref.set(data)
+        async with obtener_clientes().rpc():
+            await doc_ref.set(_a_firestore(data))
         return doc_ref.id
 
     @staticmethod
@@ -116,7 +145,8 @@ class Firestore:
         """
         db = await Firestore.get_async_client()
         doc_ref = db.collection(collection_name).document(id)
-        doc = await doc_ref.get()
+        async with obtener_clientes().rpc():
+            doc = await doc_ref.get()
         return doc.to_dict() if doc.exists else None
 
     @staticmethod
@@ -133,12 +163,90 @@ class Firestore:
         db = await Firestore.get_async_client()
         docs_ref = db.collection(collection_name).stream()
         docs = []
-        async for doc in docs_ref:
-            doc_data = doc.to_dict()
-            doc_data['id'] = doc.id
-            docs.append(doc_data)
+        async with obtener_clientes().rpc():
+            async for doc in docs_ref:
+                doc_data = doc.to_dict()
+                doc_data['id'] = doc.id
+                docs.append(doc_data)
+        return docs
+
+    @staticmethod
+    async def stream_collection(collection_name: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Recorre los documentos de una colección sin cargarlos todos en memoria.
+
+        Args:
+            collection_name (str): Nombre de la colección.
+
+        Yields:
+            Dict[str, Any]: Cada documento con su 'id'.
+        """
+        db = await Firestore.get_async_client()
+        async with obtener_clientes().rpc():
+            async for doc in db.collection(collection_name).stream():
+                doc_data = doc.to_dict()
+                doc_data['id'] = doc.id
+                yield doc_data
+
+    @staticmethod
+    async def query_equal(collection_name: str, field: str, value, limit: int = None) -> List[Dict[str, Any]]:
+        """
+        Obtiene los documentos cuyo campo es igual al valor, filtrando en Firestore.
+
+        Args:
+            collection_name (str): Nombre de la colección.
+            field (str): Campo a comparar.
+            value: Valor buscado.
+            limit (int, optional): Máximo de documentos.
+
+        Returns:
+            List[Dict[str, Any]]: Documentos encontrados, cada uno con su 'id'.
+        """
+        from google.cloud.firestore_v1.base_query import FieldFilter
+
+        db = await Firestore.get_async_client()
+        query = db.collection(collection_name).where(filter=FieldFilter(field, '==', value))
+        if limit is not None:
+            query = query.limit(limit)
+        docs = []
+        async with obtener_clientes().rpc():
+            async for doc in query.stream():
+                doc_data = doc.to_dict()
+                doc_data['id'] = doc.id
+                docs.append(doc_data)
         return docs
         
+    @staticmethod
+    async def query_page(collection_name: str, field: str, limit: int, start_after=None,
+                         descending: bool = True) -> List[Dict[str, Any]]:
+        """
+        Obtiene una página de documentos ordenados por un campo.
+
+        Args:
+            collection_name (str): Nombre de la colección (puede ser una subcolección).
+            field (str): Campo por el que se ordena.
+            limit (int): Máximo de documentos.
+            start_after (optional): Valor del campo en el último documento de la página anterior.
+            descending (bool, optional): Del mayor al menor. Por defecto True.
+
+        Returns:
+            List[Dict[str, Any]]: Documentos de la página, cada uno con su 'id'.
+        """
+        from google.cloud.firestore_v1 import Query
+
+        db = await Firestore.get_async_client()
+        direction = Query.DESCENDING if descending else Query.ASCENDING
+        query = db.collection(collection_name).order_by(field, direction=direction)
+        if start_after is not None:
+            query = query.start_after({field: start_after})
+        docs = []
+        async with obtener_clientes().rpc():
+            async for doc in query.limit(limit).stream():
+                doc_data = doc.to_dict()
+                doc_data['id'] = doc.id
+                docs.append(doc_data)
+        return docs
+
     @staticmethod
     async def update_data(collection_name: str, id: str, data: dict) -> str:
         """
@@ -154,7 +262,8 @@ class Firestore:
         """
         db = await Firestore.get_async_client()
         doc_ref = db.collection(collection_name).document(id)
-        await doc_ref.update(data)
+        async with obtener_clientes().rpc():
+            await doc_ref.update(_a_firestore(data))
         return doc_ref.id
         
     @staticmethod
@@ -171,9 +280,41 @@ class Firestore:
         """        
         db = await Firestore.get_async_client()
         doc_ref = db.collection(collection_name).document(id)
-        await doc_ref.delete()
+        async with obtener_clientes().rpc():
+            await doc_ref.delete()
         return doc_ref.id
 
+    @staticmethod
+    async def batch_write(operations: list) -> None:
+        """
+        Escribe varios documentos con lotes de Firestore (WriteBatch), de a
+        MAXIMO_LOTE escrituras por lote. Cada lote es atómico.
+
+        Args:
+            operations (list): Tuplas (tipo, colección, id, datos) con tipo
+                'crear', 'establecer', 'actualizar' o 'eliminar'.
+
+        Raises:
+            ValueError: Si un tipo de escritura no existe.
+        """
+        db = await Firestore.get_async_client()
+        for inicio in range(0, len(operations), MAXIMO_LOTE):
+            batch = db.batch()
+            for tipo, collection_name, id, data in operations[inicio:inicio + MAXIMO_LOTE]:
+                doc_ref = db.collection(collection_name).document(id)
+                if tipo == CREAR:
+                    batch.create(doc_ref, _a_firestore(data))
+                elif tipo == ESTABLECER:
+                    batch.set(doc_ref, _a_firestore(data))
+                elif tipo == ACTUALIZAR:
+                    batch.update(doc_ref, _a_firestore(data))
+                elif tipo == ELIMINAR:
+                    batch.delete(doc_ref)
+                else:
+                    raise ValueError(f"Tipo de escritura desconocido: {tipo}")
+            async with obtener_clientes().rpc():
+                await batch.commit()
+
     @staticmethod
     def add_realtime_listener(collection_name: str, document_id: str, callback: Callable, error_callback: Callable = None, test: bool = False):
         """
@@ -227,6 +368,7 @@ class Firestore:
                     error_callback(e)
         
         # Usar cliente SÍNCRONO para listeners
+        from firebase_admin import firestore
         db = firestore.client()  # Cliente síncrono para listeners
         doc_ref = db.collection(collection_name).document(document_id)
         
@@ -276,6 +418,7 @@ class Firestore:
                     error_callback(e)
             finally:
                 callback_done.set()        # Crear referencia a la colección
+        from firebase_admin import firestore
         db = firestore.client()
         collection_ref = db.collection(collection_name)
         
@@ -292,57 +435,145 @@ class Firestore:
         # Retornar función para detener el listener
         return col_watch.unsubscribe
 
-# Funciones de ayuda para operaciones de Firestore
+
+_TIPOS_DE_CAMBIO = {'ADDED': 'agregado', 'MODIFIED': 'modificado', 'REMOVED': 'eliminado'}
+
+
+def _cambio_de_firestore(cambio) -> dict:
+    """Convierte un DocumentChange de Firestore al formato de los demás backends."""
+    return {'tipo': _TIPOS_DE_CAMBIO[cambio.type.name], 'id': cambio.document.id}
+
+
+class BackendFirestore(BackendPersistencia):
+    """
+    Backend de persistencia sobre Firestore (ver la clase Firestore).
+    """
+
+    async def agregar(self, coleccion: str, datos: dict) -> str:
+        return await Firestore.add_data(coleccion, datos)
+
+    async def establecer(self, coleccion: str, id: str, datos: dict) -> str:
+        return await Firestore.add_data_with_id(coleccion, datos, id)
+
+    async def obtener(self, coleccion: str, id: str) -> Optional[Dict[str, Any]]:
+        return await Firestore.get_data(coleccion, id)
+
+    async def actualizar(self, coleccion: str, id: str, cambios: dict) -> str:
+        from google.api_core.exceptions import NotFound
+        try:
+            return await Firestore.update_data(coleccion, id, cambios)
+        except NotFound:
+            raise ValueError(f"No existe el documento {coleccion}/{id}")
+
+    async def eliminar(self, coleccion: str, id: str) -> str:
+        return await Firestore.delete_data(coleccion, id)
+
+    async def escribir_lote(self, operaciones: list) -> None:
+        from google.api_core.exceptions import AlreadyExists, NotFound
+        try:
+            await Firestore.batch_write(operaciones)
+        except AlreadyExists as e:
+            raise DocumentoExistente(f"Ya existe un documento del lote: {e}")
+        except NotFound as e:
+            raise ValueError(f"No existe un documento del lote: {e}")
+
+    def transmitir(self, coleccion: str) -> AsyncIterator[Dict[str, Any]]:
+        return Firestore.stream_collection(coleccion)
+
+    async def listar(self, coleccion: str) -> list:
+        return await Firestore.get_collection_data(coleccion)
+
+    async def consultar(self, coleccion: str, campo: str, valor, limite: int = None) -> list:
+        return await Firestore.query_equal(coleccion, campo, valor, limite)
+
+    async def paginar(self, coleccion: str, campo: str, limite: int, despues_de=None,
+                      descendente: bool = True) -> list:
+        return await Firestore.query_page(coleccion, campo, limite, despues_de, descendente)
+
+    def escuchar_documento(self, coleccion: str, id: str, callback: Callable, error_callback: Callable = None) -> Callable:
+        return Firestore.add_realtime_listener(coleccion, id, callback, error_callback)
+
+    def escuchar_coleccion(self, coleccion: str, callback: Callable, filtro: dict = None,
+                           error_callback: Callable = None) -> Callable:
+        def al_cambiar(documentos, cambios, momento):
+            callback(documentos, [_cambio_de_firestore(cambio) for cambio in cambios], momento)
+
+        return Firestore.add_collection_listener(coleccion, al_cambiar, filtro, error_callback)
+
+    async def cerrar(self) -> None:
+        await obtener_clientes().cerrar()
+
+# Funciones de ayuda para operaciones de Firestore; cada backend las interpreta
 def increment(num: float):
     """Incrementa un valor numérico en Firestore."""
-    return Increment(num)
+    return Incremento(num)
 
 def decrement(num: float):
     """Decrementa un valor numérico en Firestore."""
-    return Increment(-num)
+    return Incremento(-num)
 
 def array_union(array: list):
     """Añade elementos a un array sin duplicados."""
-    return ArrayUnion(array)
+    return UnionArreglo(array)
 
 def array_remove(array: list):
     """Remueve elementos de un array."""
-    return ArrayRemove(array)
+    return RemoverArreglo(array)
 
-# Funciones globales para mantener compatibilidad con código existente
+def delete_field():
+    """Quita un campo del documento al actualizarlo."""
+    return BorrarCampo()
+
+# Funciones globales para mantener compatibilidad con código existente.
+# Usan el backend configurado (Firestore por defecto, ver utils.persistencia)
 async def get_async_firestore_client():
     """Obtiene el cliente asíncrono de Firestore."""
     return await Firestore.get_async_client()
 
 async def add_data(collection_name: str, data: dict) -> str:
     """Agrega un documento a una colección."""
-    return await Firestore.add_data(collection_name, data)
+    return await obtener_backend().agregar(collection_name, data)
 
 async def add_data_with_id(collection_name: str, data: dict, id: str) -> str:
     """Agrega un documento con ID específico."""
-    return await Firestore.add_data_with_id(collection_name, data, id)
+    return await obtener_backend().establecer(collection_name, id, data)
 
 async def get_data(collection_name: str, id: str) -> Optional[Dict[str, Any]]:
     """Obtiene un documento por ID."""
-    return await Firestore.get_data(collection_name, id)
+    return await obtener_backend().obtener(collection_name, id)
 
 async def get_collection_data(collection_name: str) -> List[Optional[Dict[str, Any]]]:
     """Obtiene todos los documentos de una colección."""
-    return await Firestore.get_collection_data(collection_name)
+    return await obtener_backend().listar(collection_name)
+
+async def query_equal(collection_name: str, field: str, value, limit: int = None) -> List[Dict[str, Any]]:
+    """Obtiene los documentos cuyo campo es igual al valor."""
+    return await obtener_backend().consultar(collection_name, field, value, limit)
+
+async def query_page(collection_name: str, field: str, limit: int, start_after=None,
+                     descending: bool = True) -> List[Dict[str, Any]]:
+    """Obtiene una página de documentos ordenados por un campo."""
+    return await obtener_backend().paginar(collection_name, field, limit, start_after, descending)
 
 async def update_data(collection_name: str, id: str, data: dict) -> str:
     """Actualiza un documento."""
-    return await Firestore.update_data(collection_name, id, data)
+    return await obtener_backend().actualizar(collection_name, id, data)
 
 async def delete_data(collection_name: str, id: str) -> str:
     """Elimina un documento."""
-    return await Firestore.delete_data(collection_name, id)
+    return await obtener_backend().eliminar(collection_name, id)
+
+async def batch_write(operations: list) -> None:
+    """Aplica varias escrituras (tipo, colección, id, datos) en lotes."""
+    return await obtener_backend().escribir_lote(operations)
 
 # Funciones de listener en tiempo real
 def add_realtime_listener(collection_name: str, document_id: str, callback: Callable, error_callback: Callable = None, test: bool = False):
     """Agrega un listener en tiempo real para un documento."""
-    return Firestore.add_realtime_listener(collection_name, document_id, callback, error_callback, test)
+    if test:
+        return Firestore.add_realtime_listener(collection_name, document_id, callback, error_callback, test)
+    return obtener_backend().escuchar_documento(collection_name, document_id, callback, error_callback)
 
 def add_collection_listener(collection_name: str, callback: Callable, query_filter: Dict = None, error_callback: Callable = None ):
     """Agrega un listener en tiempo real para una colección."""
-    return Firestore.add_collection_listener(collection_name, callback, query_filter, error_callback)
+    return obtener_backend().escuchar_coleccion(collection_name, callback, query_filter, error_callback)
@@ -0,0 +1,115 @@
+"""
+Backends de persistencia intercambiables para los servicios del casino.
+
+Las funciones de ``utils.firestore`` (``add_data``, ``get_data``, ...) usan el
+backend de ``obtener_backend()``, que se elige con ``configurar_backend`` o con
+la variable de entorno ``CASINO_PERSISTENCIA``:
+
+- ``firestore`` (por defecto): Firebase, importado solo cuando se usa
+- ``memoria``: en memoria del proceso, para jugar y probar sin conexión
+- ``sqlite``: archivo local (``CASINO_SQLITE_RUTA``, por defecto en la caché en disco)
+"""
+
+import os
+import threading
+
+from .base import (
+    ACTUALIZAR,
+    CREAR,
+    ELIMINAR,
+    ESTABLECER,
+    MAXIMO_LOTE,
+    BackendPersistencia,
+    BorrarCampo,
+    DocumentoExistente,
+    Incremento,
+    UnionArreglo,
+    RemoverArreglo,
+    aplicar_cambios
+)
+from .memoria import BackendMemoria
+from .sqlite import BackendSQLite
+
+FIRESTORE = 'firestore'
+MEMORIA = 'memoria'
+SQLITE = 'sqlite'
+BACKENDS = (FIRESTORE, MEMORIA, SQLITE)
+
+_backend = None
+_lock = threading.Lock()
+
+
+def crear_backend(nombre: str, **opciones) -> BackendPersistencia:
+    """
+    Crea un backend por nombre: 'firestore', 'memoria' o 'sqlite'.
+
+    Args:
+        nombre (str): Nombre del backend
+        **opciones: Argumentos del constructor (por ejemplo, ``ruta`` de SQLite)
+
+    Raises:
+        ValueError: Si el backend no existe
+    """
+    if nombre == FIRESTORE:
+        from ..firestore import BackendFirestore
+        return BackendFirestore(**opciones)
+    if nombre == MEMORIA:
+        return BackendMemoria(**opciones)
+    if nombre == SQLITE:
+        if 'ruta' not in opciones:
+            from ..cache_disco import directorio_cache
+            opciones['ruta'] = os.getenv('CASINO_SQLITE_RUTA') or os.path.join(directorio_cache(), 'casino.sqlite3')
+        return BackendSQLite(**opciones)
+    raise ValueError(f"Backend de persistencia desconocido: {nombre}. Opciones: {', '.join(BACKENDS)}")
+
+
+def configurar_backend(backend, **opciones) -> BackendPersistencia:
+    """
+    Cambia el backend que usan los servicios en este proceso.
+
+    Args:
+        backend (str | BackendPersistencia): Nombre del backend o una instancia
+        **opciones: Argumentos del constructor si se da un nombre
+
+    Returns:
+        BackendPersistencia: El backend configurado
+    """
+    global _backend
+    if isinstance(backend, str):
+        backend = crear_backend(backend, **opciones)
+    with _lock:
+        _backend = backend
+    return backend
+
+
+def obtener_backend() -> BackendPersistencia:
+    """
+    Retorna el backend del proceso; la primera vez lo crea según CASINO_PERSISTENCIA.
+    """
+    global _backend
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                _backend = crear_backend(os.getenv('CASINO_PERSISTENCIA', FIRESTORE).strip().lower())
+    return _backend
+
+
+__all__ = [
+    'ACTUALIZAR',
+    'CREAR',
+    'ELIMINAR',
+    'ESTABLECER',
+    'MAXIMO_LOTE',
+    'BackendPersistencia',
+    'BorrarCampo',
+    'DocumentoExistente',
+    'BackendMemoria',
+    'BackendSQLite',
+    'Incremento',
+    'UnionArreglo',
+    'RemoverArreglo',
+    'aplicar_cambios',
+    'crear_backend',
+    'configurar_backend',
+    'obtener_backend'
+]
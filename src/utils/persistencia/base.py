@@ -0,0 +1,397 @@
+"""
+Interfaz común de los backends de persistencia.
+
+Los servicios trabajan con documentos (``dict``) agrupados en colecciones, con
+la misma semántica que Firestore: ``set`` reemplaza el documento, ``update``
+solo cambia los campos indicados (admite rutas con puntos, como ``'a.b'``) y
+falla si el documento no existe, y los valores ``Incremento``, ``UnionArreglo``
+y ``RemoverArreglo`` transforman el valor guardado en lugar de reemplazarlo
+(``BorrarCampo`` lo quita). Una subcolección es una colección con ruta
+``'coleccion/<id>/subcoleccion'``.
+"""
+
+import copy
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import AsyncIterator, Callable
+
+
+class Incremento:
+    """Suma ``valor`` al campo (un campo inexistente cuenta como 0)."""
+    __slots__ = ('valor',)
+
+    def __init__(self, valor: float):
+        self.valor = valor
+
+    def __repr__(self) -> str:
+        return f"Incremento({self.valor!r})"
+
+
+class UnionArreglo:
+    """Agrega al arreglo los elementos que todavía no tiene."""
+    __slots__ = ('elementos',)
+
+    def __init__(self, elementos: list):
+        self.elementos = list(elementos)
+
+    def __repr__(self) -> str:
+        return f"UnionArreglo({self.elementos!r})"
+
+
+class RemoverArreglo:
+    """Quita del arreglo todas las apariciones de los elementos."""
+    __slots__ = ('elementos',)
+
+    def __init__(self, elementos: list):
+        self.elementos = list(elementos)
+
+    def __repr__(self) -> str:
+        return f"RemoverArreglo({self.elementos!r})"
+
+
+class BorrarCampo:
+    """Quita el campo del documento en un ``update``."""
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "BorrarCampo()"
+
+
+def _transformar(actual, valor):
+    if isinstance(valor, Incremento):
+        return (actual if isinstance(actual, (int, float)) and not isinstance(actual, bool) else 0) + valor.valor
+    if isinstance(valor, UnionArreglo):
+        resultado = list(actual) if isinstance(actual, list) else []
+        for elemento in valor.elementos:
+            if elemento not in resultado:
+                resultado.append(copy.deepcopy(elemento))
+        return resultado
+    if isinstance(valor, RemoverArreglo):
+        if not isinstance(actual, list):
+            return []
+        return [elemento for elemento in actual if elemento not in valor.elementos]
+    if isinstance(valor, dict):
+        # Un mapa nuevo reemplaza al anterior, pero sus valores también pueden ser transformaciones
+        return {clave: _transformar(None, v) for clave, v in valor.items()}
+    return copy.deepcopy(valor)
+
+
+def aplicar_cambios(documento: dict, cambios: dict) -> dict:
+    """
+    Aplica los cambios de un ``update`` sobre una copia del documento.
+
+    Args:
+        documento (dict): Documento actual
+        cambios (dict): Campos a cambiar; las claves con puntos son rutas anidadas
+
+    Returns:
+        dict: El documento nuevo
+    """
+    resultado = copy.deepcopy(documento)
+    for ruta, valor in cambios.items():
+        *padres, campo = ruta.split('.')
+        destino = resultado
+        for parte in padres:
+            if not isinstance(destino.get(parte), dict):
+                destino[parte] = {}
+            destino = destino[parte]
+        if isinstance(valor, BorrarCampo):
+            destino.pop(campo, None)
+        else:
+            destino[campo] = _transformar(destino.get(campo), valor)
+    return resultado
+
+
+def nuevo_documento(datos: dict) -> dict:
+    """Documento que guarda un ``set``: los datos con sus transformaciones aplicadas."""
+    return {campo: _transformar(None, valor) for campo, valor in datos.items() if not isinstance(valor, BorrarCampo)}
+
+
+# Máximo de escrituras por lote en Firestore; los backends lo usan para partir lotes grandes
+MAXIMO_LOTE = 500
+
+CREAR = 'crear'
+ESTABLECER = 'establecer'
+ACTUALIZAR = 'actualizar'
+ELIMINAR = 'eliminar'
+
+
+class DocumentoExistente(ValueError):
+    """Se intentó crear un documento que ya existe."""
+
+
+def preparar_lote(operaciones: list, leer: Callable) -> tuple:
+    """
+    Calcula el resultado de un lote sin escribirlo, para aplicarlo todo junto.
+
+    Args:
+        operaciones (list): Tuplas ``(tipo, coleccion, id, datos)``
+        leer (Callable): ``leer(coleccion, id)`` retorna el documento guardado o None
+
+    Returns:
+        tuple: ``(documentos, eventos)``: el documento final de cada ``(coleccion, id)``
+        (None si se elimina) y los eventos ``(coleccion, id, tipo, documento)`` en orden
+
+    Raises:
+        DocumentoExistente: Si se crea un documento que ya existe
+        ValueError: Si un tipo no existe o se actualiza un documento inexistente
+    """
+    documentos = {}
+    eventos = []
+    for tipo, coleccion, id, datos in operaciones:
+        clave = (coleccion, id)
+        actual = documentos[clave] if clave in documentos else leer(coleccion, id)
+        if tipo == CREAR:
+            if actual is not None:
+                raise DocumentoExistente(f"Ya existe el documento {coleccion}/{id}")
+            documento = nuevo_documento(datos)
+            eventos.append((coleccion, id, 'agregado', documento))
+        elif tipo == ESTABLECER:
+            documento = nuevo_documento(datos)
+            eventos.append((coleccion, id, 'modificado' if actual is not None else 'agregado', documento))
+        elif tipo == ACTUALIZAR:
+            if actual is None:
+                raise ValueError(f"No existe el documento {coleccion}/{id}")
+            documento = aplicar_cambios(actual, datos)
+            eventos.append((coleccion, id, 'modificado', documento))
+        elif tipo == ELIMINAR:
+            documento = None
+            if actual is not None:
+                eventos.append((coleccion, id, 'eliminado', None))
+        else:
+            raise ValueError(f"Tipo de escritura desconocido: {tipo}")
+        documentos[clave] = documento
+    return documentos, eventos
+
+
+def nuevo_id() -> str:
+    """Id aleatorio de documento, de 20 caracteres como los de Firestore."""
+    return uuid.uuid4().hex[:20]
+
+
+class BackendPersistencia(ABC):
+    """
+    Almacén de documentos asíncrono que usan los servicios del casino.
+    """
+
+    @abstractmethod
+    async def agregar(self, coleccion: str, datos: dict) -> str:
+        """
+        Agrega un documento con un id nuevo.
+
+        Returns:
+            str: El id del documento
+        """
+        pass
+
+    @abstractmethod
+    async def establecer(self, coleccion: str, id: str, datos: dict) -> str:
+        """
+        Crea o reemplaza el documento con ese id.
+
+        Returns:
+            str: El id del documento
+        """
+        pass
+
+    @abstractmethod
+    async def obtener(self, coleccion: str, id: str) -> dict | None:
+        """
+        Returns:
+            dict | None: Los datos del documento o None si no existe
+        """
+        pass
+
+    @abstractmethod
+    async def actualizar(self, coleccion: str, id: str, cambios: dict) -> str:
+        """
+        Cambia solo los campos indicados del documento.
+
+        Returns:
+            str: El id del documento
+
+        Raises:
+            ValueError: Si el documento no existe
+        """
+        pass
+
+    @abstractmethod
+    async def eliminar(self, coleccion: str, id: str) -> str:
+        """
+        Elimina el documento; no falla si no existe.
+
+        Returns:
+            str: El id del documento
+        """
+        pass
+
+    @abstractmethod
+    def transmitir(self, coleccion: str) -> AsyncIterator[dict]:
+        """
+        Recorre los documentos de la colección, cada uno con su ``'id'``.
+        """
+        pass
+
+    async def escribir_lote(self, operaciones: list) -> None:
+        """
+        Aplica varias escrituras con la menor cantidad de viajes posible.
+
+        Cada operación es una tupla ``(tipo, coleccion, id, datos)`` con tipo
+        ``'crear'`` (falla si el documento existe), ``'establecer'``,
+        ``'actualizar'`` o ``'eliminar'`` (en este último ``datos`` se ignora).
+        Los backends locales aplican el lote completo o nada; Firestore lo parte
+        en lotes atómicos de MAXIMO_LOTE escrituras.
+
+        Raises:
+            DocumentoExistente: Si se crea un documento que ya existe
+            ValueError: Si un tipo no existe o se actualiza un documento inexistente
+        """
+        for tipo, coleccion, id, datos in operaciones:
+            if tipo == CREAR:
+                if await self.obtener(coleccion, id) is not None:
+                    raise DocumentoExistente(f"Ya existe el documento {coleccion}/{id}")
+                await self.establecer(coleccion, id, datos)
+            elif tipo == ESTABLECER:
+                await self.establecer(coleccion, id, datos)
+            elif tipo == ACTUALIZAR:
+                await self.actualizar(coleccion, id, datos)
+            elif tipo == ELIMINAR:
+                await self.eliminar(coleccion, id)
+            else:
+                raise ValueError(f"Tipo de escritura desconocido: {tipo}")
+
+    async def paginar(self, coleccion: str, campo: str, limite: int, despues_de=None,
+                      descendente: bool = True) -> list:
+        """
+        Retorna una página de documentos ordenados por un campo, cada uno con su
+        ``'id'``. Los documentos sin ese campo no aparecen.
+
+        Args:
+            coleccion (str): Colección
+            campo (str): Campo por el que se ordena
+            limite (int): Máximo de documentos
+            despues_de (optional): Valor del campo en el último documento de la
+                página anterior (el cursor); None para la primera página
+            descendente (bool, optional): Del mayor al menor. Por defecto True
+        """
+        documentos = [documento async for documento in self.transmitir(coleccion) if campo in documento]
+        documentos.sort(key=lambda documento: documento[campo], reverse=descendente)
+        if despues_de is not None:
+            documentos = [
+                documento for documento in documentos
+                if (documento[campo] < despues_de if descendente else documento[campo] > despues_de)
+            ]
+        return documentos[:limite]
+
+    async def listar(self, coleccion: str) -> list:
+        """Retorna todos los documentos de la colección, cada uno con su ``'id'``."""
+        return [documento async for documento in self.transmitir(coleccion)]
+
+    async def consultar(self, coleccion: str, campo: str, valor, limite: int = None) -> list:
+        """
+        Retorna los documentos cuyo campo es igual al valor, cada uno con su ``'id'``.
+        """
+        resultado = []
+        async for documento in self.transmitir(coleccion):
+            if documento.get(campo) == valor:
+                resultado.append(documento)
+                if limite is not None and len(resultado) >= limite:
+                    break
+        return resultado
+
+    @abstractmethod
+    def escuchar_documento(self, coleccion: str, id: str, callback: Callable, error_callback: Callable = None) -> Callable:
+        """
+        Llama ``callback(datos, cambios, momento)`` ahora y cada vez que cambia el
+        documento (``datos`` es None si no existe).
+
+        Returns:
+            Callable: Función para dejar de escuchar
+        """
+        pass
+
+    @abstractmethod
+    def escuchar_coleccion(self, coleccion: str, callback: Callable, filtro: dict = None,
+                           error_callback: Callable = None) -> Callable:
+        """
+        Llama ``callback(documentos, cambios, momento)`` ahora y cada vez que cambia
+        algún documento de la colección que cumple el filtro de igualdad.
+
+        Returns:
+            Callable: Función para dejar de escuchar
+        """
+        pass
+
+    async def cerrar(self) -> None:
+        """Libera los recursos del backend."""
+        pass
+
+
+class _Oyentes:
+    # Oyentes en el mismo proceso de los backends locales (memoria y SQLite)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._documentos = {}
+        self._colecciones = {}
+
+    def agregar_documento(self, coleccion: str, id: str, oyente: tuple) -> Callable:
+        with self._lock:
+            self._documentos.setdefault((coleccion, id), []).append(oyente)
+
+        def detener():
+            with self._lock:
+                oyentes = self._documentos.get((coleccion, id), [])
+                if oyente in oyentes:
+                    oyentes.remove(oyente)
+        return detener
+
+    def agregar_coleccion(self, coleccion: str, oyente: tuple) -> Callable:
+        with self._lock:
+            self._colecciones.setdefault(coleccion, []).append(oyente)
+
+        def detener():
+            with self._lock:
+                oyentes = self._colecciones.get(coleccion, [])
+                if oyente in oyentes:
+                    oyentes.remove(oyente)
+        return detener
+
+    def hay_oyentes(self, coleccion: str, id: str) -> bool:
+        return bool(self._documentos.get((coleccion, id)) or self._colecciones.get(coleccion))
+
+    def notificar(self, coleccion: str, id: str, tipo: str, datos, documentos_de: Callable) -> None:
+        """
+        Avisa del cambio de un documento. ``documentos_de(filtro)`` retorna los
+        documentos actuales de la colección para los oyentes de colección.
+        """
+        with self._lock:
+            de_documento = list(self._documentos.get((coleccion, id), []))
+            de_coleccion = list(self._colecciones.get(coleccion, []))
+        momento = ahora()
+        cambios = [{'tipo': tipo, 'id': id}]
+        for callback, error_callback in de_documento:
+            llamar_oyente(callback, error_callback, copy.deepcopy(datos), cambios, momento)
+        for callback, error_callback, filtro in de_coleccion:
+            if tipo == 'agregado' and not cumple_filtro(datos, filtro):
+                continue
+            llamar_oyente(callback, error_callback, documentos_de(filtro), cambios, momento)
+
+
+def ahora() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def llamar_oyente(callback: Callable, error_callback: Callable, datos, cambios: list, momento) -> None:
+    try:
+        callback(datos, cambios, momento)
+    except Exception as e:
+        print(f"❌ Error en listener: {e}")
+        if error_callback:
+            error_callback(e)
+
+
+def cumple_filtro(documento: dict, filtro: dict) -> bool:
+    return not filtro or all(documento.get(campo) == valor for campo, valor in filtro.items())
@@ -0,0 +1,109 @@
+import copy
+import threading
+from typing import AsyncIterator, Callable
+
+from .base import (
+    BackendPersistencia, _Oyentes, ahora, aplicar_cambios, cumple_filtro, llamar_oyente, nuevo_documento, nuevo_id,
+    preparar_lote
+)
+
+
+class BackendMemoria(BackendPersistencia):
+    """
+    Backend en memoria del proceso, con la semántica de Firestore. Sirve para
+    jugar y hacer pruebas de carga sin conexión; los datos se pierden al salir.
+
+    Los documentos se copian al guardar y al leer, como si viajaran por la red,
+    así que modificar un dict leído no cambia lo guardado. Los oyentes se llaman
+    en el mismo hilo que hizo la escritura.
+    """
+
+    def __init__(self):
+        self._colecciones = {}
+        self._lock = threading.Lock()
+        self._oyentes = _Oyentes()
+
+    def _con_id(self, id: str, documento: dict) -> dict:
+        datos = copy.deepcopy(documento)
+        datos['id'] = id
+        return datos
+
+    def _documentos_de(self, coleccion: str, filtro: dict = None) -> list:
+        with self._lock:
+            documentos = list(self._colecciones.get(coleccion, {}).items())
+        return [self._con_id(id, documento) for id, documento in documentos if cumple_filtro(documento, filtro)]
+
+    def _notificar(self, coleccion: str, id: str, tipo: str, documento: dict | None) -> None:
+        if self._oyentes.hay_oyentes(coleccion, id):
+            datos = self._con_id(id, documento) if documento is not None else None
+            self._oyentes.notificar(coleccion, id, tipo, datos, lambda filtro: self._documentos_de(coleccion, filtro))
+
+    async def agregar(self, coleccion: str, datos: dict) -> str:
+        id = nuevo_id()
+        return await self.establecer(coleccion, id, datos)
+
+    async def establecer(self, coleccion: str, id: str, datos: dict) -> str:
+        documento = nuevo_documento(datos)
+        with self._lock:
+            documentos = self._colecciones.setdefault(coleccion, {})
+            tipo = 'modificado' if id in documentos else 'agregado'
+            documentos[id] = documento
+        self._notificar(coleccion, id, tipo, documento)
+        return id
+
+    async def obtener(self, coleccion: str, id: str) -> dict | None:
+        with self._lock:
+            documento = self._colecciones.get(coleccion, {}).get(id)
+            return copy.deepcopy(documento) if documento is not None else None
+
+    async def actualizar(self, coleccion: str, id: str, cambios: dict) -> str:
+        with self._lock:
+            documentos = self._colecciones.get(coleccion, {})
+            if id not in documentos:
+                raise ValueError(f"No existe el documento {coleccion}/{id}")
+            documento = aplicar_cambios(documentos[id], cambios)
+            documentos[id] = documento
+        self._notificar(coleccion, id, 'modificado', documento)
+        return id
+
+    async def eliminar(self, coleccion: str, id: str) -> str:
+        with self._lock:
+            existia = self._colecciones.get(coleccion, {}).pop(id, None) is not None
+        if existia:
+            self._notificar(coleccion, id, 'eliminado', None)
+        return id
+
+    async def escribir_lote(self, operaciones: list) -> None:
+        with self._lock:
+            documentos, eventos = preparar_lote(
+                operaciones, lambda coleccion, id: self._colecciones.get(coleccion, {}).get(id)
+            )
+            for (coleccion, id), documento in documentos.items():
+                if documento is None:
+                    self._colecciones.get(coleccion, {}).pop(id, None)
+                else:
+                    self._colecciones.setdefault(coleccion, {})[id] = documento
+        for evento in eventos:
+            self._notificar(*evento)
+
+    async def transmitir(self, coleccion: str) -> AsyncIterator[dict]:
+        for documento in self._documentos_de(coleccion):
+            yield documento
+
+    async def consultar(self, coleccion: str, campo: str, valor, limite: int = None) -> list:
+        documentos = self._documentos_de(coleccion, {campo: valor})
+        return documentos if limite is None else documentos[:limite]
+
+    def escuchar_documento(self, coleccion: str, id: str, callback: Callable, error_callback: Callable = None) -> Callable:
+        detener = self._oyentes.agregar_documento(coleccion, id, (callback, error_callback))
+        with self._lock:
+            documento = self._colecciones.get(coleccion, {}).get(id)
+            datos = self._con_id(id, documento) if documento is not None else None
+        llamar_oyente(callback, error_callback, datos, [], ahora())
+        return detener
+
+    def escuchar_coleccion(self, coleccion: str, callback: Callable, filtro: dict = None,
+                           error_callback: Callable = None) -> Callable:
+        detener = self._oyentes.agregar_coleccion(coleccion, (callback, error_callback, filtro))
+        llamar_oyente(callback, error_callback, self._documentos_de(coleccion, filtro), [], ahora())
+        return detener
@@ -0,0 +1,221 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import AsyncIterator, Callable
+
+from .base import (
+    BackendPersistencia, _Oyentes, ahora, aplicar_cambios, cumple_filtro, llamar_oyente, nuevo_documento, nuevo_id,
+    preparar_lote
+)
+
+
+def _codificar(valor):
+    # JSON no tiene fechas: se guardan como {'__fecha__': iso}
+    if isinstance(valor, datetime):
+        return {'__fecha__': valor.isoformat()}
+    raise TypeError(f"Valor no serializable: {type(valor).__name__}")
+
+
+def _decodificar(objeto: dict):
+    if len(objeto) == 1 and '__fecha__' in objeto:
+        return datetime.fromisoformat(objeto['__fecha__'])
+    return objeto
+
+
+def _a_texto(documento: dict) -> str:
+    return json.dumps(documento, default=_codificar, ensure_ascii=False, separators=(',', ':'))
+
+
+def _de_texto(texto: str) -> dict:
+    return json.loads(texto, object_hook=_decodificar)
+
+
+class BackendSQLite(BackendPersistencia):
+    """
+    Backend en un archivo SQLite local, con la semántica de Firestore.
+
+    Cada documento se guarda como JSON en una fila ``(coleccion, id)``. Las
+    actualizaciones leen y escriben el documento dentro de una transacción
+    ``BEGIN IMMEDIATE``, así que los incrementos y uniones de arreglos son
+    atómicos aunque varios procesos usen el mismo archivo. Las operaciones son
+    locales y cortas, por lo que se ejecutan directamente en el bucle de eventos.
+    Los oyentes solo ven las escrituras de este proceso.
+    """
+
+    def __init__(self, ruta: str = ':memory:'):
+        """
+        Args:
+            ruta (str, optional): Archivo de la base de datos. Por defecto en memoria
+        """
+        if ruta != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+        self._ruta = ruta
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False, isolation_level=None)
+        self._conexion.execute('PRAGMA journal_mode=WAL')
+        self._conexion.execute('PRAGMA synchronous=NORMAL')
+        self._conexion.execute(
+            'CREATE TABLE IF NOT EXISTS documentos ('
+            'coleccion TEXT NOT NULL, id TEXT NOT NULL, datos TEXT NOT NULL, '
+            'PRIMARY KEY (coleccion, id)) WITHOUT ROWID'
+        )
+        self._lock = threading.RLock()
+        self._oyentes = _Oyentes()
+
+    def get_ruta(self) -> str:
+        return self._ruta
+
+    def _leer(self, coleccion: str, id: str) -> dict | None:
+        fila = self._conexion.execute(
+            'SELECT datos FROM documentos WHERE coleccion = ? AND id = ?', (coleccion, id)
+        ).fetchone()
+        return _de_texto(fila[0]) if fila else None
+
+    def _escribir(self, coleccion: str, id: str, documento: dict) -> None:
+        self._conexion.execute(
+            'INSERT OR REPLACE INTO documentos (coleccion, id, datos) VALUES (?, ?, ?)',
+            (coleccion, id, _a_texto(documento))
+        )
+
+    def _documentos_de(self, coleccion: str, filtro: dict = None) -> list:
+        with self._lock:
+            filas = self._conexion.execute(
+                'SELECT id, datos FROM documentos WHERE coleccion = ? ORDER BY id', (coleccion,)
+            ).fetchall()
+        documentos = []
+        for id, texto in filas:
+            documento = _de_texto(texto)
+            if cumple_filtro(documento, filtro):
+                documento['id'] = id
+                documentos.append(documento)
+        return documentos
+
+    def _notificar(self, coleccion: str, id: str, tipo: str, documento: dict | None) -> None:
+        if self._oyentes.hay_oyentes(coleccion, id):
+            datos = dict(documento, id=id) if documento is not None else None
+            self._oyentes.notificar(coleccion, id, tipo, datos, lambda filtro: self._documentos_de(coleccion, filtro))
+
+    async def agregar(self, coleccion: str, datos: dict) -> str:
+        return await self.establecer(coleccion, nuevo_id(), datos)
+
+    async def establecer(self, coleccion: str, id: str, datos: dict) -> str:
+        documento = nuevo_documento(datos)
+        with self._lock:
+            self._conexion.execute('BEGIN IMMEDIATE')
+            try:
+                existia = self._leer(coleccion, id) is not None
+                self._escribir(coleccion, id, documento)
+                self._conexion.execute('COMMIT')
+            except BaseException:
+                self._conexion.execute('ROLLBACK')
+                raise
+        self._notificar(coleccion, id, 'modificado' if existia else 'agregado', documento)
+        return id
+
+    async def obtener(self, coleccion: str, id: str) -> dict | None:
+        with self._lock:
+            return self._leer(coleccion, id)
+
+    async def actualizar(self, coleccion: str, id: str, cambios: dict) -> str:
+        with self._lock:
+            self._conexion.execute('BEGIN IMMEDIATE')
+            try:
+                actual = self._leer(coleccion, id)
+                if actual is None:
+                    raise ValueError(f"No existe el documento {coleccion}/{id}")
+                documento = aplicar_cambios(actual, cambios)
+                self._escribir(coleccion, id, documento)
+                self._conexion.execute('COMMIT')
+            except BaseException:
+                self._conexion.execute('ROLLBACK')
+                raise
+        self._notificar(coleccion, id, 'modificado', documento)
+        return id
+
+    async def eliminar(self, coleccion: str, id: str) -> str:
+        with self._lock:
+            cursor = self._conexion.execute('DELETE FROM documentos WHERE coleccion = ? AND id = ?', (coleccion, id))
+        if cursor.rowcount:
+            self._notificar(coleccion, id, 'eliminado', None)
+        return id
+
+    async def escribir_lote(self, operaciones: list) -> None:
+        with self._lock:
+            self._conexion.execute('BEGIN IMMEDIATE')
+            try:
+                documentos, eventos = preparar_lote(operaciones, self._leer)
+                for (coleccion, id), documento in documentos.items():
+                    if documento is None:
+                        self._conexion.execute(
+                            'DELETE FROM documentos WHERE coleccion = ? AND id = ?', (coleccion, id)
+                        )
+                    else:
+                        self._escribir(coleccion, id, documento)
+                self._conexion.execute('COMMIT')
+            except BaseException:
+                self._conexion.execute('ROLLBACK')
+                raise
+        for evento in eventos:
+            self._notificar(*evento)
+
+    async def transmitir(self, coleccion: str) -> AsyncIterator[dict]:
+        for documento in self._documentos_de(coleccion):
+            yield documento
+
+    async def consultar(self, coleccion: str, campo: str, valor, limite: int = None) -> list:
+        # El filtro de igualdad se evalúa en SQLite sobre el JSON
+        if '.' in campo or not isinstance(valor, (str, int, float, bool)):
+            return await super().consultar(coleccion, campo, valor, limite)
+        # json_extract da 1/0 para true/false: el tipo JSON distingue booleanos de números
+        if isinstance(valor, bool):
+            tipos = ('true',) if valor else ('false',)
+        elif isinstance(valor, str):
+            tipos = ('text',)
+        else:
+            tipos = ('integer', 'real')
+        ruta = '$."' + campo.replace('"', '""') + '"'
+        consulta = (
+            'SELECT id, datos FROM documentos WHERE coleccion = ? AND json_extract(datos, ?) = ? '
+            f'AND json_type(datos, ?) IN ({", ".join("?" for _ in tipos)}) ORDER BY id'
+        )
+        parametros = [coleccion, ruta, valor, ruta, *tipos]
+        if limite is not None:
+            consulta += ' LIMIT ?'
+            parametros.append(limite)
+        with self._lock:
+            filas = self._conexion.execute(consulta, parametros).fetchall()
+        return [dict(_de_texto(texto), id=id) for id, texto in filas]
+
+    async def paginar(self, coleccion: str, campo: str, limite: int, despues_de=None,
+                      descendente: bool = True) -> list:
+        if '.' in campo:
+            return await super().paginar(coleccion, campo, limite, despues_de, descendente)
+        ruta = '$."' + campo.replace('"', '""') + '"'
+        consulta = 'SELECT id, datos FROM documentos WHERE coleccion = ? AND json_type(datos, ?) IS NOT NULL'
+        parametros = [coleccion, ruta]
+        if despues_de is not None:
+            consulta += f" AND json_extract(datos, ?) {'<' if descendente else '>'} ?"
+            parametros += [ruta, despues_de]
+        consulta += f" ORDER BY json_extract(datos, ?) {'DESC' if descendente else 'ASC'} LIMIT ?"
+        parametros += [ruta, limite]
+        with self._lock:
+            filas = self._conexion.execute(consulta, parametros).fetchall()
+        return [dict(_de_texto(texto), id=id) for id, texto in filas]
+
+    def escuchar_documento(self, coleccion: str, id: str, callback: Callable, error_callback: Callable = None) -> Callable:
+        detener = self._oyentes.agregar_documento(coleccion, id, (callback, error_callback))
+        with self._lock:
+            documento = self._leer(coleccion, id)
+        llamar_oyente(callback, error_callback, dict(documento, id=id) if documento is not None else None, [], ahora())
+        return detener
+
+    def escuchar_coleccion(self, coleccion: str, callback: Callable, filtro: dict = None,
+                           error_callback: Callable = None) -> Callable:
+        detener = self._oyentes.agregar_coleccion(coleccion, (callback, error_callback, filtro))
+        llamar_oyente(callback, error_callback, self._documentos_de(coleccion, filtro), [], ahora())
+        return detener
+
+    async def cerrar(self) -> None:
+        with self._lock:
+            self._conexion.close()
@@ -0,0 +1,14 @@
+import importlib.util
+import os
+import sys
+
+# El código importa el paquete como 'servidor' (la carpeta del repositorio dentro del proyecto)
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if 'servidor' not in sys.modules:
+    especificacion = importlib.util.spec_from_file_location(
+        'servidor', os.path.join(RAIZ, '__init__.py'), submodule_search_locations=[RAIZ]
+    )
+    modulo = importlib.util.module_from_spec(especificacion)
+    sys.modules['servidor'] = modulo
+    especificacion.loader.exec_module(modulo)
@@ -0,0 +1,77 @@
+import asyncio
+import builtins
+
+import pytest
+
+from servidor.src.anfitrion import Accion, AnfitrionDeMesas
+from servidor.src.model.salaDeJuego.juego.juegosDeCartas.Poker import Poker
+from servidor.src.model.usuario.Usuario import Usuario
+from servidor.src.utils.firestore import add_data_with_id, get_data
+from servidor.src.utils.persistencia import configurar_backend
+
+
+@pytest.fixture(autouse=True)
+def sin_consola(monkeypatch):
+    # Una mano jugada desde el anfitrión nunca debe preguntar por consola
+    def entrada(*argumentos):
+        raise AssertionError("El anfitrión no debe llamar a input()")
+    monkeypatch.setattr(builtins, 'input', entrada)
+    configurar_backend('memoria')
+
+
+async def _abrir_mesa(anfitrion) -> Poker:
+    sala = Poker('mesa-poker', 4, 2, 10)
+    await add_data_with_id('salas_de_juego_activas', {'historial': [], 'pozo': 0}, 'mesa-poker')
+    for i in range(2):
+        usuario = Usuario(f'u{i}', 'Jugador', 'Prueba', f'u{i}@prueba.com', 'clave123', saldo=100)
+        await add_data_with_id('usuarios', usuario.to_dict(), usuario.get_id())
+        sala._jugadores.append(usuario)
+    anfitrion.abrir_mesa(sala, 'mesa-poker')
+    return sala
+
+
+def test_retirarse_liquida_la_mano_en_la_base():
+    async def jugar():
+        async with AnfitrionDeMesas() as anfitrion:
+            sala = await _abrir_mesa(anfitrion)
+            await anfitrion.enviar('mesa-poker', Accion('repartir'))
+            await anfitrion.enviar('mesa-poker', Accion('apostar', 'u0', {'monto': 20}))
+            await anfitrion.enviar('mesa-poker', Accion('igualar', 'u1'))
+            await anfitrion.enviar('mesa-poker', Accion('avanzar_etapa'))
+            await anfitrion.enviar('mesa-poker', Accion('retirarse', 'u0'))
+            assert sala.mano_terminada()
+            assert not sala.tiene_liquidacion_pendiente()
+            return sala.get_id_mano()
+
+    id_mano = asyncio.run(jugar())
+    perdedor = asyncio.run(get_data('usuarios', 'u0'))
+    ganador = asyncio.run(get_data('usuarios', 'u1'))
+    mesa = asyncio.run(get_data('salas_de_juego_activas', 'mesa-poker'))
+    assert perdedor['saldo'] == 80
+    assert ganador['saldo'] == 120
+    assert ganador['resumen_historial']['ganadas'] == 1
+    assert mesa['pozo'] == 0
+    assert [registro['id_mano'] for registro in mesa['historial']] == [id_mano]
+
+
+def test_la_mano_termina_en_el_showdown_y_se_puede_repartir_otra():
+    async def jugar():
+        async with AnfitrionDeMesas() as anfitrion:
+            sala = await _abrir_mesa(anfitrion)
+            await anfitrion.enviar('mesa-poker', Accion('repartir'))
+            await anfitrion.enviar('mesa-poker', Accion('apostar', 'u0', {'monto': 10}))
+            await anfitrion.enviar('mesa-poker', Accion('igualar', 'u1'))
+            estado = None
+            for _ in range(4):
+                estado = await anfitrion.enviar('mesa-poker', Accion('avanzar_etapa'))
+            assert estado['terminada'] and estado['etapa'] == 'SHOWDOWN'
+            with pytest.raises(ValueError):
+                await anfitrion.enviar('mesa-poker', Accion('avanzar_etapa'))
+            nueva = await anfitrion.enviar('mesa-poker', Accion('repartir'))
+            assert not nueva['terminada'] and nueva['id_mano'] != estado['id_mano']
+            return [usuario._saldo for usuario in sala.get_jugadores()]
+
+    saldos = asyncio.run(jugar())
+    guardados = [asyncio.run(get_data('usuarios', f'u{i}'))['saldo'] for i in range(2)]
+    assert guardados == saldos
+    assert sum(guardados) == 200
@@ -0,0 +1,25 @@
+import asyncio
+
+import pytest
+
+from servidor.src.model.usuario.Usuario import Usuario
+from servidor.src.model.usuario.UsuarioServicio import UsuarioServicio
+from servidor.src.utils.persistencia import configurar_backend
+
+
+@pytest.fixture(autouse=True)
+def backend_en_memoria():
+    configurar_backend('memoria')
+
+
+def test_un_cambio_de_correo_fallido_no_deja_el_correo_ocupado():
+    async def probar():
+        servicio = UsuarioServicio()
+        with pytest.raises(ValueError):
+            await servicio.actualizar_usuario('NOEXISTE', {'correo': 'ana@x.com'})
+        assert await servicio.buscar_usuario_por_correo('ana@x.com') is None
+        await servicio.agregar_usuario(Usuario('ana', 'Anabel', 'Prueba', 'ana@x.com', 'clave123'))
+        encontrado = await servicio.buscar_usuario_por_correo('ANA@x.com')
+        assert encontrado is not None and encontrado.get_id() == 'ana'
+
+    asyncio.run(probar())